@@ -0,0 +1,108 @@
+"""Ajan çıktıları için ortak JSON çözücü.
+
+Ajanlar bazen temiz JSON, bazen de açıklama metni + JSON döner. Eskiden her
+çağıran önce tüm metni, sonra `{`…`}` ve `[`…`]` dilimlerini ayrı ayrı
+`json.loads` ile deniyordu; her deneme metnin yeni bir kopyasını oluşturuyordu.
+
+Bu modül gövdeyi bir kez okur, temiz JSON'u doğrudan byte'lardan çözer ve
+değilse aynı `{`…`}` / `[`…`]` aralıklarını `JSONDecoder.raw_decode` ile
+doğrudan metin üzerinde çözer — dilim kopyası oluşturulmaz. Kural ve öncelik
+eskisiyle aynıdır: ilk açılışta başlayan değer tam olarak son kapanışta
+bitmelidir.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_decoder = json.JSONDecoder()
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def read_body(body: Any) -> bytes:
+    """StreamingBody / bytes / str gövdeyi tek seferde byte'a çevirir."""
+    if hasattr(body, "read"):
+        return body.read()
+    if isinstance(body, (bytes, bytearray)):
+        return bytes(body)
+    return str(body).encode("utf-8")
+
+
+def decode_span(text: str, opener: str) -> Any | None:
+    """İlk `opener`'dan son eşleşen kapanışa kadar olan aralığı tek JSON değeri olarak çözer.
+
+    Eski `json.loads(text[start:end])` kuralının dilim kopyası oluşturmayan
+    karşılığıdır: `raw_decode` ilk açılışta başlar ve değer tam olarak son
+    kapanışta bitmelidir.
+
+    Args:
+        text: Taranacak metin.
+        opener: "{" (nesne) veya "[" (dizi).
+
+    Returns:
+        Çözülen JSON değeri; metinde böyle bir aralık yoksa None.
+
+    Raises:
+        json.JSONDecodeError: Aralık geçerli tek bir JSON değeri değilse
+            (kesik, bozuk veya sonrasında fazladan veri var).
+    """
+    start = text.find(opener)
+    end = text.rfind(_CLOSERS[opener]) + 1
+    if start < 0 or end <= start:
+        return None
+    value, stop = _decoder.raw_decode(text, start)
+    if stop != end:
+        raise json.JSONDecodeError("Extra data", text, stop)
+    return value
+
+
+def find_json(text: str, openers: str = "{[") -> Any | None:
+    """Metindeki JSON değerini döner (bulunamazsa veya çözülemezse None).
+
+    `openers` öncelik sırasıdır (varsayılan "{[": nesneler dizilerden önce);
+    her açılış için `decode_span` kuralı uygulanır. Kesik veya bozuk bir dış
+    değerin içindeki parçalar döndürülmez.
+
+    Args:
+        text: Taranacak metin.
+        openers: Açılış karakterleri, öncelik sırasıyla (ör. "{" yalnızca nesneler).
+
+    Returns:
+        Çözülen JSON değeri veya None.
+    """
+    for opener in openers:
+        try:
+            value = decode_span(text, opener)
+        except json.JSONDecodeError:
+            continue
+        if value is not None:
+            return value
+    return None
+
+
+def parse_runtime_response(raw: bytes | str) -> dict:
+    """AgentCore runtime response gövdesini dict'e çevirir.
+
+    - Temiz JSON → olduğu gibi
+    - Metin içinde JSON nesnesi → o nesne
+    - Metin içinde JSON dizisi → {"data": [...]}
+    - Hiçbiri → {"raw_response": text}
+    """
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        pass
+
+    text = raw.decode("utf-8") if isinstance(raw, (bytes, bytearray)) else raw
+    value = find_json(text, "{[")
+    if isinstance(value, dict):
+        return value
+    if isinstance(value, list):
+        return {"data": value}
+
+    logger.warning("Agent response JSON olarak parse edilemedi, raw text dönülüyor")
+    return {"raw_response": text.strip()}
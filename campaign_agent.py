@@ -7,39 +7,49 @@ deterministik fallback modunda çalışır.
 
 from __future__ import annotations
 
+import importlib.util
 import json
 import logging
+from dataclasses import asdict, replace
 from datetime import datetime, date
 from typing import Any
 
 from agents.campaign_agent.models import (
     CampaignResponse,
     CustomerInsight,
-    HeroProduct,
-    MissingRegular,
     ProductInsight,
-    TopProduct,
 )
 from agents.campaign_agent.matching import match_customer_product_segments
-from agents.campaign_agent.special_days import get_upcoming_special_days
 from agents.campaign_agent.validation import (
     validate_customer_insight,
     validate_product_insight,
 )
+from agent_response import decode_span
+from insight_records import (
+    HeroProductRecord,
+    MissingRegularRecord,
+    TopProductRecord,
+)
+from product_catalog import get_catalog_index
+from prompt_relevance import get_relevance_index
+from special_days_calendar import (
+    DEFAULT_LOCALE,
+    DEFAULT_TENANT,
+    get_special_days_calendar,
+)
 
 logger = logging.getLogger(__name__)
 
 # --- Strands SDK kullanılabilirlik kontrolü ---
+# Paket yalnızca bulunur, import edilmez: model stack'i ilk agent oluşturulurken yüklenir.
 
-_STRANDS_AVAILABLE = False
-try:
-    from strands import Agent
-    from strands.models.bedrock import BedrockModel
-
-    _STRANDS_AVAILABLE = True
-except ImportError:
+_STRANDS_AVAILABLE = importlib.util.find_spec("strands") is not None
+if not _STRANDS_AVAILABLE:
     logger.info("Strands SDK mevcut değil — fallback modu aktif.")
 
+# Agent bağlamına açıklaması eklenecek en fazla hero ürün sayısı
+HERO_COPY_LIMIT = 5
+
 
 # --- System Prompt ---
 
@@ -93,6 +103,9 @@ def create_campaign_agent() -> Any:
             "Agent oluşturmak için 'pip install strands-agents strands-agents-bedrock' gerekli."
         )
 
+    from strands import Agent
+    from strands.models.bedrock import BedrockModel
+
     from agents.campaign_agent.tools import (
         customer_analysis_agent,
         product_analysis_agent,
@@ -116,9 +129,12 @@ def create_campaign_agent() -> Any:
 
 
 def _parse_customer_data(data: dict[str, Any]) -> CustomerInsight:
-    """Doğrulanmış müşteri dict'ini CustomerInsight nesnesine dönüştürür."""
+    """Doğrulanmış müşteri dict'ini CustomerInsight nesnesine dönüştürür.
+
+    Liste elemanları `__slots__`'lı kompakt kayıtlardır (bkz. insight_records).
+    """
     missing_regulars = [
-        MissingRegular(
+        MissingRegularRecord(
             productId=mr["productId"],
             productName=mr["productName"],
             lastBought=mr["lastBought"],
@@ -128,7 +144,7 @@ def _parse_customer_data(data: dict[str, Any]) -> CustomerInsight:
         for mr in data.get("missingRegulars", [])
     ]
     top_products = [
-        TopProduct(
+        TopProductRecord(
             productId=tp["productId"],
             totalQuantity=tp["totalQuantity"],
             totalSpent=tp["totalSpent"],
@@ -163,28 +179,11 @@ def _parse_customer_data(data: dict[str, Any]) -> CustomerInsight:
 
 
 def _parse_product_data(data: dict[str, Any]) -> ProductInsight:
-    """Doğrulanmış ürün dict'ini ProductInsight nesnesine dönüştürür."""
-
-    def _to_hero(raw: dict) -> HeroProduct:
-        return HeroProduct(
-            productId=raw.get("productId", ""),
-            productName=raw.get("productName", ""),
-            category=raw.get("category", ""),
-            brand=raw.get("brand", ""),
-            performanceSegment=raw.get("performanceSegment", ""),
-            stockSegment=raw.get("stockSegment", "Healthy"),
-            lifecycleStage=raw.get("lifecycleStage", ""),
-            trendScore=raw.get("trendScore", 0),
-            stockDays=raw.get("stockDays", 0),
-            dailySalesRate=raw.get("dailySalesRate", 0.0),
-            inventoryPressure=raw.get("inventoryPressure", False),
-            seasonalRelevance=raw.get("seasonalRelevance", "LOW"),
-            seasonMatch=raw.get("seasonMatch", False),
-            priceSegment=raw.get("priceSegment", "MID"),
-            marginHealth=raw.get("marginHealth", "MODERATE"),
-            recommendedAction=raw.get("recommendedAction", "MAINTAIN"),
-            urgencyLevel=raw.get("urgencyLevel", "LOW"),
-        )
+    """Doğrulanmış ürün dict'ini ProductInsight nesnesine dönüştürür.
+
+    Hero / slow mover / yeni ürün satırları `__slots__`'lı kompakt kayıtlardır.
+    """
+    _to_hero = HeroProductRecord.from_dict
 
     return ProductInsight(
         heroProducts=[_to_hero(p) for p in data.get("heroProducts", [])],
@@ -208,11 +207,14 @@ def run_campaign_agent(
     """Campaign Agent'ı çalıştırır ve kampanya önerileri üretir.
 
     1. Girdileri validate_customer_insight / validate_product_insight ile doğrular.
-    2. Yaklaşan özel günleri tespit eder.
+    2. Yaklaşan özel günleri önbellekli takvimden okur.
     3. Strands SDK mevcutsa agent'ı oluşturup LLM ile orkestrasyon yapar.
     4. Strands SDK mevcut değilse (fallback) eşleştirme motorunu doğrudan kullanır.
     5. CampaignResponse JSON string döner.
 
+    Tenant/locale takvimi ve deterministik mod gereken çağıranlar
+    `build_campaign_result`'ı doğrudan kullanır.
+
     Args:
         prompt: Kullanıcının kampanya amacını belirten serbest metin.
         customer_data: CustomerInsightJSON dict (opsiyonel — tak-çıkar mimarisi).
@@ -221,6 +223,24 @@ def run_campaign_agent(
     Returns:
         CampaignResponse JSON string.
     """
+    result = build_campaign_result(prompt, customer_data, product_data)
+    return json.dumps(result, ensure_ascii=False, indent=2)
+
+
+def build_campaign_result(
+    prompt: str,
+    customer_data: dict[str, Any] | None = None,
+    product_data: dict[str, Any] | None = None,
+    tenant_id: str = DEFAULT_TENANT,
+    locale: str = DEFAULT_LOCALE,
+    use_llm: bool = True,
+) -> dict[str, Any]:
+    """`run_campaign_agent` ile aynı sonucu JSON'a çevirmeden dict olarak döner.
+
+    Aynı process içindeki çağıranlar (ör. orkestratörün local fallback'i) için
+    hızlı yoldur: çıktı serialize/parse turuna girmez. `use_llm=False`
+    deterministik eşleştirmeyi zorlar.
+    """
     warnings: list[str] = []
 
     # --- 1. Girdi doğrulama ---
@@ -258,12 +278,11 @@ def run_campaign_agent(
     else:
         product_insight = _parse_product_data(product_data)  # type: ignore[arg-type]
 
-    # --- 2. Özel günleri tespit et ---
-    today = date.today().isoformat()
-    special_days = get_upcoming_special_days(today, days_ahead=30)
+    # --- 2. Özel günleri tespit et (günlük pencereler önceden hesaplı) ---
+    special_days = get_special_days_calendar(tenant_id, locale).upcoming(date.today())
 
     # --- 3/4. Agent veya fallback ile kampanya üret ---
-    if _STRANDS_AVAILABLE:
+    if use_llm and _STRANDS_AVAILABLE:
         try:
             campaigns_list = _run_with_agent(
                 prompt, customer_insight, product_insight, special_days, warnings
@@ -279,7 +298,7 @@ def run_campaign_agent(
             prompt, customer_insight, product_insight, special_days
         )
 
-    # --- 5. CampaignResponse oluştur ve JSON döndür ---
+    # --- 5. CampaignResponse oluştur ---
     response = CampaignResponse(
         campaigns=campaigns_list,
         generatedAt=datetime.utcnow().isoformat() + "Z",
@@ -287,11 +306,11 @@ def run_campaign_agent(
         totalCampaigns=len(campaigns_list),
     )
 
-    # Uyarıları da dahil eden genişletilmiş JSON çıktısı
-    result = json.loads(response.to_json())
+    # Uyarıları da dahil eden genişletilmiş çıktı (to_json + json.loads turu yok)
+    result = asdict(response)
     result["error"] = False
     result["warnings"] = warnings
-    return json.dumps(result, ensure_ascii=False, indent=2)
+    return result
 
 
 def _run_with_agent(
@@ -318,6 +337,12 @@ def _run_with_agent(
     if product_insight is not None:
         n_products = len(product_insight.heroProducts)
         context_parts.append(f"Ürün verisi mevcut: {n_products} hero ürün.")
+        # Ürün açıklamaları payload'da taşınmaz, katalog indeksinden okunur
+        catalog = get_catalog_index()
+        for hero in product_insight.heroProducts[:HERO_COPY_LIMIT]:
+            copy = catalog.copy_for(hero.productId)
+            if copy:
+                context_parts.append(f"- {hero.productName or hero.productId}: {copy}")
     else:
         context_parts.append("Ürün verisi mevcut değil.")
 
@@ -338,51 +363,48 @@ def _run_with_agent(
     # Agent çıktısını parse etmeye çalış
     try:
         result_text = str(result)
-        # JSON bloğunu bul
-        json_start = result_text.find("[")
-        json_end = result_text.rfind("]") + 1
-        if json_start >= 0 and json_end > json_start:
-            parsed = json.loads(result_text[json_start:json_end])
-            if isinstance(parsed, list):
-                from agents.campaign_agent.models import (
-                    CampaignSuggestion,
-                    CampaignTiming,
-                    DiscountSuggestion,
-                    StockStatus,
-                )
-                import uuid
-
-                campaigns = []
-                for item in parsed:
-                    if isinstance(item, dict):
-                        campaigns.append(
-                            CampaignSuggestion(
-                                campaignId=item.get("campaignId", str(uuid.uuid4())),
-                                campaignName=item.get("campaignName", ""),
-                                targetCustomerSegment=item.get("targetCustomerSegment", ""),
-                                targetProductSegment=item.get("targetProductSegment", ""),
-                                matchReason=item.get("matchReason", ""),
-                                timing=CampaignTiming(
-                                    startDate=item.get("timing", {}).get("startDate", ""),
-                                    endDate=item.get("timing", {}).get("endDate", ""),
-                                    specialEvent=item.get("timing", {}).get("specialEvent"),
-                                ),
-                                discountSuggestion=DiscountSuggestion(
-                                    type=item.get("discountSuggestion", {}).get("type", "percentage"),
-                                    value=item.get("discountSuggestion", {}).get("value", 0),
-                                    description=item.get("discountSuggestion", {}).get("description", ""),
-                                ),
-                                channel=item.get("channel", ["app_push"]),
-                                estimatedImpact=item.get("estimatedImpact", ""),
-                                stockStatus=StockStatus(
-                                    currentLevel=item.get("stockStatus", {}).get("currentLevel", "Healthy"),
-                                    estimatedCampaignImpact=item.get("stockStatus", {}).get(
-                                        "estimatedCampaignImpact", ""
-                                    ),
+        # JSON dizisi bloğunu çöz (dilim kopyası yok; kesik/bozuksa JSONDecodeError)
+        parsed = decode_span(result_text, "[")
+        if isinstance(parsed, list):
+            from agents.campaign_agent.models import (
+                CampaignSuggestion,
+                CampaignTiming,
+                DiscountSuggestion,
+                StockStatus,
+            )
+            import uuid
+
+            campaigns = []
+            for item in parsed:
+                if isinstance(item, dict):
+                    campaigns.append(
+                        CampaignSuggestion(
+                            campaignId=item.get("campaignId", str(uuid.uuid4())),
+                            campaignName=item.get("campaignName", ""),
+                            targetCustomerSegment=item.get("targetCustomerSegment", ""),
+                            targetProductSegment=item.get("targetProductSegment", ""),
+                            matchReason=item.get("matchReason", ""),
+                            timing=CampaignTiming(
+                                startDate=item.get("timing", {}).get("startDate", ""),
+                                endDate=item.get("timing", {}).get("endDate", ""),
+                                specialEvent=item.get("timing", {}).get("specialEvent"),
+                            ),
+                            discountSuggestion=DiscountSuggestion(
+                                type=item.get("discountSuggestion", {}).get("type", "percentage"),
+                                value=item.get("discountSuggestion", {}).get("value", 0),
+                                description=item.get("discountSuggestion", {}).get("description", ""),
+                            ),
+                            channel=item.get("channel", ["app_push"]),
+                            estimatedImpact=item.get("estimatedImpact", ""),
+                            stockStatus=StockStatus(
+                                currentLevel=item.get("stockStatus", {}).get("currentLevel", "Healthy"),
+                                estimatedCampaignImpact=item.get("stockStatus", {}).get(
+                                    "estimatedCampaignImpact", ""
                                 ),
-                            )
+                            ),
                         )
-                return campaigns
+                    )
+            return campaigns
     except (json.JSONDecodeError, KeyError, TypeError) as exc:
         logger.warning("Agent JSON çıktısı parse edilemedi: %s — fallback kullanılıyor", exc)
         warnings.append(f"Agent çıktısı parse edilemedi: {exc} — fallback modu kullanıldı")
@@ -397,10 +419,35 @@ def _run_fallback(
     product_insight: ProductInsight | None,
     special_days: list,
 ) -> list:
-    """Strands SDK olmadan eşleştirme motorunu doğrudan kullanarak kampanya üretir."""
+    """Strands SDK olmadan eşleştirme motorunu doğrudan kullanarak kampanya üretir.
+
+    Ürün satırları önce prompt'a göre (yerel BM25) sıralanır; böylece
+    eşleştirme motoru model çağrısı olmadan prompt'la ilgili ürünleri öne alır.
+    """
+    if product_insight is not None and prompt:
+        product_insight = _rank_products_by_prompt(prompt, product_insight)
     return match_customer_product_segments(
         customer_insights=customer_insight,
         product_insights=product_insight,
         special_days=special_days,
         user_prompt=prompt,
     )
+
+
+def _rank_products_by_prompt(prompt: str, product_insight: ProductInsight) -> ProductInsight:
+    """Hero / slow mover / yeni / mevsimsel ürün listelerini prompt ilgisine göre sıralar.
+
+    Sıralama kararlıdır: prompt'la eşleşmeyen ürünler ürün analizindeki sırayı
+    korur. Hiçbir ürün eşleşmezse aynı nesne döner.
+    """
+    index = get_relevance_index()
+    ranked = {}
+    for field in ("heroProducts", "slowMovers", "newProducts", "seasonalProducts"):
+        rows = getattr(product_insight, field, None) or []
+        scored = index.rank(prompt, rows)
+        if scored and scored[0][1] > 0:
+            ranked[field] = [row for row, _ in scored]
+    if not ranked:
+        return product_insight
+    logger.debug("Prompt ilgisine göre sıralanan listeler: %s", ", ".join(ranked))
+    return replace(product_insight, **ranked)
@@ -4,11 +4,22 @@ Analyzes customer data and performs segmentation based on purchase history,
 demographics, and behavioral patterns.
 """
 
-from strands import Agent
 from bedrock_agentcore.runtime import BedrockAgentCoreApp
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 import logging
+import threading
+
+from next_purchase_index import OVERDUE_FACTOR, REGULAR_MAX_INTERVAL_DAYS, get_next_purchase_index
+
+try:
+    from wire_codec import decode_request, encode_response
+except ImportError:  # deployed without the shared codec: plain JSON only
+    def decode_request(payload):
+        return payload, None
+
+    def encode_response(result, encoding):
+        return result
 
 # Configure logging
 logging.basicConfig(
@@ -19,9 +30,7 @@ logger = logging.getLogger(__name__)
 
 app = BedrockAgentCoreApp()
 
-# Initialize Strands agent with system prompt
-agent = Agent(
-    system_prompt="""You are a Customer Segment Analysis Agent. Your role is to analyze customer data and provide comprehensive segmentation insights.
+AGENT_SYSTEM_PROMPT = """You are a Customer Segment Analysis Agent. Your role is to analyze customer data and provide comprehensive segmentation insights.
 
 You analyze:
 - Customer demographics (age, gender, location)
@@ -39,7 +48,25 @@ You provide structured insights including:
 You do NOT perform stock analysis or campaign decisions - only customer profiling and segmentation.
 
 When given customer data, analyze it systematically and provide clear, actionable insights."""
-)
+
+_agent = None
+_agent_lock = threading.Lock()
+
+
+def get_agent():
+    """
+    Return the Strands agent, creating it on first use.
+
+    The model stack (strands + Bedrock client) is only imported here, so
+    deterministic analysis requests never pay for it at cold start.
+    """
+    global _agent
+    if _agent is None:
+        with _agent_lock:
+            if _agent is None:
+                from strands import Agent
+                _agent = Agent(system_prompt=AGENT_SYSTEM_PROMPT)
+    return _agent
 
 
 def calculate_age_segment(age: int) -> str:
@@ -238,10 +265,10 @@ def analyze_customer_data(customer_data: Dict[str, Any]) -> Dict[str, Any]:
     missing_regulars = []
     for product in product_history:
         avg_days_between = product.get("avgDaysBetween")
-        if avg_days_between and avg_days_between <= 60:
+        if avg_days_between and avg_days_between <= REGULAR_MAX_INTERVAL_DAYS:
             last_purchase = datetime.fromisoformat(product.get("lastPurchase", datetime.now().isoformat()))
             days_since_last = (datetime.now() - last_purchase).days
-            if days_since_last > avg_days_between * 1.2:
+            if days_since_last > avg_days_between * OVERDUE_FACTOR:
                 missing_regulars.append({
                     "productId": product.get("productId", ""),
                     "productName": product.get("productId", ""),  # In real scenario, lookup product name
@@ -304,15 +331,71 @@ def invoke(payload: Dict[str, Any]) -> Dict[str, Any]:
     Main entrypoint for the customer segment agent.
     
     Accepts customer data and returns comprehensive segmentation insights.
+    Set "explain": false in the payload to skip the LLM explanation and
+    return only the deterministic analysis.
+
+    The payload may arrive as a wire_codec envelope; when the caller sends
+    "_wireAccept", the result is returned in the negotiated compact encoding.
+    """
+    try:
+        payload, response_encoding = decode_request(payload)
+    except ValueError as ve:
+        # Malformed wire envelope: same error shape as handle_request (plain JSON)
+        logger.error(f"Invalid wire payload: {str(ve)}")
+        return {
+            "error": str(ve),
+            "message": "Invalid input data",
+            "timestamp": datetime.now().isoformat()
+        }
+    return encode_response(handle_request(payload), response_encoding)
+
+
+def query_overdue_regulars(query: Dict[str, Any]) -> Dict[str, Any]:
     """
+    Lists overdue regular products of all customers from the next-purchase index.
+
+    The index is built by the scheduled job (next_purchase_index.py build)
+    and found via NEXT_PURCHASE_INDEX_PATH; the query is a range scan over it.
+
+    Args:
+        query: {"asOf": ISO time (default now), "since": ISO time (only
+               products that became overdue since then), "limit": int}
+
+    Returns:
+        {"overdueRegulars": [...], "count", "total", "asOf", "indexBuiltAt", "timestamp"}
+    """
+    index = get_next_purchase_index()
+    if index is None:
+        raise ValueError("Next-purchase index is not available (set NEXT_PURCHASE_INDEX_PATH)")
+    as_of = query.get("asOf") or datetime.now().isoformat()
+    since = query.get("since")
+    items = index.overdue(as_of, since, query.get("limit"))
+    logger.info(f"Overdue regulars query: {len(items)} item(s) as of {as_of}")
+    return {
+        "overdueRegulars": items,
+        "count": len(items),
+        "total": index.count_overdue(as_of, since),
+        "asOf": as_of,
+        "indexBuiltAt": index.built_at,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+def handle_request(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Processes a plain (decoded) customer segment request."""
     logger.info("=== Agent invocation started ===")
     try:
         # Extract prompt or customer data
         user_message = payload.get("prompt", "")
         customer_data = payload.get("customerData", {})
+        explain = payload.get("explain", True)
         
         logger.debug(f"Payload keys: {list(payload.keys())}")
         
+        # Overdue regulars are served from the precomputed index
+        if "overdueRegulars" in payload:
+            return query_overdue_regulars(payload.get("overdueRegulars") or {})
+        
         # If customer data is provided, perform analysis
         if customer_data:
             logger.info("Customer data provided, starting analysis")
@@ -332,14 +415,15 @@ def invoke(payload: Dict[str, Any]) -> Dict[str, Any]:
 {analysis_result.get('message', '')}"""
             
             # Use agent to provide natural language explanation
-            try:
-                logger.info("Generating AI explanation")
-                agent_response = agent(f"Provide a brief explanation of this customer analysis:\n{summary}")
-                explanation = agent_response.message
-                logger.info("AI explanation generated successfully")
-            except Exception as agent_error:
-                logger.warning(f"Agent explanation failed: {str(agent_error)}, using fallback")
-                explanation = f"Customer segmentation analysis completed. {analysis_result.get('message', '')}"
+            explanation = f"Customer segmentation analysis completed. {analysis_result.get('message', '')}"
+            if explain:
+                try:
+                    logger.info("Generating AI explanation")
+                    agent_response = get_agent()(f"Provide a brief explanation of this customer analysis:\n{summary}")
+                    explanation = agent_response.message
+                    logger.info("AI explanation generated successfully")
+                except Exception as agent_error:
+                    logger.warning(f"Agent explanation failed: {str(agent_error)}, using fallback")
             
             result = {
                 "analysis": analysis_result,
@@ -355,7 +439,7 @@ def invoke(payload: Dict[str, Any]) -> Dict[str, Any]:
         
         logger.info(f"Processing general query: {user_message[:50]}...")
         try:
-            result = agent(user_message)
+            result = get_agent()(user_message)
             logger.info("General query processed successfully")
             return {
                 "result": result.message,
@@ -0,0 +1,340 @@
+"""
+Next-Purchase Index - precomputed missingRegulars for replenishment campaigns
+
+analyze_customer_data lists a product under missingRegulars when the
+customer buys it regularly (avgDaysBetween <= 60) and the days since its
+lastPurchase exceed avgDaysBetween * 1.2. That moment is fixed once the
+history is known, so a scheduled job can compute it for every customer and
+regular product ahead of time:
+
+    expectedAt   lastPurchase + avgDaysBetween (the expected next purchase)
+    overdueAt    the first moment the product counts as missing:
+                 lastPurchase + floor(avgDaysBetween * 1.2) + 1 days, since
+                 the agent compares whole elapsed days
+
+Entries are kept sorted by overdueAt, so "which customers are overdue
+today" is a binary search plus a slice, and "which became overdue since the
+last campaign run" is a range between two bisections. Neither needs any
+customer to be re-segmented.
+
+The index reflects the histories it was built from: a purchase made after
+the build shows up after the next scheduled run.
+
+Usage:
+    python next_purchase_index.py build customers.json index.json
+    python next_purchase_index.py overdue index.json [--as-of 2026-10-19] [--since 2026-10-18] [--limit 100]
+
+customers.json is a list of customer records (mock-data/farmasi/customers.json)
+or of analyze_customer_data payloads. Agents load the index from
+NEXT_PURCHASE_INDEX_PATH and reload it when the job replaces the file.
+"""
+
+import argparse
+import bisect
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# missingRegulars rule shared with analyze_customer_data
+REGULAR_MAX_INTERVAL_DAYS = 60
+OVERDUE_FACTOR = 1.2
+
+# Index file written by the scheduled job and served by the agent
+NEXT_PURCHASE_INDEX_PATH = os.environ.get("NEXT_PURCHASE_INDEX_PATH", "")
+
+# How often the agent checks whether the index file was replaced
+NEXT_PURCHASE_INDEX_REFRESH_SECONDS = float(os.environ.get("NEXT_PURCHASE_INDEX_REFRESH_SECONDS", "60"))
+
+INDEX_FORMAT_VERSION = 1
+
+
+def overdue_after_days(avg_days_between: Any) -> Optional[int]:
+    """
+    Whole days after lastPurchase from which a regular product is missing.
+
+    Args:
+        avg_days_between: The product's avgDaysBetween
+
+    Returns:
+        Smallest elapsed day count above avgDaysBetween * 1.2, or None if the
+        product is not a regular
+    """
+    if not avg_days_between or avg_days_between > REGULAR_MAX_INTERVAL_DAYS:
+        return None
+    return math.floor(avg_days_between * OVERDUE_FACTOR) + 1
+
+
+def _as_datetime(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+class RegularDue(NamedTuple):
+    """One regular product of one customer, keyed by when it becomes overdue."""
+
+    overdue_at: datetime
+    customer_id: str
+    product_id: str
+    category: str
+    last_purchase: str
+    avg_days_between: float
+
+    @property
+    def expected_at(self) -> datetime:
+        return _as_datetime(self.last_purchase) + timedelta(days=self.avg_days_between)
+
+    def to_missing_regular(self, as_of: datetime) -> Dict[str, Any]:
+        """
+        The entry in analyze_customer_data's missingRegulars shape.
+
+        Args:
+            as_of: Time the overdue days are counted at
+
+        Returns:
+            missingRegulars item plus customerId, category,
+            expectedNextPurchase and overdueSince
+        """
+        days_since_last = (as_of - _as_datetime(self.last_purchase)).days
+        return {
+            "customerId": self.customer_id,
+            "productId": self.product_id,
+            "productName": self.product_id,  # In real scenario, lookup product name
+            "category": self.category,
+            "lastBought": self.last_purchase,
+            "avgDaysBetween": self.avg_days_between,
+            "daysOverdue": days_since_last - self.avg_days_between,
+            "expectedNextPurchase": self.expected_at.isoformat(),
+            "overdueSince": self.overdue_at.isoformat(),
+        }
+
+
+def regulars_of(record: Dict[str, Any]) -> List[RegularDue]:
+    """
+    Regular products of one customer.
+
+    Args:
+        record: Customer record ({customerId, productHistory, ...}) or an
+                analyze_customer_data payload ({customerId, customer: {...}})
+
+    Returns:
+        RegularDue per regular product with a lastPurchase
+    """
+    customer = record.get("customer") or record
+    customer_id = record.get("customerId") or customer.get("customerId")
+    if not customer_id:
+        return []
+    entries = []
+    for product in customer.get("productHistory", []):
+        avg_days_between = product.get("avgDaysBetween")
+        days = overdue_after_days(avg_days_between)
+        last_purchase = product.get("lastPurchase")
+        if days is None or not last_purchase:
+            continue
+        entries.append(RegularDue(
+            _as_datetime(last_purchase) + timedelta(days=days),
+            customer_id,
+            product.get("productId", ""),
+            product.get("category", "Unknown"),
+            last_purchase,
+            avg_days_between,
+        ))
+    return entries
+
+
+class NextPurchaseIndex:
+    """Regular products of all customers, sorted by overdueAt."""
+
+    def __init__(self, entries: Iterable[RegularDue], built_at: Optional[str] = None):
+        self.entries = sorted(entries)
+        self._keys = [entry.overdue_at for entry in self.entries]
+        self.built_at = built_at or datetime.now().isoformat()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def build(cls, customers: Iterable[Dict[str, Any]]) -> "NextPurchaseIndex":
+        """
+        Precomputes the index from customer histories.
+
+        Args:
+            customers: Customer records or analyze_customer_data payloads
+
+        Returns:
+            NextPurchaseIndex
+        """
+        entries = []
+        for record in customers:
+            entries.extend(regulars_of(record))
+        return cls(entries)
+
+    def overdue(self, as_of: Any = None, since: Any = None,
+                limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Regular products that are overdue at as_of.
+
+        Args:
+            as_of: Time of the query (datetime or ISO string, default now)
+            since: Only products that became overdue at or after this time,
+                   e.g. the previous campaign run
+            limit: Maximum number of items
+
+        Returns:
+            missingRegulars items (see RegularDue.to_missing_regular), longest
+            overdue first
+        """
+        as_of = _as_datetime(as_of) if as_of is not None else datetime.now()
+        end = bisect.bisect_right(self._keys, as_of)
+        start = bisect.bisect_left(self._keys, _as_datetime(since), 0, end) if since is not None else 0
+        if limit is not None:
+            end = min(end, start + max(limit, 0))
+        return [entry.to_missing_regular(as_of) for entry in self.entries[start:end]]
+
+    def count_overdue(self, as_of: Any = None, since: Any = None) -> int:
+        """
+        Number of regular products overdue at as_of (see overdue()).
+
+        Args:
+            as_of: Time of the query (default now)
+            since: Only count products that became overdue at or after this time
+
+        Returns:
+            Item count
+        """
+        as_of = _as_datetime(as_of) if as_of is not None else datetime.now()
+        end = bisect.bisect_right(self._keys, as_of)
+        start = bisect.bisect_left(self._keys, _as_datetime(since), 0, end) if since is not None else 0
+        return end - start
+
+    def save(self, path: str) -> None:
+        """
+        Writes the index atomically, so agents never read a partial file.
+
+        Args:
+            path: Index file path
+        """
+        data = {
+            "version": INDEX_FORMAT_VERSION,
+            "builtAt": self.built_at,
+            "entries": [
+                [entry.overdue_at.isoformat(), entry.customer_id, entry.product_id,
+                 entry.category, entry.last_purchase, entry.avg_days_between]
+                for entry in self.entries
+            ],
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "NextPurchaseIndex":
+        """
+        Reads an index written by save().
+
+        Args:
+            path: Index file path
+
+        Returns:
+            NextPurchaseIndex
+        """
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported next-purchase index version: {data.get('version')}")
+        index = cls.__new__(cls)
+        # Saved in sorted order, so no re-sort is needed
+        index.entries = [
+            RegularDue(datetime.fromisoformat(overdue_at), customer_id, product_id, category, last_purchase, avg)
+            for overdue_at, customer_id, product_id, category, last_purchase, avg in data["entries"]
+        ]
+        index._keys = [entry.overdue_at for entry in index.entries]
+        index.built_at = data.get("builtAt")
+        return index
+
+
+_index: Optional[NextPurchaseIndex] = None
+_index_signature = None
+_index_checked_at = None
+_index_lock = threading.Lock()
+
+
+def get_next_purchase_index(path: Optional[str] = None) -> Optional[NextPurchaseIndex]:
+    """
+    The process-wide index from NEXT_PURCHASE_INDEX_PATH.
+
+    The file is checked at most every NEXT_PURCHASE_INDEX_REFRESH_SECONDS
+    and reloaded when the scheduled job has replaced it.
+
+    Args:
+        path: Index file path (defaults to NEXT_PURCHASE_INDEX_PATH)
+
+    Returns:
+        NextPurchaseIndex, or None if no index is configured or readable
+    """
+    global _index, _index_signature, _index_checked_at
+    path = path or NEXT_PURCHASE_INDEX_PATH
+    if not path:
+        return None
+    now = time.monotonic()
+    checked_at = _index_checked_at
+    if checked_at is not None and now - checked_at < NEXT_PURCHASE_INDEX_REFRESH_SECONDS:
+        return _index
+    with _index_lock:
+        if _index_checked_at is not None and now - _index_checked_at < NEXT_PURCHASE_INDEX_REFRESH_SECONDS:
+            return _index
+        _index_checked_at = now
+        try:
+            stat = os.stat(path)
+        except OSError:
+            _index, _index_signature = None, None
+            return None
+        signature = (path, stat.st_size, stat.st_mtime_ns)
+        if signature != _index_signature:
+            try:
+                _index = NextPurchaseIndex.load(path)
+                logger.info(f"Next-purchase index loaded: {len(_index)} entries from {path}")
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Next-purchase index not loaded from {path}: {e}")
+            _index_signature = signature
+    return _index
+
+
+def _load_customers(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("customers", []) if isinstance(data, dict) else data
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="precompute the index from customer histories")
+    build_parser.add_argument("source", help="customers JSON")
+    build_parser.add_argument("index", help="index file to write")
+    overdue_parser = commands.add_parser("overdue", help="list overdue regular products")
+    overdue_parser.add_argument("index", help="index file")
+    overdue_parser.add_argument("--as-of", help="query time (default now)")
+    overdue_parser.add_argument("--since", help="only products that became overdue since this time")
+    overdue_parser.add_argument("--limit", type=int)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        index = NextPurchaseIndex.build(_load_customers(args.source))
+        index.save(args.index)
+        print(f"{len(index)} regular products indexed in {time.perf_counter() - start:.3f}s -> {args.index}",
+              file=sys.stderr)
+    else:
+        index = NextPurchaseIndex.load(args.index)
+        json.dump(index.overdue(args.as_of, args.since, args.limit), sys.stdout, ensure_ascii=False, indent=2)
+        print()
@@ -0,0 +1,139 @@
+"""
+Performance Test: overdue regulars from the next-purchase index vs. re-segmentation
+
+For a synthetic population (tests/synthetic_customers.py) the script
+measures:
+
+    build          precomputing the index (the scheduled job), plus the size
+                   and save / load time of the index file
+    query          "overdue now" and "became overdue in the last day" range
+                   scans against the index
+    resegment      the same answer obtained the old way, by running
+                   analyze_customer_data for every customer and collecting
+                   missingRegulars
+
+and checks that the index and the re-segmentation return the same
+(customerId, productId, daysOverdue) set. The generator anchors the newest
+purchase on today, which leaves hardly any regular overdue, so histories are
+moved --age-days into the past (as if the job ran that long after the last
+orders).
+
+Usage:
+    python tests/performance_test_next_purchase.py [--customers 100000] [--seed 42]
+        [--age-days 30] [--queries 100] [--output results.json]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from customer_segment_agent import analyze_customer_data
+from next_purchase_index import NextPurchaseIndex
+from synthetic_customers import CustomerProfile, generate_customers
+
+
+def resegment(customers: list) -> set:
+    overdue = set()
+    for customer in customers:
+        for item in analyze_customer_data(customer)["missingRegulars"]:
+            overdue.add((customer["customerId"], item["productId"], item["daysOverdue"]))
+    return overdue
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--age-days", type=int, default=30, help="days since the newest purchase")
+    parser.add_argument("--queries", type=int, default=100, help="repetitions of each index query")
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args()
+
+    logging.getLogger("customer_segment_agent").setLevel(logging.WARNING)
+    customers = list(generate_customers(args.customers, random.Random(args.seed), CustomerProfile.load(),
+                                        as_of=date.today() - timedelta(days=args.age_days)))
+
+    start = time.perf_counter()
+    index = NextPurchaseIndex.build(customers)
+    build_sec = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "next_purchase_index.json")
+        start = time.perf_counter()
+        index.save(path)
+        save_sec = time.perf_counter() - start
+        file_mb = os.path.getsize(path) / (1024 * 1024)
+        start = time.perf_counter()
+        index = NextPurchaseIndex.load(path)
+        load_sec = time.perf_counter() - start
+
+    as_of = datetime.now()
+    since = as_of - timedelta(days=1)
+    start = time.perf_counter()
+    for _ in range(args.queries):
+        overdue = index.overdue(as_of)
+    query_ms = (time.perf_counter() - start) * 1000 / args.queries
+    start = time.perf_counter()
+    for _ in range(args.queries):
+        newly_overdue = index.overdue(as_of, since)
+    since_ms = (time.perf_counter() - start) * 1000 / args.queries
+    start = time.perf_counter()
+    for _ in range(args.queries):
+        index.count_overdue(as_of)
+    count_us = (time.perf_counter() - start) * 1e6 / args.queries
+
+    start = time.perf_counter()
+    expected = resegment(customers)
+    resegment_sec = time.perf_counter() - start
+    actual = {(item["customerId"], item["productId"], item["daysOverdue"]) for item in overdue}
+    matches = actual == expected
+
+    results = {
+        "customers": args.customers,
+        "seed": args.seed,
+        "ageDays": args.age_days,
+        "indexedRegulars": len(index),
+        "overdueNow": len(overdue),
+        "overdueLastDay": len(newly_overdue),
+        "buildSec": round(build_sec, 3),
+        "saveSec": round(save_sec, 3),
+        "loadSec": round(load_sec, 3),
+        "indexFileMb": round(file_mb, 2),
+        "queryOverdueMs": round(query_ms, 3),
+        "queryLastDayMs": round(since_ms, 3),
+        "countOverdueUs": round(count_us, 2),
+        "resegmentSec": round(resegment_sec, 3),
+        "matchesResegmentation": matches,
+    }
+
+    print("=" * 80)
+    print(f"NEXT-PURCHASE INDEX ({args.customers:,} customers, seed {args.seed})")
+    print("=" * 80)
+    print(f"Indexed regular products  {len(index):>12,}")
+    print(f"Build (scheduled job)     {build_sec:>12.3f} s")
+    print(f"Save / load               {save_sec:>8.3f} s / {load_sec:.3f} s ({file_mb:.1f} MB)")
+    print(f"Overdue now               {len(overdue):>12,} items in {query_ms:.3f} ms")
+    print(f"Became overdue last day   {len(newly_overdue):>12,} items in {since_ms:.3f} ms")
+    print(f"Count overdue             {count_us:>12.2f} us")
+    print(f"Re-segmentation           {resegment_sec:>12.3f} s")
+    print(f"Same result               {'yes' if matches else 'NO':>12}")
+    print("=" * 80)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if not matches:
+        print(f"Only in index: {sorted(actual - expected)[:5]}")
+        print(f"Only in re-segmentation: {sorted(expected - actual)[:5]}")
+        sys.exit(1)
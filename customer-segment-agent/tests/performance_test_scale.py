@@ -0,0 +1,268 @@
+"""
+Performance Test: analyze_customer_data at 10k-1M synthetic customers
+
+Streams synthetic customers (tests/synthetic_customers.py) through
+analyze_customer_data and reports, per population size:
+
+    throughput     customers per second over the analysis calls only
+                   (generation time is excluded)
+    latency        per-customer p50 / p90 / p99 / p99.9 / max, measured with
+                   perf_counter_ns, plus a log2 latency histogram of the
+                   largest run
+    memory         peak RSS of the process and, with --tracemalloc, the
+                   peak Python allocation while analyzing (tracemalloc slows
+                   every allocation, so latencies of that run are inflated)
+
+Results are not kept, only aggregated, so memory reflects the analysis and
+not a million result dictionaries. The agent's per-customer INFO logging is
+lowered to --log-level (WARNING by default) for the run; pass INFO to
+measure it as deployed.
+
+With --profile PATH the largest size is analyzed once more under a profiler
+(a separate pass, so profiler overhead stays out of the table):
+
+    cprofile      (default) writes pstats data to PATH, readable with
+                  `python -m pstats PATH`, snakeviz or gprof2dot, and prints
+                  the top functions by own time (date handling shows up as
+                  datetime.now / datetime.isoformat / fromisoformat)
+    pyinstrument  if installed; writes PATH as HTML when it ends in .html,
+                  otherwise a pyinstrument session (`pyinstrument --load PATH`),
+                  and prints the call tree
+
+Usage:
+    python tests/performance_test_scale.py [--sizes 10000,100000,1000000]
+        [--seed 42] [--new-share 0.0] [--log-level WARNING] [--tracemalloc]
+        [--profile out.prof] [--profiler cprofile|pyinstrument] [--output results.json]
+"""
+import argparse
+import cProfile
+import gc
+import io
+import json
+import logging
+import os
+import platform
+import pstats
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from array import array
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from customer_segment_agent import analyze_customer_data
+from synthetic_customers import CustomerProfile, generate_customers
+
+DEFAULT_SIZES = "10000,100000,1000000"
+PERCENTILES = (50, 90, 99, 99.9)
+SEGMENT_KEYS = ("mode", "ageSegment", "churnSegment", "valueSegment", "loyaltyTier")
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(sorted_ns: array, pct: float) -> float:
+    index = min(len(sorted_ns) - 1, int(len(sorted_ns) * pct / 100))
+    return sorted_ns[index] / 1000
+
+
+def histogram(sorted_ns: array, width: int = 50) -> list:
+    """Printable log2 buckets of the latencies in microseconds."""
+    buckets = {}
+    for value in sorted_ns:
+        bucket = max(0, (value // 1000).bit_length() - 1)
+        buckets[bucket] = buckets.get(bucket, 0) + 1
+    rows = []
+    peak = max(buckets.values())
+    for bucket in range(min(buckets), max(buckets) + 1):
+        count = buckets.get(bucket, 0)
+        low = 0 if bucket == 0 else 2 ** bucket
+        rows.append(f"{low:>8,} - {2 ** (bucket + 1):>8,} us {count:>10,} "
+                    + "#" * max(1 if count else 0, round(count / peak * width)))
+    return rows
+
+
+def analyze_all(n_customers: int, seed: int, new_share: float, profile_data: CustomerProfile,
+                on_result=None, profiler=None, batch: int = 10_000) -> int:
+    """
+    Generates customers in batches and analyzes them outside the generation.
+
+    Only the analysis loop of each batch is timed and profiled, so the
+    synthetic generator never shows up in the numbers or the profile.
+
+    Returns:
+        Total analysis time in nanoseconds
+    """
+    customers = generate_customers(n_customers, random.Random(seed), profile_data,
+                                   new_customer_share=new_share)
+    analyze = analyze_customer_data
+    clock = time.perf_counter_ns
+    busy_ns = 0
+    remaining = n_customers
+    while remaining > 0:
+        chunk = [next(customers) for _ in range(min(batch, remaining))]
+        remaining -= len(chunk)
+        if profiler is not None:
+            profiler.enable()
+        for customer in chunk:
+            start = clock()
+            result = analyze(customer)
+            elapsed = clock() - start
+            busy_ns += elapsed
+            if on_result is not None:
+                on_result(result, elapsed)
+        if profiler is not None:
+            profiler.disable()
+    return busy_ns
+
+
+def run(n_customers: int, seed: int, new_share: float, profile_data: CustomerProfile,
+        trace_memory: bool = False) -> dict:
+    latencies = array("q")
+    segments = {key: {} for key in SEGMENT_KEYS}
+
+    def record(result: dict, elapsed: int) -> None:
+        latencies.append(elapsed)
+        for key in SEGMENT_KEYS:
+            counts = segments[key]
+            counts[result[key]] = counts.get(result[key], 0) + 1
+
+    if trace_memory:
+        tracemalloc.start()
+    gc.collect()
+    try:
+        busy_ns = analyze_all(n_customers, seed, new_share, profile_data, record)
+    finally:
+        traced_peak = None
+        if trace_memory:
+            traced_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    latencies = array("q", sorted(latencies))
+    return {
+        "customers": n_customers,
+        "throughputPerSec": round(n_customers / (busy_ns / 1e9), 1),
+        "analysisSec": round(busy_ns / 1e9, 3),
+        "latencyUs": {f"p{pct:g}": round(percentile(latencies, pct), 2) for pct in PERCENTILES},
+        "maxUs": round(latencies[-1] / 1000, 2),
+        "meanUs": round(busy_ns / n_customers / 1000, 2),
+        "peakRssMb": round(peak_rss_mb(), 1),
+        "tracedPeakMb": round(traced_peak / (1024 * 1024), 2) if traced_peak is not None else None,
+        "segments": {key: dict(sorted(counts.items())) for key, counts in segments.items()},
+        "_sorted_ns": latencies,
+    }
+
+
+class _PyinstrumentProfiler:
+    """enable/disable adapter so both profilers fit analyze_all."""
+
+    def __init__(self):
+        from pyinstrument import Profiler
+        self.profiler = Profiler()
+
+    def enable(self):
+        self.profiler.start()
+
+    def disable(self):
+        self.profiler.stop()
+
+
+def make_profiler(kind: str):
+    if kind == "pyinstrument":
+        try:
+            return _PyinstrumentProfiler()
+        except ImportError:
+            sys.exit("pyinstrument is not installed (pip install pyinstrument) - use --profiler cprofile")
+    return cProfile.Profile()
+
+
+def write_profile(profiler, path: str, top: int = 25) -> None:
+    if isinstance(profiler, cProfile.Profile):
+        profiler.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("tottime").print_stats(top)
+        print(out.getvalue())
+    else:
+        profiler = profiler.profiler
+        if path.endswith(".html"):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+        else:
+            profiler.last_session.save(path)
+        print(profiler.output_text(unicode=False, color=False))
+    print(f"Profile written to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated customer counts")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--new-share", type=float, default=0.0, help="share of customers without history")
+    parser.add_argument("--log-level", default="WARNING", help="agent log level during the run")
+    parser.add_argument("--tracemalloc", action="store_true", help="trace Python allocations (slow)")
+    parser.add_argument("--profile", help="profile the largest run and write it here")
+    parser.add_argument("--profiler", choices=("cprofile", "pyinstrument"), default="cprofile")
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args()
+
+    logging.getLogger("customer_segment_agent").setLevel(args.log_level.upper())
+    sizes = [int(size) for size in args.sizes.split(",")]
+    profile_data = CustomerProfile.load()
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "logLevel": args.log_level.upper(),
+            "tracemalloc": args.tracemalloc,
+            "recordedAt": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": {},
+    }
+
+    print("=" * 100)
+    print(f"CUSTOMER SEGMENT ANALYSIS AT SCALE (seed {args.seed}, log level {args.log_level.upper()})")
+    print("=" * 100)
+    print(f"{'Customers':>10} {'cust/s':>10} {'mean us':>9} "
+          + " ".join(f"{'p' + format(pct, 'g'):>8}" for pct in PERCENTILES)
+          + f" {'max us':>9} {'RSS MB':>8} {'traced MB':>10}")
+    largest = None
+    for n_customers in sizes:
+        stats = run(n_customers, args.seed, args.new_share, profile_data, args.tracemalloc)
+        largest = stats
+        latency = stats["latencyUs"]
+        traced = f"{stats['tracedPeakMb']:>10.2f}" if stats["tracedPeakMb"] is not None else f"{'-':>10}"
+        print(f"{n_customers:>10,} {stats['throughputPerSec']:>10,.0f} {stats['meanUs']:>9.1f} "
+              + " ".join(f"{latency['p' + format(pct, 'g')]:>8.1f}" for pct in PERCENTILES)
+              + f" {stats['maxUs']:>9.1f} {stats['peakRssMb']:>8.1f} {traced}")
+        results["results"][str(n_customers)] = {k: v for k, v in stats.items() if not k.startswith("_")}
+    print("=" * 100)
+
+    print(f"LATENCY HISTOGRAM ({largest['customers']:,} customers)")
+    for row in histogram(largest["_sorted_ns"]):
+        print(row)
+    print("=" * 100)
+    print("SEGMENTS")
+    for key, counts in largest["segments"].items():
+        print(f"  {key:<14} {counts}")
+    print("=" * 100)
+
+    if args.profile:
+        # Separate pass: profiler overhead must not leak into the table above
+        profiler = make_profiler(args.profiler)
+        analyze_all(largest["customers"], args.seed, args.new_share, profile_data, profiler=profiler)
+        print(f"PROFILE ({args.profiler}, {largest['customers']:,} customers)")
+        write_profile(profiler, args.profile)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"Results written to {args.output}")
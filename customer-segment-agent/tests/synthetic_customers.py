@@ -0,0 +1,154 @@
+"""
+Synthetic customer segment payloads modeled on mock-data/farmasi/customers-100.json
+
+The sample customers are profiled once (age and gender mix, city/region
+mix, product history length, category mix, per-category purchase rows,
+membership length and purchase recency relative to the newest purchase in
+the file). The generator then streams N customers in the
+analyze_customer_data input format, deterministically for a given seed,
+so 1M customers never have to be held in memory at once.
+
+    customer       age drawn from the sample with +-2 years jitter, gender,
+                   city and its region (mock-data/regions.json) from the
+                   sample mix
+    productHistory 1-3 rows as in the sample; each row copies a real row of
+                   the drawn category with quantities, spend and cadence
+                   scaled by a log-normal factor
+    dates          registeredAt / lastPurchase keep the sample's distances
+                   to its newest purchase, re-anchored on as_of (today by
+                   default) so the churn and loyalty mix stays as in the
+                   sample when analyze_customer_data compares with now()
+
+Usage:
+    python tests/synthetic_customers.py [customers] [seed] > customers.json
+"""
+import json
+import os
+import random
+import sys
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional
+
+MOCK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "mock-data")
+PROFILE_SOURCE = os.path.join(MOCK_DIR, "farmasi", "customers-100.json")
+REGIONS_SOURCE = os.path.join(MOCK_DIR, "regions.json")
+
+
+def _days_before(anchor: date, value: str) -> int:
+    return (anchor - date.fromisoformat(value[:10])).days
+
+
+class CustomerProfile:
+    """Distributions taken from the sample customers."""
+
+    def __init__(self, customers: List[dict], regions: List[dict]):
+        newest = max(date.fromisoformat(p["lastPurchase"][:10])
+                     for c in customers for p in c["productHistory"])
+
+        self.ages = [c["age"] for c in customers]
+        self.genders = [c["gender"] for c in customers]
+        self.cities = [(c["city"], c["region"]) for c in customers]
+        self.history_lengths = [len(c["productHistory"]) for c in customers]
+        self.membership_days = [_days_before(newest, c["registeredAt"]) for c in customers]
+
+        self.rows: Dict[str, List[dict]] = {}
+        self.recency_days: List[int] = []
+        for customer in customers:
+            for row in customer["productHistory"]:
+                self.rows.setdefault(row["category"], []).append(row)
+                self.recency_days.append(_days_before(newest, row["lastPurchase"]))
+        self.categories = sorted(self.rows)
+        self.category_weights = [len(self.rows[category]) for category in self.categories]
+
+        self.regions = {
+            region["name"]: {
+                "name": region["name"],
+                "climateType": region["climateType"],
+                "medianBasket": region["medianBasket"],
+                "trend": region["trend"],
+            }
+            for region in regions
+        }
+
+    @classmethod
+    def load(cls, source: str = PROFILE_SOURCE, regions: str = REGIONS_SOURCE) -> "CustomerProfile":
+        with open(source, encoding="utf-8") as f:
+            customers = json.load(f)
+        with open(regions, encoding="utf-8") as f:
+            region_list = json.load(f)["regions"]
+        return cls(customers, region_list)
+
+
+def _history_row(template: dict, rng: random.Random, as_of: date, recency: int) -> dict:
+    scale = rng.lognormvariate(0.0, 0.35)
+    quantity = max(1, round(template["totalQuantity"] * scale))
+    orders = max(1, round(template["orderCount"] * scale))
+    unit_price = template["totalSpent"] / max(template["totalQuantity"], 1)
+    cadence = template.get("avgDaysBetween")
+    if cadence is not None:
+        cadence = max(1, round(cadence * rng.lognormvariate(0.0, 0.2)))
+    last = as_of - timedelta(days=recency)
+    return {
+        "productId": template["productId"],
+        "category": template["category"],
+        "totalQuantity": quantity,
+        "totalSpent": round(unit_price * quantity, 2),
+        "orderCount": orders,
+        "lastPurchase": last.isoformat() + "T00:00:00",
+        "avgDaysBetween": cadence,
+    }
+
+
+def generate_customers(n_customers: int, rng: random.Random,
+                       profile: Optional[CustomerProfile] = None,
+                       as_of: Optional[date] = None,
+                       new_customer_share: float = 0.0) -> Iterator[dict]:
+    """
+    Yields synthetic analyze_customer_data payloads.
+
+    Args:
+        n_customers: Number of customers
+        rng: Random generator (fixes the population for a seed)
+        profile: Fitted profile (defaults to CustomerProfile.load())
+        as_of: Date the sample's newest purchase is mapped to (default today)
+        new_customer_share: Share of customers with an empty productHistory
+
+    Yields:
+        Customer payloads with customerId SC0000000, SC0000001, ...
+    """
+    profile = profile or CustomerProfile.load()
+    as_of = as_of or date.today()
+    default_region = next(iter(profile.regions.values()))
+
+    for i in range(n_customers):
+        customer_id = f"SC{i:07d}"
+        city, region_name = rng.choice(profile.cities)
+        membership = rng.choice(profile.membership_days)
+        history = []
+        if rng.random() >= new_customer_share:
+            length = rng.choice(profile.history_lengths)
+            categories = rng.choices(profile.categories, profile.category_weights, k=length)
+            for category in categories:
+                recency = min(rng.choice(profile.recency_days), membership)
+                history.append(_history_row(rng.choice(profile.rows[category]), rng, as_of, recency))
+        else:
+            membership = rng.randrange(0, 30)
+
+        yield {
+            "customerId": customer_id,
+            "city": city,
+            "customer": {
+                "customerId": customer_id,
+                "age": min(80, max(18, rng.choice(profile.ages) + rng.randint(-2, 2))),
+                "gender": rng.choice(profile.genders),
+                "registeredAt": (as_of - timedelta(days=membership)).isoformat() + "T00:00:00",
+                "productHistory": history,
+            },
+            "region": profile.regions.get(region_name, default_region),
+        }
+
+
+if __name__ == "__main__":
+    n_customers = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 42
+    json.dump(list(generate_customers(n_customers, random.Random(seed))), sys.stdout, ensure_ascii=False)
@@ -0,0 +1,460 @@
+"""Orkestratör için yerel asenkron HTTP gateway.
+
+`orchestrator_agent`'ın AgentCore girişini (invoke → handle_invocation) app dışında düz HTTP
+üzerinden sunar; web kampanya stüdyosu (apps/web) ve yük testleri gerçek akışı
+yerelde çağırabilir. Sadece standart kütüphane (asyncio) kullanılır.
+
+Uç noktalar:
+    POST /campaigns          Orkestratör payload'ı (invoke ile aynı format) → JSON sonuç
+    POST /campaigns/stream   Aynı payload → SSE: customerInsight, productInsight, result
+                             (Accept: text/event-stream ile /campaigns de akış döner)
+    GET  /health             Aktif, kuyruktaki, sunulan ve reddedilen istek sayıları
+
+Davranış:
+    - Eşzamanlılık sınırı: aynı anda en fazla GATEWAY_CONCURRENCY orkestrasyon
+      çalışır; fazlası GATEWAY_QUEUE_SIZE'a kadar sırada bekler. Kuyruk doluysa
+      veya GATEWAY_QUEUE_TIMEOUT_SECONDS içinde sıra gelmezse 503 + Retry-After.
+    - HTTP/1.1 keep-alive: bağlantı GATEWAY_KEEPALIVE_SECONDS boşta kalana kadar
+      sonraki istekler için açık tutulur. HTTP/1.0 istemcilere SSE chunked
+      yerine bağlantı kapanışıyla sonlanan gövdeyle gönderilir.
+    - gzip: Accept-Encoding gzip ise GATEWAY_GZIP_MIN_BYTES üstü JSON yanıtlar
+      sıkıştırılır; SSE akışı olay başına sync-flush ile sıkıştırılır.
+    - Server-Timing başlığı kuyrukta bekleme ve çalışma süresini taşır.
+
+Kullanım:
+    python http_gateway.py [port]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import sys
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+GATEWAY_HOST = os.environ.get("GATEWAY_HOST", "127.0.0.1")
+GATEWAY_PORT = int(os.environ.get("GATEWAY_PORT", "8080"))
+GATEWAY_CONCURRENCY = int(os.environ.get("GATEWAY_CONCURRENCY", "4"))
+GATEWAY_QUEUE_SIZE = int(os.environ.get("GATEWAY_QUEUE_SIZE", "64"))
+GATEWAY_QUEUE_TIMEOUT_SECONDS = float(os.environ.get("GATEWAY_QUEUE_TIMEOUT_SECONDS", "30"))
+GATEWAY_KEEPALIVE_SECONDS = float(os.environ.get("GATEWAY_KEEPALIVE_SECONDS", "15"))
+GATEWAY_GZIP_MIN_BYTES = int(os.environ.get("GATEWAY_GZIP_MIN_BYTES", "1024"))
+GATEWAY_MAX_BODY_BYTES = int(os.environ.get("GATEWAY_MAX_BODY_BYTES", str(32 * 1024 * 1024)))
+GATEWAY_SSE_HEARTBEAT_SECONDS = float(os.environ.get("GATEWAY_SSE_HEARTBEAT_SECONDS", "10"))
+
+_MAX_HEADER_BYTES = 64 * 1024
+_JSON_SEPARATORS = (",", ":")
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+# Orkestrasyon çalıştırıcısı: (payload, on_event) -> sonuç dict
+Runner = Callable[[dict, Optional[Callable[[str, Any], None]]], dict]
+
+
+def run_orchestration(payload: dict, on_event: Callable[[str, Any], None] | None = None) -> dict:
+    """Payload'ı AgentCore entrypoint'iyle aynı girişten işler (Sandbox formatı, debug _trace dahil)."""
+    from orchestrator_agent import handle_invocation
+
+    return handle_invocation(payload, on_event=on_event)
+
+
+class HttpError(Exception):
+    """İstemciye durum koduyla dönülecek istek hatası."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    __slots__ = ("method", "path", "version", "headers", "body", "keep_alive")
+
+    def __init__(
+        self, method: str, path: str, version: str, headers: Dict[str, str], body: bytes, keep_alive: bool
+    ) -> None:
+        self.method = method
+        self.path = path
+        self.version = version
+        self.headers = headers
+        self.body = body
+        self.keep_alive = keep_alive
+
+
+async def read_request(reader: asyncio.StreamReader, idle_timeout: float) -> Request | None:
+    """Bağlantıdan bir HTTP/1.x isteği okur.
+
+    Args:
+        reader: Bağlantı okuyucusu
+        idle_timeout: Sonraki isteğin başlaması için beklenecek en uzun süre (keep-alive)
+
+    Returns:
+        Request, bağlantı kapandıysa veya boşta kaldıysa None
+
+    Raises:
+        HttpError: Bozuk veya desteklenmeyen istek
+    """
+    try:
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), idle_timeout)
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+        return None
+    except asyncio.LimitOverrunError:
+        raise HttpError(400, "İstek başlıkları çok büyük")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "Geçersiz istek satırı")
+
+    headers = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.1":
+        keep_alive = connection != "close"
+    else:
+        keep_alive = connection == "keep-alive"
+
+    if "transfer-encoding" in headers:
+        raise HttpError(411, "Chunked istek gövdesi desteklenmiyor, Content-Length gönderin")
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HttpError(400, "Geçersiz Content-Length")
+    if length > GATEWAY_MAX_BODY_BYTES:
+        raise HttpError(413, f"İstek gövdesi {GATEWAY_MAX_BODY_BYTES} byte sınırını aşıyor")
+
+    body = await reader.readexactly(length) if length else b""
+    return Request(method.upper(), target.split("?", 1)[0], version, headers, body, keep_alive)
+
+
+def _sse_event(event: str, data: Any) -> bytes:
+    payload = json.dumps(data, ensure_ascii=False, separators=_JSON_SEPARATORS, default=str)
+    return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
+
+
+def _chunk(data: bytes) -> bytes:
+    return b"%x\r\n%s\r\n" % (len(data), data) if data else b""
+
+
+class CampaignGateway:
+    """Eşzamanlılık sınırı ve kuyrukla orkestrasyonu sunan asenkron HTTP sunucusu."""
+
+    def __init__(
+        self,
+        runner: Runner = run_orchestration,
+        concurrency: int = GATEWAY_CONCURRENCY,
+        queue_size: int = GATEWAY_QUEUE_SIZE,
+        queue_timeout: float = GATEWAY_QUEUE_TIMEOUT_SECONDS,
+        keepalive: float = GATEWAY_KEEPALIVE_SECONDS,
+        gzip_min_bytes: int = GATEWAY_GZIP_MIN_BYTES,
+    ) -> None:
+        self.runner = runner
+        self.concurrency = max(1, concurrency)
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.keepalive = keepalive
+        self.gzip_min_bytes = gzip_min_bytes
+        # Orkestrasyon senkron çalışır; her slot bir executor thread'i kullanır
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="gateway")
+        self._slots = asyncio.Semaphore(self.concurrency)
+        # Kabul edilen (çalışan + kuyrukta bekleyen) istekler; await'ten önce güncellenir
+        self._admitted = 0
+        self._active = 0
+        self._served = 0
+        self._rejected = 0
+
+    def stats(self) -> dict:
+        """Sağlık / yük özeti."""
+        return {
+            "status": "ok",
+            "concurrency": self.concurrency,
+            "active": self._active,
+            "queued": self._admitted - self._active,
+            "served": self._served,
+            "rejected": self._rejected,
+        }
+
+    async def start(self, host: str = GATEWAY_HOST, port: int = GATEWAY_PORT) -> asyncio.AbstractServer:
+        """Dinlemeye başlar ve asyncio sunucusunu döner."""
+        return await asyncio.start_server(self._handle_connection, host, port, limit=_MAX_HEADER_BYTES)
+
+    # ------------------------------------------------------------------
+    # Bağlantı ve yönlendirme
+    # ------------------------------------------------------------------
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await read_request(reader, self.keepalive)
+                except HttpError as e:
+                    await self._send_json(writer, e.status, {"error": e.message}, False, False)
+                    break
+                if request is None:
+                    break
+                if not await self._dispatch(request, writer):
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    async def _dispatch(self, request: Request, writer: asyncio.StreamWriter) -> bool:
+        """İsteği işler; bağlantının açık kalıp kalmayacağını döner."""
+        gzip_ok = "gzip" in request.headers.get("accept-encoding", "")
+        keep_alive = request.keep_alive
+
+        if request.path == "/health":
+            if request.method != "GET":
+                await self._send_json(writer, 405, {"error": "Sadece GET"}, gzip_ok, keep_alive)
+            else:
+                await self._send_json(writer, 200, self.stats(), gzip_ok, keep_alive)
+            return keep_alive
+
+        if request.path not in ("/campaigns", "/campaigns/stream"):
+            await self._send_json(writer, 404, {"error": f"Bilinmeyen yol: {request.path}"}, gzip_ok, keep_alive)
+            return keep_alive
+        if request.method != "POST":
+            await self._send_json(writer, 405, {"error": "Sadece POST"}, gzip_ok, keep_alive)
+            return keep_alive
+
+        try:
+            payload = json.loads(request.body) if request.body else {}
+        except ValueError as e:
+            await self._send_json(writer, 400, {"error": f"Geçersiz JSON: {e}"}, gzip_ok, keep_alive)
+            return keep_alive
+        if not isinstance(payload, dict):
+            await self._send_json(writer, 400, {"error": "Payload JSON nesnesi olmalı"}, gzip_ok, keep_alive)
+            return keep_alive
+
+        stream = request.path == "/campaigns/stream" or "text/event-stream" in request.headers.get("accept", "")
+        if stream:
+            # HTTP/1.0 istemciler chunked bilmez: akış bağlantı kapanınca biter
+            chunked = request.version != "HTTP/1.0"
+            return await self._stream(writer, payload, gzip_ok, keep_alive and chunked, chunked)
+        return await self._respond(writer, payload, gzip_ok, keep_alive)
+
+    # ------------------------------------------------------------------
+    # Kuyruk / eşzamanlılık
+    # ------------------------------------------------------------------
+
+    async def _acquire(self) -> float | None:
+        """Çalışma slotu bekler; kuyrukta geçen süreyi (sn) veya reddedildiyse None döner."""
+        if self._admitted >= self.concurrency + self.queue_size:
+            self._rejected += 1
+            return None
+        start = time.perf_counter()
+        self._admitted += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._admitted -= 1
+            self._rejected += 1
+            return None
+        except BaseException:
+            self._admitted -= 1
+            raise
+        self._active += 1
+        return time.perf_counter() - start
+
+    def _release(self, _future: Any = None) -> None:
+        self._active -= 1
+        self._admitted -= 1
+        self._served += 1
+        self._slots.release()
+
+    def _submit(self, payload: dict, on_event: Callable[[str, Any], None] | None) -> asyncio.Future:
+        """Orkestrasyonu executor'da başlatır; slot, iş gerçekten bitince bırakılır
+        (istemci bağlantıyı koparsa da eşzamanlılık sınırı korunur)."""
+        future = asyncio.get_running_loop().run_in_executor(self._executor, self.runner, payload, on_event)
+        future.add_done_callback(self._release)
+        return future
+
+    async def _reject(self, writer: asyncio.StreamWriter, gzip_ok: bool, keep_alive: bool) -> bool:
+        await self._send_json(
+            writer, 503,
+            {"error": "Gateway meşgul, daha sonra tekrar deneyin", **self.stats()},
+            gzip_ok, keep_alive, {"Retry-After": "1"},
+        )
+        return keep_alive
+
+    # ------------------------------------------------------------------
+    # Yanıtlar
+    # ------------------------------------------------------------------
+
+    async def _respond(self, writer: asyncio.StreamWriter, payload: dict, gzip_ok: bool, keep_alive: bool) -> bool:
+        queued = await self._acquire()
+        if queued is None:
+            return await self._reject(writer, gzip_ok, keep_alive)
+
+        start = time.perf_counter()
+        try:
+            result, status = await self._submit(payload, None), 200
+        except Exception as e:
+            logger.error("Orkestrasyon hatası: %s", e, exc_info=True)
+            result, status = {"error": str(e), "message": "Orkestrasyon başarısız oldu"}, 500
+        timing = f"queue;dur={queued * 1000:.1f}, run;dur={(time.perf_counter() - start) * 1000:.1f}"
+        await self._send_json(writer, status, result, gzip_ok, keep_alive, {"Server-Timing": timing})
+        return keep_alive
+
+    async def _stream(
+        self, writer: asyncio.StreamWriter, payload: dict, gzip_ok: bool, keep_alive: bool, chunked: bool = True
+    ) -> bool:
+        queued = await self._acquire()
+        if queued is None:
+            return await self._reject(writer, gzip_ok, keep_alive)
+
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+
+        def on_event(event: str, data: Any) -> None:
+            loop.call_soon_threadsafe(events.put_nowait, (event, data))
+
+        future = self._submit(payload, on_event)
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip_ok else None
+
+        def encode(data: bytes) -> bytes:
+            if compressor is not None:
+                data = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            return _chunk(data) if chunked else data
+
+        headers = {
+            "Content-Type": "text/event-stream; charset=utf-8",
+            "Cache-Control": "no-cache",
+            "Server-Timing": f"queue;dur={queued * 1000:.1f}",
+        }
+        if chunked:
+            headers["Transfer-Encoding"] = "chunked"
+        if compressor is not None:
+            headers["Content-Encoding"] = "gzip"
+        self._write_head(writer, 200, headers, keep_alive)
+        writer.write(encode(_sse_event("queued", {"queueMs": round(queued * 1000, 1)})))
+        await writer.drain()
+
+        start = time.perf_counter()
+        pending = None
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(events.get())
+            done, _ = await asyncio.wait(
+                {pending, future}, timeout=GATEWAY_SSE_HEARTBEAT_SECONDS, return_when=asyncio.FIRST_COMPLETED
+            )
+            if pending in done:
+                writer.write(encode(_sse_event(*pending.result())))
+                pending = None
+            elif future in done:
+                pending.cancel()
+                break
+            else:
+                # Proxy'lerin boştaki bağlantıyı kesmemesi için SSE yorum satırı
+                writer.write(encode(b": keep-alive\n\n"))
+            await writer.drain()
+
+        # Worker thread'inin sonuçtan önce kuyruğa attığı olaylar
+        while not events.empty():
+            writer.write(encode(_sse_event(*events.get_nowait())))
+        try:
+            result = future.result()
+            result_event = _sse_event("result", result)
+        except Exception as e:
+            logger.error("Orkestrasyon hatası: %s", e, exc_info=True)
+            result_event = _sse_event("error", {"error": str(e), "message": "Orkestrasyon başarısız oldu"})
+        writer.write(encode(result_event))
+        writer.write(encode(_sse_event("done", {"runMs": round((time.perf_counter() - start) * 1000, 1)})))
+        if compressor is not None:
+            tail = compressor.flush()
+            writer.write(_chunk(tail) if chunked else tail)
+        if chunked:
+            writer.write(b"0\r\n\r\n")
+        await writer.drain()
+        return keep_alive
+
+    def _write_head(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        headers: Dict[str, str],
+        keep_alive: bool,
+        length: int | None = None,
+    ) -> None:
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}"]
+        if length is not None:
+            lines.append(f"Content-Length: {length}")
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        if keep_alive:
+            lines.append("Connection: keep-alive")
+            lines.append(f"Keep-Alive: timeout={int(self.keepalive)}")
+        else:
+            lines.append("Connection: close")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+    async def _send_json(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        obj: Any,
+        gzip_ok: bool,
+        keep_alive: bool,
+        extra_headers: Dict[str, str] | None = None,
+    ) -> None:
+        body = json.dumps(obj, ensure_ascii=False, separators=_JSON_SEPARATORS, default=str).encode("utf-8")
+        headers = {"Content-Type": "application/json; charset=utf-8", "Vary": "Accept-Encoding"}
+        if gzip_ok and len(body) >= self.gzip_min_bytes:
+            body = gzip.compress(body, compresslevel=6, mtime=0)
+            headers["Content-Encoding"] = "gzip"
+        if extra_headers:
+            headers.update(extra_headers)
+        self._write_head(writer, status, headers, keep_alive, len(body))
+        writer.write(body)
+        await writer.drain()
+
+
+async def serve(host: str = GATEWAY_HOST, port: int = GATEWAY_PORT, gateway: CampaignGateway | None = None) -> None:
+    """Gateway'i başlatır ve durdurulana kadar çalıştırır."""
+    gateway = gateway or CampaignGateway()
+    if gateway.runner is run_orchestration:
+        # Orkestratör importu ve başlangıç hazırlıkları ilk isteğin gecikmesine binmesin
+        import orchestrator_agent
+
+        orchestrator_agent.warm_start()
+    server = await gateway.start(host, port)
+    logger.info(
+        "HTTP gateway %s:%d dinliyor (eşzamanlılık=%d, kuyruk=%d)",
+        host, port, gateway.concurrency, gateway.queue_size,
+    )
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    asyncio.run(serve(port=int(sys.argv[1]) if len(sys.argv) > 1 else GATEWAY_PORT))
@@ -0,0 +1,77 @@
+"""Kompakt insight kayıtları.
+
+`_parse_product_data` her hero / slow mover / yeni ürün için, `_parse_customer_data`
+ise her MissingRegular / TopProduct için bir nesne oluşturur. Kohort ölçeğinde
+milyonlarca nesne aynı anda bellekte kalır; kayıtlar alanlarını `__dict__`
+yerine `__slots__` içinde tutar.
+
+Kayıtlar `agents.campaign_agent.models` tiplerinin alt sınıflarıdır, yeni alan
+eklemez: `isinstance(kayit, HeroProduct)` doğrudur, alanlar değiştirilebilir,
+`dataclasses.asdict` aynı dict'i üretir ve kayıtlar aynı alan değerlerine sahip
+model nesnelerine (ve birbirlerine) eşittir. Python 3.11+ model nesnelerini de
+satır içi değerlerle tuttuğundan kazanç esas olarak eski yorumlayıcılarda
+(ve `__dict__`'e sonradan alan eklenmediği sürece) görülür.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from typing import Any, Callable
+
+from agents.campaign_agent.models import HeroProduct, MissingRegular, TopProduct
+
+
+def _field_eq(model: type) -> Callable[[Any, Any], Any]:
+    """Model tipindeki her nesneyle alan alan karşılaştıran `__eq__` üretir."""
+    names = tuple(f.name for f in fields(model))
+
+    def __eq__(self, other: Any) -> Any:
+        if not isinstance(other, model):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in names)
+
+    return __eq__
+
+
+@dataclass(slots=True, eq=False)
+class MissingRegularRecord(MissingRegular):
+    """Müşterinin düzenli aldığı ama geciken ürünü."""
+
+    __eq__ = _field_eq(MissingRegular)
+
+
+@dataclass(slots=True, eq=False)
+class TopProductRecord(TopProduct):
+    """Müşterinin en çok harcama yaptığı ürün."""
+
+    __eq__ = _field_eq(TopProduct)
+
+
+@dataclass(slots=True, eq=False)
+class HeroProductRecord(HeroProduct):
+    """Ürün analizinden gelen hero / slow mover / yeni ürün satırı."""
+
+    __eq__ = _field_eq(HeroProduct)
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> "HeroProductRecord":
+        """ProductInsightJSON satırından kayıt oluşturur (eksik alanlar varsayılanla)."""
+        return cls(
+            productId=raw.get("productId", ""),
+            productName=raw.get("productName", ""),
+            category=raw.get("category", ""),
+            brand=raw.get("brand", ""),
+            performanceSegment=raw.get("performanceSegment", ""),
+            stockSegment=raw.get("stockSegment", "Healthy"),
+            lifecycleStage=raw.get("lifecycleStage", ""),
+            trendScore=raw.get("trendScore", 0),
+            stockDays=raw.get("stockDays", 0),
+            dailySalesRate=raw.get("dailySalesRate", 0.0),
+            inventoryPressure=raw.get("inventoryPressure", False),
+            seasonalRelevance=raw.get("seasonalRelevance", "LOW"),
+            seasonMatch=raw.get("seasonMatch", False),
+            priceSegment=raw.get("priceSegment", "MID"),
+            marginHealth=raw.get("marginHealth", "MODERATE"),
+            recommendedAction=raw.get("recommendedAction", "MAINTAIN"),
+            urgencyLevel=raw.get("urgencyLevel", "LOW"),
+        )
@@ -29,13 +29,27 @@ from __future__ import annotations
 import json
 import logging
 import os
-from typing import Any, Dict
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
 
-import boto3
-from strands import Agent, tool
-from strands.models.bedrock import BedrockModel
 from bedrock_agentcore.runtime import BedrockAgentCoreApp
 
+import wire_codec
+from agent_response import find_json, parse_runtime_response, read_body
+from pipeline_tracing import record_remote_steps, span, start_trace
+from request_coalescing import SingleFlight
+from runtime_resilience import (
+    ORCHESTRATION_DEADLINE_SECONDS,
+    CircuitOpenError,
+    Deadline,
+    DeadlineExceeded,
+    call_with_resilience,
+    submit,
+)
+from special_days_calendar import DEFAULT_LOCALE, DEFAULT_TENANT, warm_special_days_calendars
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -63,9 +77,46 @@ CAMPAIGN_AGENT_ARN = os.environ.get(
 AWS_REGION = os.environ.get("AWS_REGION", "us-west-2")
 
 # ---------------------------------------------------------------------------
-# AgentCore Runtime client
+# AgentCore Runtime client — ilk gerçek çağrıda oluşturulur (cold start'ta
+# boto3 yüklenmez)
 # ---------------------------------------------------------------------------
-agentcore_client = boto3.client("bedrock-agentcore", region_name=AWS_REGION)
+_agentcore_client = None
+_agentcore_client_lock = threading.Lock()
+
+
+def get_agentcore_client() -> Any:
+    """bedrock-agentcore boto3 client'ını lazy olarak oluşturup döner."""
+    global _agentcore_client
+    if _agentcore_client is None:
+        with _agentcore_client_lock:
+            if _agentcore_client is None:
+                import boto3
+
+                _agentcore_client = boto3.client("bedrock-agentcore", region_name=AWS_REGION)
+    return _agentcore_client
+
+# Deterministik akışta paralel analiz adımları için (runtime çağrı havuzundan ayrı)
+_step_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="orchestration-step")
+
+# Aynı productData ile eşzamanlı product analysis çağrılarını birleştirir
+product_analysis_flight = SingleFlight("product_analysis")
+
+# Ajanlar arası JSON: girintisiz, boşluksuz ve UTF-8 (Türkçe karakterler \u kaçışsız)
+WIRE_SEPARATORS = (",", ":")
+
+
+def to_wire_json(obj: Any) -> str:
+    """Objeyi ajanlar arası taşıma için kompakt JSON string'e çevirir."""
+    return json.dumps(obj, ensure_ascii=False, separators=WIRE_SEPARATORS)
+
+
+# Runtime çağrılarında kompakt kodlama müzakeresi: "auto" (varsayılan) her
+# istekte desteklenen kodlamaları bildirir ve ajan zarf ile yanıt verdiyse
+# sonraki büyük istekleri o kodlamayla gönderir; "json" müzakereyi kapatır.
+AGENT_WIRE_ENCODING = os.environ.get("AGENT_WIRE_ENCODING", "auto").lower()
+
+# ARN → ajanın kabul ettiği kodlama (ilk zarflı yanıttan öğrenilir)
+_wire_encodings: Dict[str, str] = {}
 
 
 def invoke_agentcore_runtime(agent_arn: str, payload: dict, session_id: str | None = None) -> dict:
@@ -80,56 +131,51 @@ def invoke_agentcore_runtime(agent_arn: str, payload: dict, session_id: str | No
     Returns:
         Agent'ın döndürdüğü parsed JSON response
     """
-    invoke_params: Dict[str, Any] = {
-        "agentRuntimeArn": agent_arn,
-        "payload": json.dumps(payload).encode("utf-8"),
-    }
-    if session_id:
-        invoke_params["runtimeSessionId"] = session_id
-
-    logger.info("Invoking AgentCore Runtime: %s", agent_arn.split("/")[-1])
-
-    response = agentcore_client.invoke_agent_runtime(**invoke_params)
-
-    # Response body'yi oku — StreamingBody döner
-    response_body = response.get("response", b"")
-
-    if hasattr(response_body, "read"):
-        raw = response_body.read()
-    else:
-        raw = response_body if isinstance(response_body, bytes) else str(response_body).encode("utf-8")
-
-    text = raw.decode("utf-8").strip()
-
-    # JSON parse et
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        # JSON bloğu bulmaya çalış (agent bazen text + JSON döner)
-        json_start = text.find("{")
-        json_end = text.rfind("}") + 1
-        if json_start >= 0 and json_end > json_start:
-            try:
-                return json.loads(text[json_start:json_end])
-            except json.JSONDecodeError:
-                pass
-        # Array olabilir
-        json_start = text.find("[")
-        json_end = text.rfind("]") + 1
-        if json_start >= 0 and json_end > json_start:
-            try:
-                return {"data": json.loads(text[json_start:json_end])}
-            except json.JSONDecodeError:
-                pass
-        logger.warning("Agent response JSON olarak parse edilemedi, raw text dönülüyor")
-        return {"raw_response": text}
+    agent_name = agent_arn.split("/")[-1]
+    with span("invoke_agentcore_runtime", agent=agent_name) as sp:
+        encoding = None
+        if AGENT_WIRE_ENCODING == "json":
+            body = to_wire_json(payload).encode("utf-8")
+        else:
+            body, encoding = wire_codec.encode_request(payload, _wire_encodings.get(agent_arn))
+        invoke_params: Dict[str, Any] = {
+            "agentRuntimeArn": agent_arn,
+            "payload": body,
+        }
+        if session_id:
+            invoke_params["runtimeSessionId"] = session_id
+
+        logger.info("Invoking AgentCore Runtime: %s", agent_name)
+
+        response = get_agentcore_client().invoke_agent_runtime(**invoke_params)
+
+        # Response body'yi tek seferde oku — StreamingBody döner
+        raw = read_body(response.get("response", b""))
+
+        parse_start = time.perf_counter()
+        result, answered = wire_codec.decode_response(parse_runtime_response(raw))
+        if answered is not None and _wire_encodings.get(agent_arn) != answered:
+            logger.info("%s kompakt kodlamayı destekliyor: %s", agent_name, answered)
+            _wire_encodings[agent_arn] = answered
+        elif answered is None and _wire_encodings.pop(agent_arn, None) is not None:
+            # Ajan düz JSON döndü (ör. kodek olmadan yeniden deploy edildi): JSON'a dön
+            logger.info("%s artık düz JSON yanıtlıyor, kompakt kodlama kapatıldı", agent_name)
+        if sp is not None:
+            sp.set(
+                bytesOut=len(body),
+                bytesIn=len(raw),
+                wireOut=encoding or "json",
+                wireIn=answered or "json",
+                parseMs=round((time.perf_counter() - parse_start) * 1000, 3),
+            )
+        return result
 
 
 # ---------------------------------------------------------------------------
-# Tool Definitions — Her agent bir @tool olarak sarmalanıyor
+# Tool Definitions — Her agent bir tool olarak sarmalanıyor (strands @tool
+# sarmalaması create_orchestrator_agent içinde, LLM akışında yapılır)
 # ---------------------------------------------------------------------------
 
-@tool
 def analyze_customer_segment(customer_data: str) -> str:
     """
     Müşteri verisini analiz ederek segmentasyon bilgisi üretir.
@@ -154,14 +200,13 @@ def analyze_customer_segment(customer_data: str) -> str:
 
         result = invoke_agentcore_runtime(CUSTOMER_SEGMENT_AGENT_ARN, payload)
         logger.info("Customer segment analysis tamamlandı: %s", data.get("customerId", "N/A"))
-        return json.dumps(result, ensure_ascii=False)
+        return to_wire_json(result)
     except Exception as e:
         error_msg = f"Customer segment analysis hatası: {str(e)}"
         logger.error(error_msg)
         return json.dumps({"error": error_msg})
 
 
-@tool
 def analyze_products(product_data: str) -> str:
     """
     Ürün verisini analiz ederek ürün segmentasyonu ve öneriler üretir.
@@ -186,14 +231,13 @@ def analyze_products(product_data: str) -> str:
 
         result = invoke_agentcore_runtime(PRODUCT_ANALYSIS_AGENT_ARN, data)
         logger.info("Product analysis tamamlandı: %d ürün", len(data.get("products", [])))
-        return json.dumps(result, ensure_ascii=False)
+        return to_wire_json(result)
     except Exception as e:
         error_msg = f"Product analysis hatası: {str(e)}"
         logger.error(error_msg)
         return json.dumps({"error": error_msg})
 
 
-@tool
 def generate_campaign(campaign_input: str) -> str:
     """
     Müşteri segmentasyonu ve ürün analizi sonuçlarını kullanarak kampanya üretir.
@@ -205,7 +249,9 @@ def generate_campaign(campaign_input: str) -> str:
             {
                 "prompt": "Yaz kampanyası oluştur",
                 "customerData": { ... customer segment analysis sonucu ... },
-                "productData": { ... product analysis sonucu ... }
+                "productData": { ... product analysis sonucu ... },
+                "tenantId": "farmasi",  (opsiyonel — özel gün takvimi)
+                "locale": "tr-TR"       (opsiyonel — özel gün takvimi)
             }
 
     Returns:
@@ -217,18 +263,19 @@ def generate_campaign(campaign_input: str) -> str:
         if CAMPAIGN_AGENT_ARN:
             result = invoke_agentcore_runtime(CAMPAIGN_AGENT_ARN, data)
         else:
-            # Campaign agent henüz deploy edilmediyse local fallback
+            # Campaign agent henüz deploy edilmediyse local fallback (JSON turu yok)
             logger.info("Campaign Agent ARN tanımlı değil, local fallback kullanılıyor")
-            from campaign_agent import run_campaign_agent
-            result_str = run_campaign_agent(
+            from campaign_agent import build_campaign_result
+            result = build_campaign_result(
                 prompt=data.get("prompt", ""),
                 customer_data=data.get("customerData"),
                 product_data=data.get("productData"),
+                tenant_id=data.get("tenantId") or DEFAULT_TENANT,
+                locale=data.get("locale") or DEFAULT_LOCALE,
             )
-            result = json.loads(result_str)
 
         logger.info("Campaign generation tamamlandı")
-        return json.dumps(result, ensure_ascii=False)
+        return to_wire_json(result)
     except Exception as e:
         error_msg = f"Campaign generation hatası: {str(e)}"
         logger.error(error_msg)
@@ -288,8 +335,15 @@ Sonucu şu yapıda döndür:
 """
 
 
-def create_orchestrator_agent() -> Agent:
-    """Orchestrator Agent'ı oluşturur."""
+def create_orchestrator_agent() -> Any:
+    """Orchestrator Agent'ı oluşturur.
+
+    Strands / Bedrock model stack'i yalnızca burada (LLM akışında) yüklenir;
+    deterministik akış bu modülleri hiç import etmez.
+    """
+    from strands import Agent, tool
+    from strands.models.bedrock import BedrockModel
+
     model = BedrockModel(
         model_id="anthropic.claude-sonnet-4-20250514",
         region_name=AWS_REGION,
@@ -298,7 +352,7 @@ def create_orchestrator_agent() -> Agent:
     orchestrator = Agent(
         model=model,
         system_prompt=ORCHESTRATOR_SYSTEM_PROMPT,
-        tools=[analyze_customer_segment, analyze_products, generate_campaign],
+        tools=[tool(analyze_customer_segment), tool(analyze_products), tool(generate_campaign)],
     )
     return orchestrator
 
@@ -312,6 +366,9 @@ def orchestrate_campaign(
     customer_data: dict | None = None,
     product_data: dict | None = None,
     use_llm: bool = True,
+    debug: bool = False,
+    deadline_seconds: float | None = None,
+    on_event: Callable[[str, Any], None] | None = None,
 ) -> dict:
     """
     Kampanya üretimi için tam orkestrasyon akışını çalıştırır.
@@ -321,14 +378,23 @@ def orchestrate_campaign(
         customer_data: Müşteri verisi (opsiyonel)
         product_data: Ürün verisi (opsiyonel)
         use_llm: True ise LLM-based orchestrator kullanır, False ise deterministik akış
+        debug: True ise alt ajanlardan adım süreleri de istenir (deterministik akış)
+        deadline_seconds: Orkestrasyon süre sınırı (None ise ORCHESTRATION_DEADLINE_SECONDS)
+        on_event: Ara sonuç callback'i (olay adı, veri) — deterministik akışta
+            "customerInsight" ve "productInsight" hazır oldukça çağrılır
+            (ör. http_gateway SSE akışı)
 
     Returns:
         Orkestrasyon sonucu dict
     """
     if use_llm:
-        return _orchestrate_with_llm(prompt, customer_data, product_data)
+        with span("orchestrate_with_llm"):
+            return _orchestrate_with_llm(prompt, customer_data, product_data)
     else:
-        return _orchestrate_deterministic(prompt, customer_data, product_data)
+        return _orchestrate_deterministic(
+            prompt, customer_data, product_data, debug=debug, deadline_seconds=deadline_seconds,
+            on_event=on_event,
+        )
 
 
 def _orchestrate_with_llm(
@@ -357,50 +423,119 @@ def _orchestrate_with_llm(
 
     # Agent çıktısını parse et
     result_text = str(result)
-    try:
-        json_start = result_text.find("{")
-        json_end = result_text.rfind("}") + 1
-        if json_start >= 0 and json_end > json_start:
-            return json.loads(result_text[json_start:json_end])
-    except json.JSONDecodeError:
-        pass
+    parsed = find_json(result_text, "{")
+    if isinstance(parsed, dict):
+        return parsed
 
     return {"raw_response": result_text}
 
 
+def _call_runtime(agent_arn: str, payload: dict, deadline: Deadline) -> dict:
+    """Runtime'ı circuit breaker, opsiyonel hedging ve deadline ile çağırır."""
+    return call_with_resilience(
+        agent_arn,
+        lambda: invoke_agentcore_runtime(agent_arn, payload),
+        deadline=deadline,
+    )
+
+
+def _await_step(future: Future, label: str, deadline: Deadline, warnings: list) -> tuple[Any, bool]:
+    """Paralel adımın sonucunu deadline içinde bekler.
+
+    Returns:
+        (sonuç veya None, deadline aşıldı mı)
+    """
+    try:
+        return future.result(timeout=deadline.remaining()), False
+    except TimeoutError:
+        warnings.append(f"{label} süre sınırını aştı ({deadline.seconds:.0f}s), kısmi sonuç dönülüyor")
+        logger.warning("%s deadline aşıldı", label)
+        return None, True
+    except CircuitOpenError as e:
+        warnings.append(f"{label} atlandı: {str(e)}")
+        logger.warning("%s atlandı: %s", label, e)
+    except Exception as e:
+        warnings.append(f"{label} hatası: {str(e)}")
+        logger.error("%s hatası: %s", label, e)
+    return None, False
+
+
 def _orchestrate_deterministic(
     prompt: str,
     customer_data: dict | None,
     product_data: dict | None,
+    debug: bool = False,
+    deadline_seconds: float | None = None,
+    on_event: Callable[[str, Any], None] | None = None,
 ) -> dict:
-    """Deterministik akış ile kampanya üretir (LLM kullanmadan)."""
+    """Deterministik akış ile kampanya üretir (LLM kullanmadan).
+
+    Müşteri ve ürün analizleri paralel çalışır; tüm akış bir deadline'a
+    bağlıdır. Süre dolarsa eldeki sonuçlarla ve uyarılarla kısmi yanıt döner.
+    """
     warnings = []
     customer_insight = None
     product_insight = None
+    deadline = Deadline(deadline_seconds or ORCHESTRATION_DEADLINE_SECONDS)
+    partial = False
+    product_shared = False
 
-    # Step 1: Customer segment analysis
-    if customer_data:
+    def _emit(event: str, data: Any) -> None:
+        if on_event is None:
+            return
         try:
-            logger.info("Step 1: Customer segment analysis başlatılıyor...")
-            raw = invoke_agentcore_runtime(CUSTOMER_SEGMENT_AGENT_ARN, {"customerData": customer_data})
-            # Customer agent "analysis" key altında veya "result" key altında dönebilir
-            customer_insight = raw.get("analysis", raw.get("result", raw))
-            logger.info("Customer segment analysis tamamlandı")
+            on_event(event, data)
         except Exception as e:
-            warnings.append(f"Customer segment analysis hatası: {str(e)}")
-            logger.error("Customer segment analysis hatası: %s", e)
+            logger.warning("on_event(%s) hatası: %s", event, e)
+
+    def _customer_step() -> dict:
+        logger.info("Step 1: Customer segment analysis başlatılıyor...")
+        with span("step1.customer_segment"):
+            raw = _call_runtime(
+                CUSTOMER_SEGMENT_AGENT_ARN, {"customerData": customer_data, "explain": False}, deadline
+            )
+        logger.info("Customer segment analysis tamamlandı")
+        # Customer agent "analysis" key altında veya "result" key altında dönebilir
+        return raw.get("analysis", raw.get("result", raw))
+
+    def _product_step() -> dict:
+        nonlocal product_shared
+        logger.info("Step 2: Product analysis başlatılıyor...")
+        product_payload = dict(product_data, debug=True) if debug else product_data
+
+        def _invoke() -> dict:
+            insight = _call_runtime(PRODUCT_ANALYSIS_AGENT_ARN, product_payload, deadline)
+            # Product agent debug modunda analyzer adım sürelerini "_trace" altında döner
+            record_remote_steps(insight.pop("_trace", []), "product_analysis")
+            return insight
+
+        with span("step2.product_analysis") as sp:
+            # Özdeş productData ile eşzamanlı istekler tek runtime çağrısını paylaşır
+            insight, product_shared = product_analysis_flight.do(product_payload, _invoke)
+            if sp is not None:
+                sp.set(coalesced=product_shared)
+        logger.info("Product analysis tamamlandı%s", " (paylaşılan çağrı)" if product_shared else "")
+        return insight
+
+    # Step 1 + 2: Customer segment ve product analysis (birbirinden bağımsız, paralel)
+    customer_future = submit(_customer_step, _step_executor) if customer_data else None
+    product_future = submit(_product_step, _step_executor) if product_data else None
+
+    if customer_future is not None:
+        customer_insight, timed_out = _await_step(
+            customer_future, "Customer segment analysis", deadline, warnings
+        )
+        partial = partial or timed_out
+        _emit("customerInsight", customer_insight)
     else:
         warnings.append("Müşteri verisi sağlanmadı, müşteri analizi atlandı")
 
-    # Step 2: Product analysis
-    if product_data:
-        try:
-            logger.info("Step 2: Product analysis başlatılıyor...")
-            product_insight = invoke_agentcore_runtime(PRODUCT_ANALYSIS_AGENT_ARN, product_data)
-            logger.info("Product analysis tamamlandı")
-        except Exception as e:
-            warnings.append(f"Product analysis hatası: {str(e)}")
-            logger.error("Product analysis hatası: %s", e)
+    if product_future is not None:
+        product_insight, timed_out = _await_step(
+            product_future, "Product analysis", deadline, warnings
+        )
+        partial = partial or timed_out
+        _emit("productInsight", product_insight)
     else:
         warnings.append("Ürün verisi sağlanmadı, ürün analizi atlandı")
 
@@ -410,20 +545,33 @@ def _orchestrate_deterministic(
         "prompt": prompt,
         "customerData": customer_insight,
         "productData": product_insight,
+        # Özel gün takvimi ürün verisinin tenant'ına göre seçilir
+        "tenantId": (product_data or {}).get("tenantId") or DEFAULT_TENANT,
+        "locale": (product_data or {}).get("locale") or DEFAULT_LOCALE,
     }
 
     try:
-        if CAMPAIGN_AGENT_ARN:
-            campaign_result = invoke_agentcore_runtime(CAMPAIGN_AGENT_ARN, campaign_payload)
-        else:
-            from campaign_agent import run_campaign_agent
-            campaign_str = run_campaign_agent(
-                prompt=prompt,
-                customer_data=customer_insight,
-                product_data=product_insight,
-            )
-            campaign_result = json.loads(campaign_str)
+        with span("step3.campaign_generation", local=not CAMPAIGN_AGENT_ARN):
+            if CAMPAIGN_AGENT_ARN:
+                campaign_result = _call_runtime(CAMPAIGN_AGENT_ARN, campaign_payload, deadline)
+            else:
+                # Local campaign agent: insight'lar aynı process'te dict olarak geçer,
+                # sonuç da JSON string'e çevrilip tekrar parse edilmez.
+                from campaign_agent import build_campaign_result
+                campaign_result = build_campaign_result(
+                    prompt=prompt,
+                    customer_data=customer_insight,
+                    product_data=product_insight,
+                    tenant_id=campaign_payload["tenantId"],
+                    locale=campaign_payload["locale"],
+                    use_llm=False,
+                )
         logger.info("Campaign generation tamamlandı")
+    except DeadlineExceeded as e:
+        partial = True
+        warnings.append(f"Campaign generation süre sınırını aştı: {str(e)}")
+        logger.warning("Campaign generation deadline aşıldı: %s", e)
+        campaign_result = {"campaigns": [], "error": str(e)}
     except Exception as e:
         warnings.append(f"Campaign generation hatası: {str(e)}")
         logger.error("Campaign generation hatası: %s", e)
@@ -440,6 +588,8 @@ def _orchestrate_deterministic(
             "productAnalyzed": product_insight is not None,
             "campaignCount": len(campaigns),
             "warnings": warnings,
+            "partial": partial,
+            "productAnalysisShared": product_shared,
         },
     }
 
@@ -450,20 +600,39 @@ def _orchestrate_deterministic(
 
 @app.entrypoint
 def invoke(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Orchestrator Agent'ın AgentCore Runtime entrypoint'i (bkz. handle_invocation)."""
+    return handle_invocation(payload)
+
+
+def handle_invocation(
+    payload: Dict[str, Any],
+    on_event: Callable[[str, Any], None] | None = None,
+) -> Dict[str, Any]:
     """
-    Orchestrator Agent'ın AgentCore Runtime entrypoint'i.
+    Bir orkestratör isteğini işler; AgentCore entrypoint'i ve http_gateway ortak girişi.
 
     Payload formatı:
     {
         "prompt": "Yaz kampanyası oluştur",
         "customerData": { ... },
         "productData": { ... },
-        "useLLM": true/false  (opsiyonel, default: true)
+        "useLLM": true/false  (opsiyonel, default: true),
+        "debug": true/false  (opsiyonel — response'a "_trace" span özeti eklenir),
+        "deadlineSeconds": 30  (opsiyonel — aşılırsa kısmi sonuç + uyarı döner)
     }
+
+    Payload wire_codec zarfı ({"_wire": ..., "data": ...}) olarak da gelebilir;
+    "_wireAccept" verilmişse yanıt müzakere edilen kodlamayla zarflanır.
+
+    on_event verilirse orchestrate_campaign'a iletilir (ara sonuç olayları).
     """
     logger.info("=== Orchestrator Agent invocation started ===")
 
+    response_encoding = None
     try:
+        # Bozuk zarf (base64/zlib/boyut) ValueError olarak aşağıdaki hata yanıtına düşer
+        payload, response_encoding = wire_codec.decode_request(payload)
+
         # Handle Sandbox format: {"prompt": "...json string..."}
         if isinstance(payload, dict) and "prompt" in payload and len(payload) == 1:
             prompt_value = payload["prompt"]
@@ -479,23 +648,32 @@ def invoke(payload: Dict[str, Any]) -> Dict[str, Any]:
         customer_data = payload.get("customerData")
         product_data = payload.get("productData")
         use_llm = payload.get("useLLM", True)
+        debug = bool(payload.get("debug", False))
 
-        result = orchestrate_campaign(
-            prompt=prompt,
-            customer_data=customer_data,
-            product_data=product_data,
-            use_llm=use_llm,
-        )
+        # Export hedefi yoksa trace yalnızca debug özeti için tutulur
+        with start_trace("orchestrator.invoke", force=debug) as trace:
+            result = orchestrate_campaign(
+                prompt=prompt,
+                customer_data=customer_data,
+                product_data=product_data,
+                use_llm=use_llm,
+                debug=debug,
+                deadline_seconds=payload.get("deadlineSeconds"),
+                on_event=on_event,
+            )
+        if debug:
+            result["_trace"] = trace.summary()
+            result["_coalescing"] = product_analysis_flight.stats()
 
         logger.info(
             "=== Orchestrator completed: %d campaigns generated ===",
             result.get("orchestrationSummary", {}).get("campaignCount", 0),
         )
-        return result
+        return wire_codec.encode_response(result, response_encoding)
 
     except Exception as e:
         logger.error("Orchestrator hatası: %s", e, exc_info=True)
-        return {
+        return wire_codec.encode_response({
             "error": str(e),
             "message": "Orchestrator işlemi başarısız oldu",
             "customerInsight": None,
@@ -507,8 +685,27 @@ def invoke(payload: Dict[str, Any]) -> Dict[str, Any]:
                 "campaignCount": 0,
                 "warnings": [str(e)],
             },
-        }
+        }, response_encoding)
+
+
+def warm_start() -> None:
+    """Süreç başlangıcında tek seferlik hazırlıkları yapar (ilk isteğe binmesin).
+
+    Özel gün pencereleri, ürün katalog indeksi (gerekirse diske yazılır) ve
+    fallback yolunun prompt ilgi (BM25) indeksi önceden kurulur; hatalar
+    loglanır, başlangıcı bozmaz.
+    """
+    warm_special_days_calendars()
+    try:
+        from product_catalog import preload_catalog_index
+        from prompt_relevance import get_relevance_index
+
+        preload_catalog_index()
+        get_relevance_index()
+    except Exception as e:
+        logger.warning("Katalog / prompt ilgi indeksi ısıtılamadı: %s", e)
 
 
 if __name__ == "__main__":
+    warm_start()
     app.run()
@@ -0,0 +1,344 @@
+"""Multi-agent pipeline için hafif tracing katmanı.
+
+Orkestrasyon adımları, her `invoke_agentcore_runtime` çağrısı (payload byte'ları,
+JSON parse süresi) ve alt ajanların döndürdüğü adım süreleri span olarak
+kaydedilir. Span'ler:
+
+- `PIPELINE_TRACE_FILE` tanımlıysa JSON Lines olarak dosyaya,
+- `OTEL_EXPORTER_OTLP_ENDPOINT` tanımlıysa OTLP/HTTP JSON olarak collector'a
+
+aktarılır ve debug bayrağıyla response içinde özetlenir. Export istek thread'ini
+bekletmez: trace'ler bir kuyruğa bırakılır, arka plan thread'i bunları
+toplu halde (tek dosya yazımı / tek OTLP POST) gönderir. Hiçbir hedef
+tanımlı değilse ve debug istenmediyse trace hiç başlatılmaz; aktif bir trace
+yoksa `span()` çağrıları hiçbir şey kaydetmez.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import atexit
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = os.environ.get("OTEL_SERVICE_NAME", "campaign-orchestrator")
+TRACE_FILE = os.environ.get("PIPELINE_TRACE_FILE", "")
+OTLP_ENDPOINT = os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT", "")
+TRACING_ENABLED = bool(TRACE_FILE or OTLP_ENDPOINT)
+
+# Arka plan export'u: kuyruk dolarsa trace düşürülür (istek asla beklemez)
+EXPORT_QUEUE_SIZE = int(os.environ.get("PIPELINE_TRACE_QUEUE_SIZE", "1024"))
+EXPORT_BATCH_SIZE = int(os.environ.get("PIPELINE_TRACE_BATCH_SIZE", "64"))
+EXPORT_INTERVAL_SECONDS = float(os.environ.get("PIPELINE_TRACE_EXPORT_INTERVAL_SECONDS", "1"))
+
+
+# ---------------------------------------------------------------------------
+# Span / Trace
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class Span:
+    """Tek bir zamanlanmış işlem."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+
+class Trace:
+    """Bir isteğin tüm span'lerini toplar."""
+
+    def __init__(self, name: str) -> None:
+        self.trace_id = secrets.token_hex(16)
+        self.name = name
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def summary(self) -> Dict[str, Any]:
+        """Response'a eklenecek özet (span'ler başlangıç sırasıyla)."""
+        by_id = {s.span_id: s for s in self.spans}
+
+        def depth(s: Span) -> int:
+            level = 0
+            while s.parent_id in by_id:
+                s = by_id[s.parent_id]
+                level += 1
+            return level
+
+        ordered = sorted(self.spans, key=lambda s: (s.start_ns, depth(s)))
+        items = []
+        for span in ordered:
+            item: Dict[str, Any] = {
+                "name": span.name,
+                "depth": depth(span),
+                "durationMs": round(span.duration_ms, 3),
+            }
+            if span.attributes:
+                item["attributes"] = span.attributes
+            if span.error:
+                item["error"] = span.error
+            items.append(item)
+        root = next((s for s in ordered if s.parent_id is None), None)
+        return {
+            "traceId": self.trace_id,
+            "totalMs": round(root.duration_ms, 3) if root else 0.0,
+            "spans": items,
+        }
+
+
+_current_trace: contextvars.ContextVar[Trace | None] = contextvars.ContextVar(
+    "pipeline_trace", default=None
+)
+_current_span: contextvars.ContextVar[Span | None] = contextvars.ContextVar(
+    "pipeline_span", default=None
+)
+
+
+@contextmanager
+def start_trace(name: str, force: bool = False) -> Iterator[Trace | None]:
+    """Yeni bir trace başlatır; çıkışta span'leri export kuyruğuna bırakır.
+
+    Export hedefi yoksa ve force (ör. debug özeti için) verilmediyse trace
+    oluşturulmaz ve None verilir.
+    """
+    if not (force or TRACING_ENABLED):
+        yield None
+        return
+    trace = Trace(name)
+    trace_token = _current_trace.set(trace)
+    try:
+        with span(name):
+            yield trace
+    finally:
+        _current_trace.reset(trace_token)
+        if TRACING_ENABLED:
+            export_trace(trace)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span | None]:
+    """Aktif trace altında bir span açar; trace yoksa None verir."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    current = Span(
+        name=name,
+        trace_id=trace.trace_id,
+        span_id=secrets.token_hex(8),
+        parent_id=parent.span_id if parent else None,
+        start_ns=time.time_ns(),
+        attributes=dict(attributes),
+    )
+    token = _current_span.set(current)
+    try:
+        yield current
+    except Exception as exc:
+        current.error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+        trace.add(current)
+
+
+def current_trace() -> Trace | None:
+    """Aktif trace'i döner (yoksa None)."""
+    return _current_trace.get()
+
+
+def record_remote_steps(steps: List[Dict[str, Any]], prefix: str) -> None:
+    """Alt ajanın döndürdüğü adım sürelerini aktif span'in çocukları olarak ekler.
+
+    Args:
+        steps: [{"name": str, "durationMs": float}, ...]
+        prefix: Span adı ön eki (ör. "product_analysis")
+    """
+    trace = _current_trace.get()
+    parent = _current_span.get()
+    if trace is None or parent is None:
+        return
+    cursor = parent.start_ns
+    for step in steps:
+        duration_ns = int(float(step.get("durationMs", 0)) * 1_000_000)
+        trace.add(
+            Span(
+                name=f"{prefix}.{step.get('name', '?')}",
+                trace_id=trace.trace_id,
+                span_id=secrets.token_hex(8),
+                parent_id=parent.span_id,
+                start_ns=cursor,
+                end_ns=cursor + duration_ns,
+                attributes={"remote": True},
+            )
+        )
+        cursor += duration_ns
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(*traces: Trace) -> Dict[str, Any]:
+    """Trace'leri tek bir OTLP/HTTP JSON (ExportTraceServiceRequest) gövdesine çevirir."""
+    spans = []
+    for s in (s for trace in traces for s in trace.spans):
+        item: Dict[str, Any] = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": 1,
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        }
+        if s.parent_id:
+            item["parentSpanId"] = s.parent_id
+        spans.append(item)
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]
+                },
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+            }
+        ]
+    }
+
+
+def _write_batch(traces: List[Trace]) -> None:
+    """Bir trace grubunu yapılandırılmış hedeflere yazar; hatalar loglanır."""
+    if TRACE_FILE:
+        try:
+            with open(TRACE_FILE, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(to_otlp(trace), ensure_ascii=False) + "\n" for trace in traces)
+        except OSError as e:
+            logger.warning("Trace dosyaya yazılamadı: %s", e)
+
+    if OTLP_ENDPOINT:
+        request = urllib.request.Request(
+            OTLP_ENDPOINT.rstrip("/") + "/v1/traces",
+            data=json.dumps(to_otlp(*traces)).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            urllib.request.urlopen(request, timeout=2).close()
+        except Exception as e:
+            logger.warning("Trace OTLP collector'a gönderilemedi (%d trace): %s", len(traces), e)
+
+
+class _TraceExporter:
+    """Trace'leri kuyruktan alıp EXPORT_BATCH_SIZE'lık gruplar halinde yazan daemon thread."""
+
+    def __init__(self) -> None:
+        self._queue: queue.Queue = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def submit(self, trace: Trace) -> None:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Trace export kuyruğu dolu, trace düşürüldü (toplam %d)", self.dropped)
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """Kuyrukta bekleyen trace'ler yazılana kadar bekler; süre dolduysa False."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + EXPORT_INTERVAL_SECONDS
+            while len(batch) < EXPORT_BATCH_SIZE and not isinstance(batch[-1], threading.Event):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            traces = [item for item in batch if isinstance(item, Trace)]
+            if traces:
+                try:
+                    _write_batch(traces)
+                except Exception as e:
+                    logger.warning("Trace export hatası: %s", e)
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+
+_exporter = _TraceExporter()
+atexit.register(_exporter.flush)
+
+
+def export_trace(trace: Trace) -> None:
+    """Trace'i arka plan export kuyruğuna bırakır; istek thread'ini bekletmez."""
+    _exporter.submit(trace)
+
+
+def flush_traces(timeout: float = 2.0) -> bool:
+    """Kuyruktaki trace'lerin yazılmasını bekler (kapanış / testler için)."""
+    return _exporter.flush(timeout)
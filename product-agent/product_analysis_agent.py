@@ -8,8 +8,178 @@ This agent implements a model-driven architecture, leveraging AI capabilities
 for planning, reasoning, tool calling, and self-reflection.
 """
 
+import itertools
 import json
-from typing import Dict, List, Tuple, Any
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple, Any
+
+from sales_windows import STOCK_RATE_WINDOW, SalesWindows, parse_order_date
+from step_diagnostics import (
+    PROFILE_INTERVAL_MS, REQUEST_DIAGNOSTICS_ENABLED, STEP_HISTOGRAMS, STEP_METRICS_ENABLED, SamplingProfiler,
+    StepHistograms, acquire_tracemalloc, release_tracemalloc
+)
+from tenant_settings import DEFAULT_THRESHOLDS, TenantThresholds, get_tenant_thresholds
+
+try:
+    from wire_codec import decode_request, encode_response
+except ImportError:  # deployed without the shared codec: plain JSON only
+    def decode_request(payload):
+        return payload, None
+
+    def encode_response(result, encoding):
+        return result
+
+
+# ---------------------------------------------------------------------------
+# Precompiled rule tables
+#
+# The segmentation and recommendation rules below are written once as plain
+# priority-ordered chains and evaluated for every combination of their inputs
+# at import time. Per-product classification is then a handful of dict/tuple
+# lookups on small integer codes instead of a chain of string comparisons.
+# Any value outside a vocabulary maps to its trailing "other" code, which the
+# rules treat exactly like the original chains treat an unknown string.
+# ---------------------------------------------------------------------------
+
+PERFORMANCE_SEGMENTS = ("Star", "Rising", "Steady", "Underperformer")
+STOCK_SEGMENTS = ("Critical", "Healthy", "Excess")
+SEASONAL_RELEVANCE_LEVELS = ("HIGH", "MEDIUM", "LOW")
+LIFECYCLE_STAGES = ("NEW", "GROWTH", "MATURE", "DECLINING")
+MARGIN_HEALTH_LEVELS = ("EXCELLENT", "GOOD", "MODERATE", "POOR")
+
+# Trend score bands: >85, (80, 85], [60, 80], otherwise
+TREND_BANDS = 4
+# Stock day bands: <star, [star, steady), otherwise (30 / 60 by default, see
+# TenantThresholds); the rules below are written with the default cutoffs
+STOCK_DAY_BANDS = 3
+
+
+def _codes(vocabulary: tuple) -> Dict[str, int]:
+    return {value: code for code, value in enumerate(vocabulary)}
+
+
+PERFORMANCE_CODES = _codes(PERFORMANCE_SEGMENTS)
+STOCK_CODES = _codes(STOCK_SEGMENTS)
+SEASONAL_RELEVANCE_CODES = _codes(SEASONAL_RELEVANCE_LEVELS)
+LIFECYCLE_CODES = _codes(LIFECYCLE_STAGES)
+MARGIN_HEALTH_CODES = _codes(MARGIN_HEALTH_LEVELS)
+
+
+def _performance_rule(is_new: bool, trend_score: float, stock_days: float) -> str:
+    """Reference performance rules, in priority order."""
+    # Rising: lifecycleStage == "NEW" AND trendScore > 85
+    if is_new and trend_score > 85:
+        return "Rising"
+
+    # Star: trendScore > 80 AND stockDays < 30
+    if trend_score > 80 and stock_days < 30:
+        return "Star"
+
+    # Steady: 60 <= trendScore <= 80 AND stockDays < 60
+    if 60 <= trend_score <= 80 and stock_days < 60:
+        return "Steady"
+
+    # Underperformer: otherwise
+    return "Underperformer"
+
+
+def _recommendation_rule(performance_segment: str, stock_segment: str, seasonal_relevance: str,
+                         lifecycle_stage: str, margin_health: str) -> Tuple[str, str]:
+    """Reference recommendation rules, in priority order."""
+    # Priority 1: Star + Critical stock → RESTOCK, CRITICAL
+    if performance_segment == "Star" and stock_segment == "Critical":
+        return ("RESTOCK", "CRITICAL")
+
+    # Priority 2: Rising → FEATURE, HIGH
+    if performance_segment == "Rising":
+        return ("FEATURE", "HIGH")
+
+    # Priority 3: Star + Healthy stock → PROMOTE, HIGH
+    if performance_segment == "Star" and stock_segment == "Healthy":
+        return ("PROMOTE", "HIGH")
+
+    # Priority 4: HIGH seasonal relevance + not Critical → SEASONAL_PUSH, MEDIUM
+    if seasonal_relevance == "HIGH" and stock_segment != "Critical":
+        return ("SEASONAL_PUSH", "MEDIUM")
+
+    # Priority 5: Excess + DECLINING → CLEARANCE, CRITICAL
+    if stock_segment == "Excess" and lifecycle_stage == "DECLINING":
+        return ("CLEARANCE", "CRITICAL")
+
+    # Priority 6: Excess + MODERATE margin → BUNDLE, HIGH
+    if stock_segment == "Excess" and margin_health == "MODERATE":
+        return ("BUNDLE", "HIGH")
+
+    # Priority 7: Underperformer → DISCOUNT, MEDIUM
+    if performance_segment == "Underperformer":
+        return ("DISCOUNT", "MEDIUM")
+
+    # Priority 8: Default → MAINTAIN, LOW
+    return ("MAINTAIN", "LOW")
+
+
+def _build_performance_table() -> Tuple[str, ...]:
+    # One representative value per band
+    trend_samples = (90, 82, 70, 0)
+    stock_day_samples = (0, 45, 999)
+    return tuple(
+        _performance_rule(is_new, trend_samples[t], stock_day_samples[d])
+        for is_new in (False, True)
+        for t in range(TREND_BANDS)
+        for d in range(STOCK_DAY_BANDS)
+    )
+
+
+def _build_recommendation_table() -> Tuple[Tuple[str, str], ...]:
+    # The trailing "" stands in for any value outside the vocabulary
+    return tuple(
+        _recommendation_rule(perf, stock, seasonal, lifecycle, margin)
+        for perf in PERFORMANCE_SEGMENTS + ("",)
+        for stock in STOCK_SEGMENTS + ("",)
+        for seasonal in SEASONAL_RELEVANCE_LEVELS + ("",)
+        for lifecycle in LIFECYCLE_STAGES + ("",)
+        for margin in MARGIN_HEALTH_LEVELS + ("",)
+    )
+
+
+# Index strides for the flattened recommendation table
+_MARGIN_STRIDE = 1
+_LIFECYCLE_STRIDE = (len(MARGIN_HEALTH_LEVELS) + 1) * _MARGIN_STRIDE
+_SEASONAL_STRIDE = (len(LIFECYCLE_STAGES) + 1) * _LIFECYCLE_STRIDE
+_STOCK_STRIDE = (len(SEASONAL_RELEVANCE_LEVELS) + 1) * _SEASONAL_STRIDE
+_PERFORMANCE_STRIDE = (len(STOCK_SEGMENTS) + 1) * _STOCK_STRIDE
+
+PERFORMANCE_TABLE = _build_performance_table()
+RECOMMENDATION_TABLE = _build_recommendation_table()
+SEASON_BY_MONTH = {
+    1: "WINTER", 2: "WINTER", 3: "SPRING", 4: "SPRING", 5: "SPRING", 6: "SUMMER",
+    7: "SUMMER", 8: "SUMMER", 9: "FALL", 10: "FALL", 11: "FALL", 12: "WINTER",
+}
+
+
+def recommendation_index(performance_segment: str, stock_segment: str, seasonal_relevance: str,
+                         lifecycle_stage: str, margin_health: str) -> int:
+    """Flattened RECOMMENDATION_TABLE index for a combination of segment values."""
+    return (
+        PERFORMANCE_CODES.get(performance_segment, len(PERFORMANCE_SEGMENTS)) * _PERFORMANCE_STRIDE
+        + STOCK_CODES.get(stock_segment, len(STOCK_SEGMENTS)) * _STOCK_STRIDE
+        + SEASONAL_RELEVANCE_CODES.get(seasonal_relevance, len(SEASONAL_RELEVANCE_LEVELS)) * _SEASONAL_STRIDE
+        + LIFECYCLE_CODES.get(lifecycle_stage, len(LIFECYCLE_STAGES)) * _LIFECYCLE_STRIDE
+        + MARGIN_HEALTH_CODES.get(margin_health, len(MARGIN_HEALTH_LEVELS))
+    )
+
+
+# In-vocabulary combinations keyed by their string values, so the common case
+# is a single hash lookup; anything else falls back to the coded table.
+RECOMMENDATION_BY_KEY = {
+    key: RECOMMENDATION_TABLE[recommendation_index(*key)]
+    for key in itertools.product(PERFORMANCE_SEGMENTS, STOCK_SEGMENTS, SEASONAL_RELEVANCE_LEVELS,
+                                 LIFECYCLE_STAGES, MARGIN_HEALTH_LEVELS)
+}
 
 
 class InputValidator:
@@ -39,12 +209,26 @@ class InputValidator:
         if len(input_data['products']) == 0:
             return (False, "Products array cannot be empty")
         
-        # Validate orderHistory presence and type
-        if 'orderHistory' not in input_data:
+        # Validate orderHistory presence and type (optional when salesSummary is given)
+        if 'orderHistory' not in input_data and 'salesSummary' not in input_data:
             return (False, "Missing required field: orderHistory")
-        if not isinstance(input_data['orderHistory'], list):
+        if 'orderHistory' in input_data and not isinstance(input_data['orderHistory'], list):
             return (False, "Invalid data type for orderHistory: expected list")
         
+        # Validate salesSummary type: {productId: quantity90d or [daily quantities]}
+        if 'salesSummary' in input_data:
+            sales_summary = input_data['salesSummary']
+            if not isinstance(sales_summary, dict):
+                return (False, "Invalid data type for salesSummary: expected dict")
+            for product_id, sales in sales_summary.items():
+                buckets = sales if isinstance(sales, list) else [sales]
+                if not all(isinstance(q, (int, float)) and not isinstance(q, bool) for q in buckets):
+                    return (False, f"Invalid salesSummary for {product_id}: expected number or list of numbers")
+        
+        # Validate optional asOfDate (reference date for sales windows)
+        if 'asOfDate' in input_data and parse_order_date(input_data['asOfDate']) is None:
+            return (False, "Invalid asOfDate: expected ISO date string (YYYY-MM-DD)")
+        
         # Validate currentMonth presence and type
         if 'currentMonth' not in input_data:
             return (False, "Missing required field: currentMonth")
@@ -65,25 +249,9 @@ class InputValidator:
 class StockAnalyzer:
     """Calculates stock metrics and classifies stock segments."""
 
-    def calculate_daily_sales_rate(self, product_id: str, order_history: list) -> float:
-        """
-        Calculate average daily sales over 90 days.
-
-        Args:
-            product_id: Product identifier
-            order_history: List of order dictionaries
-
-        Returns:
-            Daily sales rate (total sales / 90)
-        """
-        total_sales = 0
-        for order in order_history:
-            if 'items' in order:
-                for item in order['items']:
-                    if item.get('productId') == product_id:
-                        total_sales += item.get('quantity', 0)
-
-        return total_sales / 90.0
+    def __init__(self, rate_window: str = STOCK_RATE_WINDOW):
+        # Sales window behind dailySalesRate/stockDays: days ("90") or "ewma"
+        self.rate_window = rate_window
 
     def calculate_stock_days(self, stock: int, daily_sales_rate: float) -> float:
         """
@@ -100,30 +268,42 @@ class StockAnalyzer:
             return 999.0
         return stock / daily_sales_rate
 
-    def classify_stock_segment(self, stock_days: float) -> str:
+    def classify_stock_segment(self, stock_days: float,
+                               thresholds: TenantThresholds = DEFAULT_THRESHOLDS) -> str:
         """
-        Classify as Critical (<15), Healthy (15-60), or Excess (>60).
+        Classify as Critical (<15), Healthy (15-60), or Excess (>60) with the
+        default thresholds; tenants may move both cutoffs.
 
         Args:
             stock_days: Days of inventory remaining
+            thresholds: Tenant thresholds
 
         Returns:
             Stock segment classification
         """
-        if stock_days < 15:
-            return "Critical"
-        elif stock_days <= 60:
-            return "Healthy"
-        else:
-            return "Excess"
+        return thresholds.classify_stock_segment(stock_days)
 
-    def analyze(self, products: list, order_history: list) -> dict:
+    def analyze(self, products: list, order_history: list, sales_summary: Optional[dict] = None,
+                as_of: Any = None, sales_windows: Optional[SalesWindows] = None,
+                thresholds: Optional[TenantThresholds] = None) -> dict:
         """
         Analyzes stock levels for all products.
 
+        Order lines are bucketed by day once (sales_windows.SalesWindows), so
+        every product's window rates are O(1) lookups instead of a scan of the
+        whole order history.
+
         Args:
-            products: List of product dictionaries
+            products: List of product dictionaries (or shared_catalog.CatalogRow views)
             order_history: List of order dictionaries
+            sales_summary: Optional pre-aggregated sales ({productId: quantity90d}
+                or {productId: [daily quantities, oldest first]}); when given,
+                order_history is not scanned
+            as_of: As-of date for the sales windows (defaults to the latest order date)
+            sales_windows: Prebuilt SalesWindows or SalesRateIndex (streaming
+                mode reuses one across product chunks); overrides
+                order_history/sales_summary
+            thresholds: Tenant thresholds (defaults to DEFAULT_THRESHOLDS)
 
         Returns:
             Dictionary mapping productId to stock metrics:
@@ -132,33 +312,43 @@ class StockAnalyzer:
                     dailySalesRate: float,
                     stockDays: float,
                     stockSegment: str,
-                    inventoryPressure: bool
+                    inventoryPressure: bool,
+                    salesRates: {7d, 30d, 90d, ewma}
                 }
             }
         """
         stock_metrics = {}
+        thresholds = thresholds or DEFAULT_THRESHOLDS
+        classify_stock_segment = thresholds.classify_stock_segment
+        excess_stock_days = thresholds.excess_stock_days
+        if sales_windows is None:
+            if sales_summary is not None:
+                sales_windows = SalesWindows.from_summary(sales_summary)
+            else:
+                sales_windows = SalesWindows.from_orders(order_history, as_of)
 
         for product in products:
             product_id = product.get('productId')
             stock = product.get('stock', 0)
 
             # Calculate daily sales rate
-            daily_sales_rate = self.calculate_daily_sales_rate(product_id, order_history)
+            daily_sales_rate = sales_windows.stock_rate(product_id, self.rate_window)
 
             # Calculate stock days
             stock_days = self.calculate_stock_days(stock, daily_sales_rate)
 
             # Classify stock segment
-            stock_segment = self.classify_stock_segment(stock_days)
+            stock_segment = classify_stock_segment(stock_days)
 
             # Set inventory pressure flag
-            inventory_pressure = stock_days > 60
+            inventory_pressure = stock_days > excess_stock_days
 
             stock_metrics[product_id] = {
                 'dailySalesRate': daily_sales_rate,
                 'stockDays': stock_days,
                 'stockSegment': stock_segment,
-                'inventoryPressure': inventory_pressure
+                'inventoryPressure': inventory_pressure,
+                'salesRates': sales_windows.rates(product_id)
             }
 
         return stock_metrics
@@ -168,42 +358,50 @@ class StockAnalyzer:
 class PerformanceSegmenter:
     """Classifies products into performance segments."""
     
-    def classify_performance(self, product: dict, stock_days: float) -> str:
+    def classify_performance(self, product: dict, stock_days: float,
+                             thresholds: TenantThresholds = DEFAULT_THRESHOLDS) -> str:
         """
         Classify performance segment.
         
         Args:
             product: Product dictionary with lifecycleStage and trendScore
             stock_days: Days of inventory remaining
+            thresholds: Tenant thresholds (Star / Steady stockDays cutoffs,
+                        30 / 60 by default, follow stockDaysThreshold)
         
         Returns:
             Performance segment: Star, Rising, Steady, or Underperformer
         """
-        lifecycle_stage = product.get('lifecycleStage', '')
         trend_score = product.get('trendScore', 0)
         
-        # Rising: lifecycleStage == "NEW" AND trendScore > 85
-        if lifecycle_stage == "NEW" and trend_score > 85:
-            return "Rising"
-        
-        # Star: trendScore > 80 AND stockDays < 30
-        if trend_score > 80 and stock_days < 30:
-            return "Star"
-        
-        # Steady: 60 <= trendScore <= 80 AND stockDays < 60
-        if 60 <= trend_score <= 80 and stock_days < 60:
-            return "Steady"
+        # Bands match TREND_BANDS / STOCK_DAY_BANDS
+        if trend_score > 85:
+            band = 0
+        elif trend_score > 80:
+            band = 1
+        elif 60 <= trend_score <= 80:
+            band = 2
+        else:
+            band = 3
+        if stock_days < thresholds.star_stock_days:
+            day_band = 0
+        elif stock_days < thresholds.steady_stock_days:
+            day_band = 1
+        else:
+            day_band = 2
         
-        # Underperformer: otherwise
-        return "Underperformer"
+        is_new = product.get('lifecycleStage', '') == "NEW"
+        return PERFORMANCE_TABLE[(is_new * TREND_BANDS + band) * STOCK_DAY_BANDS + day_band]
     
-    def calculate_margin_health(self, cost: float, base_price: float) -> Tuple[float, str]:
+    def calculate_margin_health(self, cost: float, base_price: float,
+                                thresholds: TenantThresholds = DEFAULT_THRESHOLDS) -> Tuple[float, str]:
         """
         Calculate margin percentage and health classification.
         
         Args:
             cost: Product cost
             base_price: Product base price
+            thresholds: Tenant thresholds (margin bands >60 / >40 / >marginFloor)
         
         Returns:
             Tuple of (margin percentage, margin health classification)
@@ -214,17 +412,7 @@ class PerformanceSegmenter:
         
         margin = ((base_price - cost) / base_price) * 100
         
-        # Classify margin health
-        if margin > 60:
-            margin_health = "EXCELLENT"
-        elif margin > 40:
-            margin_health = "GOOD"
-        elif margin > 25:
-            margin_health = "MODERATE"
-        else:
-            margin_health = "POOR"
-        
-        return (margin, margin_health)
+        return (margin, thresholds.classify_margin(margin))
     
     def classify_price_segment(self, base_price: float) -> str:
         """
@@ -243,13 +431,15 @@ class PerformanceSegmenter:
         else:
             return "PREMIUM"
     
-    def segment(self, products: list, stock_metrics: dict) -> dict:
+    def segment(self, products: list, stock_metrics: dict,
+                thresholds: Optional[TenantThresholds] = None) -> dict:
         """
         Segments products by performance.
         
         Args:
-            products: List of product dictionaries
+            products: List of product dictionaries (or shared_catalog.CatalogRow views)
             stock_metrics: Stock analysis results from StockAnalyzer
+            thresholds: Tenant thresholds (defaults to DEFAULT_THRESHOLDS)
         
         Returns:
             Dictionary mapping productId to performance metrics:
@@ -263,6 +453,7 @@ class PerformanceSegmenter:
             }
         """
         performance_metrics = {}
+        thresholds = thresholds or DEFAULT_THRESHOLDS
         
         for product in products:
             product_id = product.get('productId')
@@ -271,12 +462,12 @@ class PerformanceSegmenter:
             stock_days = stock_metrics.get(product_id, {}).get('stockDays', 999)
             
             # Classify performance segment
-            performance_segment = self.classify_performance(product, stock_days)
+            performance_segment = self.classify_performance(product, stock_days, thresholds)
             
             # Calculate margin and margin health
             cost = product.get('cost', 0)
             base_price = product.get('basePrice', 0)
-            margin, margin_health = self.calculate_margin_health(cost, base_price)
+            margin, margin_health = self.calculate_margin_health(cost, base_price, thresholds)
             
             # Classify price segment
             price_segment = self.classify_price_segment(base_price)
@@ -304,14 +495,7 @@ class SeasonalAnalyzer:
         Returns:
             Season string: SPRING, SUMMER, FALL, or WINTER
         """
-        if month in [3, 4, 5]:
-            return "SPRING"
-        elif month in [6, 7, 8]:
-            return "SUMMER"
-        elif month in [9, 10, 11]:
-            return "FALL"
-        else:  # 12, 1, 2
-            return "WINTER"
+        return SEASON_BY_MONTH.get(month, "WINTER")
     
     def check_season_match(self, product: dict, current_season: str) -> bool:
         """
@@ -386,7 +570,7 @@ class SeasonalAnalyzer:
         Analyzes seasonal relevance for products.
         
         Args:
-            products: List of product dictionaries
+            products: List of product dictionaries (or shared_catalog.CatalogRow views)
             current_month: Current month (1-12)
             climate_data: Climate data by city
         
@@ -457,46 +641,101 @@ class CategoryAnalyzer:
                 }
             }
         """
-        category_data = {}
+        return self.finalize_totals(self.accumulate({}, products, performance_metrics, stock_metrics))
 
-        # Group products by category
-        for product in products:
-            category = product.get('category', 'Unknown')
+    def accumulate(self, totals: dict, products: list, performance_metrics: dict,
+                   stock_metrics: dict, positions: Optional[list] = None) -> dict:
+        """
+        Adds a chunk of products to running per-category totals.
+
+        Memory stays O(categories) however many products are streamed
+        through. Chunks must arrive in catalog order; totals of disjoint
+        product shards are combined with merge_totals().
+
+        Args:
+            totals: Running totals from previous chunks ({} to start)
+            products: List of product dictionaries
+            performance_metrics: Performance segmentation results
+            stock_metrics: Stock analysis results
+            positions: Catalog position of each product (needed by merge_totals())
 
-            if category not in category_data:
-                category_data[category] = {
-                    'products': [],
-                    'trendScores': [],
-                    'stocks': [],
-                    'stockDays': [],
+        Returns:
+            Updated totals, to be passed to finalize_totals()
+        """
+        for index, product in enumerate(products):
+            category = product.get('category', 'Unknown')
+            data = totals.get(category)
+            if data is None:
+                data = totals[category] = {
+                    'firstPosition': positions[index] if positions is not None else None,
+                    'totalProducts': 0,
+                    'trendScore': 0,
+                    'stock': 0,
+                    'stockDays': 0,
                     'topPerformers': 0,
                     'underperformers': 0
                 }
 
-            # Add product data
-            category_data[category]['products'].append(product)
-            category_data[category]['trendScores'].append(product.get('trendScore', 0))
-            category_data[category]['stocks'].append(product.get('stock', 0))
-
-            # Get stock days
             product_id = product.get('productId')
-            stock_days = stock_metrics.get(product_id, {}).get('stockDays', 0)
-            category_data[category]['stockDays'].append(stock_days)
+            data['totalProducts'] += 1
+            data['trendScore'] += product.get('trendScore', 0)
+            data['stock'] += product.get('stock', 0)
+            data['stockDays'] += stock_metrics.get(product_id, {}).get('stockDays', 0)
 
-            # Count top performers and underperformers
             performance_segment = performance_metrics.get(product_id, {}).get('performanceSegment', '')
             if performance_segment in ['Star', 'Rising']:
-                category_data[category]['topPerformers'] += 1
+                data['topPerformers'] += 1
             elif performance_segment == 'Underperformer':
-                category_data[category]['underperformers'] += 1
+                data['underperformers'] += 1
+
+        return totals
+
+    def merge_totals(self, partials: list) -> dict:
+        """
+        Combines accumulate() totals from disjoint product shards.
 
-        # Calculate aggregated metrics for each category
+        Categories keep their first-seen catalog order. Float sums are added
+        shard by shard, so averages can differ from a single pass in the last
+        bit before rounding.
+
+        Args:
+            partials: Totals returned by accumulate() with positions
+
+        Returns:
+            Totals equivalent to accumulate() over the whole catalog
+        """
+        first_seen = {}
+        for partial in partials:
+            for category, data in partial.items():
+                position = data['firstPosition']
+                if category not in first_seen or position < first_seen[category]:
+                    first_seen[category] = position
+
+        merged = {}
+        for category in sorted(first_seen, key=first_seen.get):
+            parts = [partial[category] for partial in partials if category in partial]
+            data = {'firstPosition': first_seen[category]}
+            for field in ('totalProducts', 'trendScore', 'stock', 'stockDays', 'topPerformers', 'underperformers'):
+                data[field] = sum(part[field] for part in parts)
+            merged[category] = data
+        return merged
+
+    def finalize_totals(self, totals: dict) -> dict:
+        """
+        Calculates aggregated metrics from per-category totals.
+
+        Args:
+            totals: Per-category sums and counts (see accumulate())
+
+        Returns:
+            Dictionary mapping category to aggregated metrics
+        """
         result = {}
-        for category, data in category_data.items():
-            total_products = len(data['products'])
-            avg_trend_score = sum(data['trendScores']) / total_products if total_products > 0 else 0
-            total_stock = sum(data['stocks'])
-            avg_stock_days = sum(data['stockDays']) / total_products if total_products > 0 else 0
+        for category, data in totals.items():
+            total_products = data['totalProducts']
+            avg_trend_score = data['trendScore'] / total_products if total_products > 0 else 0
+            total_stock = data['stock']
+            avg_stock_days = data['stockDays'] / total_products if total_products > 0 else 0
 
             # Determine performance rating
             if avg_trend_score > 80:
@@ -545,31 +784,73 @@ class PriceSegmentAnalyzer:
                 PREMIUM: {...}
             }
         """
-        # Initialize segments
-        segments = {
-            "BUDGET": {"priceRange": "0-200 TL", "products": []},
-            "MID": {"priceRange": "200-500 TL", "products": []},
-            "PREMIUM": {"priceRange": "500+ TL", "products": []}
-        }
+        return self.finalize_totals(self.accumulate(None, products, performance_metrics, stock_metrics))
+
+    def accumulate(self, totals: Optional[dict], products: list, performance_metrics: dict,
+                   stock_metrics: dict) -> dict:
+        """
+        Adds a chunk of products to running per-segment totals.
+
+        Args:
+            totals: Running totals from previous chunks (None to start)
+            products: List of product dictionaries
+            performance_metrics: Performance segmentation results
+            stock_metrics: Stock analysis results
+
+        Returns:
+            Updated totals, to be passed to finalize_totals()
+        """
+        if totals is None:
+            totals = {
+                segment_name: {"priceRange": price_range, "productCount": 0, "trendScore": 0, "healthy": 0}
+                for segment_name, price_range in (
+                    ("BUDGET", "0-200 TL"), ("MID", "200-500 TL"), ("PREMIUM", "500+ TL")
+                )
+            }
 
-        # Group products by price segment
         for product in products:
             product_id = product["productId"]
-            perf_metrics = performance_metrics.get(product_id, {})
-            price_segment = perf_metrics.get("priceSegment")
+            segment = totals.get(performance_metrics.get(product_id, {}).get("priceSegment"))
+            if segment is not None:
+                segment["productCount"] += 1
+                segment["trendScore"] += product.get("trendScore", 0)
+                if stock_metrics.get(product_id, {}).get("stockSegment", "") == "Healthy":
+                    segment["healthy"] += 1
 
-            if price_segment in segments:
-                segments[price_segment]["products"].append({
-                    "productId": product_id,
-                    "trendScore": product.get("trendScore", 0),
-                    "stockSegment": stock_metrics.get(product_id, {}).get("stockSegment", "")
-                })
+        return totals
+
+    def merge_totals(self, partials: list) -> dict:
+        """
+        Combines accumulate() totals from disjoint product shards.
 
+        Args:
+            partials: Totals returned by accumulate()
+
+        Returns:
+            Totals equivalent to accumulate() over the whole catalog
+        """
+        merged = self.accumulate(None, [], {}, {})
+        for partial in partials:
+            for segment_name, segment_data in partial.items():
+                segment = merged[segment_name]
+                for field in ("productCount", "trendScore", "healthy"):
+                    segment[field] += segment_data[field]
+        return merged
+
+    def finalize_totals(self, totals: dict) -> dict:
+        """
+        Calculates price segment metrics from per-segment totals.
+
+        Args:
+            totals: Per-segment sums and counts (see accumulate())
+
+        Returns:
+            Dictionary with price segment analysis
+        """
         # Calculate metrics for each segment
         result = {}
-        for segment_name, segment_data in segments.items():
-            products_in_segment = segment_data["products"]
-            product_count = len(products_in_segment)
+        for segment_name, segment_data in totals.items():
+            product_count = segment_data["productCount"]
 
             if product_count == 0:
                 # No products in this segment
@@ -581,12 +862,10 @@ class PriceSegmentAnalyzer:
                 }
             else:
                 # Calculate avgTrendScore
-                total_trend_score = sum(p["trendScore"] for p in products_in_segment)
-                avg_trend_score = total_trend_score / product_count
+                avg_trend_score = segment_data["trendScore"] / product_count
 
                 # Calculate stockHealth based on proportion of Healthy stock products
-                healthy_count = sum(1 for p in products_in_segment if p["stockSegment"] == "Healthy")
-                healthy_proportion = healthy_count / product_count
+                healthy_proportion = segment_data["healthy"] / product_count
 
                 # Determine stockHealth
                 if healthy_proportion > 0.70:
@@ -634,42 +913,51 @@ class RecommendationEngine:
         7. Underperformer → DISCOUNT, MEDIUM
         8. Default → MAINTAIN, LOW
         """
-        performance_segment = performance_metrics.get("performanceSegment", "")
-        stock_segment = stock_metrics.get("stockSegment", "")
-        seasonal_relevance = seasonal_metrics.get("seasonalRelevance", "")
-        lifecycle_stage = product.get("lifecycleStage", "")
-        margin_health = performance_metrics.get("marginHealth", "")
-
-        # Priority 1: Star + Critical stock → RESTOCK, CRITICAL
-        if performance_segment == "Star" and stock_segment == "Critical":
-            return ("RESTOCK", "CRITICAL")
-
-        # Priority 2: Rising → FEATURE, HIGH
-        if performance_segment == "Rising":
-            return ("FEATURE", "HIGH")
-
-        # Priority 3: Star + Healthy stock → PROMOTE, HIGH
-        if performance_segment == "Star" and stock_segment == "Healthy":
-            return ("PROMOTE", "HIGH")
-
-        # Priority 4: HIGH seasonal relevance + not Critical → SEASONAL_PUSH, MEDIUM
-        if seasonal_relevance == "HIGH" and stock_segment != "Critical":
-            return ("SEASONAL_PUSH", "MEDIUM")
-
-        # Priority 5: Excess + DECLINING → CLEARANCE, CRITICAL
-        if stock_segment == "Excess" and lifecycle_stage == "DECLINING":
-            return ("CLEARANCE", "CRITICAL")
+        key = (
+            performance_metrics.get("performanceSegment", ""),
+            stock_metrics.get("stockSegment", ""),
+            seasonal_metrics.get("seasonalRelevance", ""),
+            product.get("lifecycleStage", ""),
+            performance_metrics.get("marginHealth", ""),
+        )
+        result = RECOMMENDATION_BY_KEY.get(key)
+        if result is None:
+            result = RECOMMENDATION_TABLE[recommendation_index(*key)]
+        return result
 
-        # Priority 6: Excess + MODERATE margin → BUNDLE, HIGH
-        if stock_segment == "Excess" and margin_health == "MODERATE":
-            return ("BUNDLE", "HIGH")
+    def recommend_all(self, products: list, performance_metrics: dict,
+                      stock_metrics: dict, seasonal_metrics: dict) -> dict:
+        """
+        Generates recommendations for every product in one pass.
 
-        # Priority 7: Underperformer → DISCOUNT, MEDIUM
-        if performance_segment == "Underperformer":
-            return ("DISCOUNT", "MEDIUM")
+        Args:
+            products: List of product dictionaries
+            performance_metrics: Performance segmentation by productId
+            stock_metrics: Stock analysis by productId
+            seasonal_metrics: Seasonal analysis by productId
 
-        # Priority 8: Default → MAINTAIN, LOW
-        return ("MAINTAIN", "LOW")
+        Returns:
+            Dictionary mapping productId to recommendedAction and urgencyLevel
+        """
+        by_key = RECOMMENDATION_BY_KEY
+        empty = {}
+        recommendations = {}
+        for product in products:
+            product_id = product['productId']
+            perf_data = performance_metrics.get(product_id, empty)
+            key = (
+                perf_data.get("performanceSegment", ""),
+                stock_metrics.get(product_id, empty).get("stockSegment", ""),
+                seasonal_metrics.get(product_id, empty).get("seasonalRelevance", ""),
+                product.get("lifecycleStage", ""),
+                perf_data.get("marginHealth", ""),
+            )
+            action, urgency = by_key.get(key) or RECOMMENDATION_TABLE[recommendation_index(*key)]
+            recommendations[product_id] = {
+                'recommendedAction': action,
+                'urgencyLevel': urgency
+            }
+        return recommendations
 
 
 
@@ -700,12 +988,35 @@ class OutputFormatter:
             - priceSegmentAnalysis
             - inventorySummary
         """
+        enriched_products = self.enrich(products, all_metrics)
+
+        # Calculate inventory summary
+        inventory_summary = self.calculate_inventory_summary(products, all_metrics.get('stock_metrics', {}))
+
+        return self.assemble(
+            enriched_products,
+            all_metrics.get('category_insights', {}),
+            all_metrics.get('price_segment_analysis', {}),
+            inventory_summary
+        )
+
+    def enrich(self, products: list, all_metrics: dict) -> list:
+        """
+        Builds one enriched row per product with all of its metrics.
+
+        Args:
+            products: List of product dictionaries
+            all_metrics: Combined per-product metrics (stock, performance,
+                seasonal and recommendation)
+
+        Returns:
+            List of enriched product dictionaries in product order
+        """
         stock_metrics = all_metrics.get('stock_metrics', {})
         performance_metrics = all_metrics.get('performance_metrics', {})
         seasonal_metrics = all_metrics.get('seasonal_metrics', {})
         recommendation_metrics = all_metrics.get('recommendation_metrics', {})
 
-        # Build enriched product list with all metrics
         enriched_products = []
         for product in products:
             product_id = product['productId']
@@ -737,25 +1048,60 @@ class OutputFormatter:
             }
             enriched_products.append(enriched)
 
-        # Segment products
-        hero_products = self._get_hero_products(enriched_products)
-        slow_movers = self._get_slow_movers(enriched_products)
-        new_products = self._get_new_products(enriched_products)
-        seasonal_products = self._get_seasonal_products(enriched_products)
+        return enriched_products
 
-        # Calculate inventory summary
-        inventory_summary = self.calculate_inventory_summary(products, stock_metrics)
+    def assemble(self, enriched_products: list, category_insights: dict,
+                 price_segment_analysis: dict, inventory_summary: dict) -> dict:
+        """
+        Selects the product lists and builds the ProductInsightJSON.
+
+        Args:
+            enriched_products: Enriched rows in catalog order (all products, or
+                a superset of every list's members from candidate_indices())
+            category_insights: Category analysis results
+            price_segment_analysis: Price segment analysis results
+            inventory_summary: Inventory summary
 
+        Returns:
+            ProductInsightJSON dictionary
+        """
         return {
-            'heroProducts': hero_products,
-            'slowMovers': slow_movers,
-            'newProducts': new_products,
-            'seasonalProducts': seasonal_products,
-            'categoryInsights': all_metrics.get('category_insights', {}),
-            'priceSegmentAnalysis': all_metrics.get('price_segment_analysis', {}),
+            'heroProducts': self._get_hero_products(enriched_products),
+            'slowMovers': self._get_slow_movers(enriched_products),
+            'newProducts': self._get_new_products(enriched_products),
+            'seasonalProducts': self._get_seasonal_products(enriched_products),
+            'categoryInsights': category_insights,
+            'priceSegmentAnalysis': price_segment_analysis,
             'inventorySummary': inventory_summary
         }
 
+    def candidate_indices(self, enriched_products: list,
+                          lists: Tuple[str, ...] = ('hero', 'slow', 'new', 'seasonal')) -> list:
+        """
+        Indices of rows that appear in any output list.
+
+        The union of candidates from disjoint shards, kept in catalog order, is
+        enough for assemble() to reproduce the lists of the whole catalog,
+        since the list sorts are stable.
+
+        Args:
+            enriched_products: Enriched rows of one shard
+            lists: Output lists to consider (hero, slow, new, seasonal)
+
+        Returns:
+            Sorted list indices into enriched_products
+        """
+        selectors = {
+            'hero': self._get_hero_products,
+            'slow': self._get_slow_movers,
+            'new': self._get_new_products,
+            'seasonal': self._top_seasonal
+        }
+        selected = set()
+        for name in lists:
+            selected.update(id(row) for row in selectors[name](enriched_products))
+        return [index for index, row in enumerate(enriched_products) if id(row) in selected]
+
     def _get_hero_products(self, enriched_products: list) -> list:
         """
         Get top 10 Star or Rising products sorted by trendScore descending.
@@ -831,18 +1177,9 @@ class OutputFormatter:
         Returns:
             List of top 10 seasonal products with simplified structure
         """
-        # Filter HIGH seasonal relevance products
-        seasonal = [
-            p for p in enriched_products
-            if p['seasonalRelevance'] == 'HIGH'
-        ]
-
-        # Sort by trendScore descending (for consistency)
-        seasonal.sort(key=lambda x: x['trendScore'], reverse=True)
-
         # Return top 10 with simplified structure
         result = []
-        for p in seasonal[:10]:
+        for p in self._top_seasonal(enriched_products):
             result.append({
                 'productId': p['productId'],
                 'productName': p['productName'],
@@ -854,6 +1191,27 @@ class OutputFormatter:
 
         return result
 
+    def _top_seasonal(self, enriched_products: list) -> list:
+        """
+        Get top 10 HIGH seasonalRelevance products sorted by trendScore descending.
+
+        Args:
+            enriched_products: List of enriched product dictionaries
+
+        Returns:
+            List of top 10 seasonal products (full rows)
+        """
+        # Filter HIGH seasonal relevance products
+        seasonal = [
+            p for p in enriched_products
+            if p['seasonalRelevance'] == 'HIGH'
+        ]
+
+        # Sort by trendScore descending (for consistency)
+        seasonal.sort(key=lambda x: x['trendScore'], reverse=True)
+
+        return seasonal[:10]
+
     def calculate_inventory_summary(self, products: list, stock_metrics: dict) -> dict:
         """
         Calculate overall inventory metrics.
@@ -872,63 +1230,435 @@ class OutputFormatter:
             - avgStockDays: average stockDays across all products
             - inventoryTurnoverRate: 365 / avgStockDays
         """
-        if not products:
-            return {
+        return self.finalize_inventory_totals(self.accumulate_inventory(None, products, stock_metrics))
+
+    def accumulate_inventory(self, totals: Optional[dict], products: list, stock_metrics: dict) -> dict:
+        """
+        Adds a chunk of products to running inventory totals.
+
+        Args:
+            totals: Running totals from previous chunks (None to start)
+            products: List of product dictionaries
+            stock_metrics: Stock analysis results
+
+        Returns:
+            Updated totals, to be passed to finalize_inventory_totals()
+        """
+        if totals is None:
+            totals = {
                 'totalProducts': 0,
-                'totalStockValue': 0.0,
-                'criticalStockProducts': 0,
-                'excessStockProducts': 0,
-                'healthyStockProducts': 0,
-                'avgStockDays': 0.0,
-                'inventoryTurnoverRate': 0.0
+                'stockValue': 0.0,
+                'critical': 0,
+                'excess': 0,
+                'healthy': 0,
+                'stockDays': 0.0
             }
 
-        total_products = len(products)
-        total_stock_value = 0.0
-        critical_count = 0
-        excess_count = 0
-        healthy_count = 0
-        total_stock_days = 0.0
-
         for product in products:
-            product_id = product['productId']
-            stock = product.get('stock', 0)
-            cost = product.get('cost', 0)
+            stock_data = stock_metrics.get(product['productId'], {})
+            totals['totalProducts'] += 1
 
             # Calculate stock value
-            total_stock_value += stock * cost
-
-            # Get stock metrics
-            stock_data = stock_metrics.get(product_id, {})
-            stock_segment = stock_data.get('stockSegment', 'Healthy')
-            stock_days = stock_data.get('stockDays', 999)
+            totals['stockValue'] += product.get('stock', 0) * product.get('cost', 0)
 
             # Count by segment
+            stock_segment = stock_data.get('stockSegment', 'Healthy')
             if stock_segment == 'Critical':
-                critical_count += 1
+                totals['critical'] += 1
             elif stock_segment == 'Excess':
-                excess_count += 1
+                totals['excess'] += 1
             elif stock_segment == 'Healthy':
-                healthy_count += 1
+                totals['healthy'] += 1
 
             # Accumulate stock days
-            total_stock_days += stock_days
+            totals['stockDays'] += stock_data.get('stockDays', 999)
+
+        return totals
+
+    def merge_inventory_totals(self, partials: list) -> dict:
+        """
+        Combines accumulate_inventory() totals from disjoint product shards.
+
+        Args:
+            partials: Totals returned by accumulate_inventory()
+
+        Returns:
+            Totals equivalent to accumulate_inventory() over the whole catalog
+        """
+        merged = self.accumulate_inventory(None, [], {})
+        for partial in partials:
+            for field in merged:
+                merged[field] += partial[field]
+        return merged
+
+    def finalize_inventory_totals(self, totals: dict) -> dict:
+        """
+        Calculates the inventory summary from running totals.
+
+        Args:
+            totals: Inventory sums and counts (see accumulate_inventory())
+
+        Returns:
+            Dictionary with inventory summary
+        """
+        if not totals['totalProducts']:
+            return {
+                'totalProducts': 0,
+                'totalStockValue': 0.0,
+                'criticalStockProducts': 0,
+                'excessStockProducts': 0,
+                'healthyStockProducts': 0,
+                'avgStockDays': 0.0,
+                'inventoryTurnoverRate': 0.0
+            }
+
+        total_products = totals['totalProducts']
 
         # Calculate averages
-        avg_stock_days = total_stock_days / total_products if total_products > 0 else 0.0
+        avg_stock_days = totals['stockDays'] / total_products if total_products > 0 else 0.0
         inventory_turnover_rate = 365 / avg_stock_days if avg_stock_days > 0 else 0.0
 
         return {
             'totalProducts': total_products,
-            'totalStockValue': round(total_stock_value, 2),
-            'criticalStockProducts': critical_count,
-            'excessStockProducts': excess_count,
-            'healthyStockProducts': healthy_count,
+            'totalStockValue': round(totals['stockValue'], 2),
+            'criticalStockProducts': totals['critical'],
+            'excessStockProducts': totals['excess'],
+            'healthyStockProducts': totals['healthy'],
             'avgStockDays': round(avg_stock_days, 2),
             'inventoryTurnoverRate': round(inventory_turnover_rate, 2)
         }
 
 
+class StepTimer:
+    """
+    Records wall time per execute() step; a no-op when disabled.
+
+    Besides the debug trace, a timer can feed the process-wide step
+    histograms, record tracemalloc allocations per step and drive a sampling
+    profiler (see step_diagnostics.py). Request timers are built with
+    for_request() and must be closed; finish() closes them and attaches the
+    results.
+    """
+
+    def __init__(self, enabled: bool = False, allocations: bool = False,
+                 profiler: Optional[SamplingProfiler] = None,
+                 histograms: Optional[StepHistograms] = None):
+        self.enabled = enabled
+        self.allocations = allocations
+        self.profiler = profiler
+        self.histograms = histograms
+        self.active = enabled or allocations or profiler is not None or histograms is not None
+        self.steps = []
+        self._started_at = time.perf_counter() if self.active else 0.0
+        self._tracing = False
+        if allocations:
+            acquire_tracemalloc()
+            self._tracing = True
+
+    @classmethod
+    def for_request(cls, input_data: Any) -> 'StepTimer':
+        """
+        Timer for a request: _trace with "debug", per-step allocations with
+        "diagnostics", the sampling profiler with "profile" (interval from
+        "profileIntervalMs"), histograms while PRODUCT_ANALYSIS_STEP_METRICS
+        is on. "diagnostics" and "profile" are ignored unless
+        PRODUCT_ANALYSIS_REQUEST_DIAGNOSTICS is on.
+
+        Args:
+            input_data: Request payload
+
+        Returns:
+            StepTimer
+        """
+        histograms = STEP_HISTOGRAMS if STEP_METRICS_ENABLED else None
+        if not isinstance(input_data, dict):
+            return cls(histograms=histograms)
+        profiler = None
+        if REQUEST_DIAGNOSTICS_ENABLED and input_data.get('profile'):
+            interval = input_data.get('profileIntervalMs')
+            if isinstance(interval, bool) or not isinstance(interval, (int, float)) or interval <= 0:
+                interval = PROFILE_INTERVAL_MS
+            profiler = SamplingProfiler(interval)
+        allocations = REQUEST_DIAGNOSTICS_ENABLED and bool(input_data.get('diagnostics'))
+        return cls(bool(input_data.get('debug')), allocations, profiler, histograms)
+
+    @contextmanager
+    def step(self, name: str):
+        """
+        Times the enclosed block as one named step.
+
+        Args:
+            name: Step name reported in the trace
+        """
+        if not self.active:
+            yield
+            return
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.step = name
+            profiler.start()
+        if self.allocations:
+            tracemalloc.reset_peak()
+            allocated = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            entry = {'name': name, 'durationMs': round(duration_ms, 3)}
+            if self.allocations:
+                current, peak = tracemalloc.get_traced_memory()
+                entry['allocatedKb'] = round((current - allocated) / 1024, 1) or 0.0
+                entry['peakKb'] = round((peak - allocated) / 1024, 1)
+            if profiler is not None:
+                profiler.step = None
+            self.steps.append(entry)
+            if self.histograms is not None:
+                self.histograms.observe(name, duration_ms)
+
+    def close(self) -> None:
+        """Stops the profiler and allocation tracing; safe to call twice."""
+        if self.profiler is not None:
+            self.profiler.stop()
+        if self._tracing:
+            self._tracing = False
+            release_tracemalloc()
+
+    def finish(self, result: dict) -> dict:
+        """
+        Closes the timer and attaches _trace (debug) and _diagnostics
+        (diagnostics / profile) to a result.
+
+        Args:
+            result: ProductInsightJSON
+
+        Returns:
+            The same result
+        """
+        self.close()
+        if self.enabled:
+            result['_trace'] = self.steps
+        if self.allocations or self.profiler is not None:
+            diagnostics = {
+                'totalMs': round((time.perf_counter() - self._started_at) * 1000, 3),
+                'steps': self.steps
+            }
+            if self.profiler is not None:
+                diagnostics['profile'] = self.profiler.report()
+            result['_diagnostics'] = diagnostics
+        return result
+
+
+# Worker processes for the sharded analysis mode (0/1 = serial)
+PARALLEL_WORKERS = int(os.environ.get('PRODUCT_ANALYSIS_WORKERS', '0'))
+
+# Products per chunk for the memory-bounded streaming mode (0 = off)
+STREAM_CHUNK_SIZE = int(os.environ.get('PRODUCT_ANALYSIS_CHUNK_SIZE', '0'))
+
+# Upper bound of the worker count; payload values above it are clamped
+MAX_PARALLEL_WORKERS = os.cpu_count() or 1
+
+# Range of the streaming chunk size; values are clamped to it and rounded
+# down to a power of two, so only a handful of orchestrators can be cached
+MIN_STREAM_CHUNK_SIZE = 256
+MAX_STREAM_CHUNK_SIZE = 65536
+
+# Default latency budget (ms) of the approximate mode (0 = off)
+LATENCY_BUDGET_MS = float(os.environ.get('PRODUCT_ANALYSIS_LATENCY_BUDGET_MS', '0'))
+
+
+# Run warmup() at import (cold start) instead of on the first request
+WARMUP_ON_IMPORT = os.environ.get('PRODUCT_ANALYSIS_WARMUP', 'false').lower() in ('1', 'true', 'yes')
+
+# Bundled sample analysed during warmup to exercise every code path once
+WARMUP_SAMPLE_PATH = os.environ.get(
+    'PRODUCT_ANALYSIS_WARMUP_SAMPLE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_input_valid.json')
+)
+
+
+def _orchestrator_mode(input_data: Any) -> Tuple[str, int]:
+    # The budget itself is read per request, so budgets share one orchestrator
+    budget = input_data.get('latencyBudgetMs') if isinstance(input_data, dict) else None
+    if not isinstance(budget, (int, float)) or isinstance(budget, bool):
+        budget = LATENCY_BUDGET_MS
+    if budget > 0:
+        return ('approximate', 0)
+    workers = input_data.get('parallelWorkers') if isinstance(input_data, dict) else None
+    if not isinstance(workers, int) or isinstance(workers, bool):
+        workers = PARALLEL_WORKERS
+    if workers > 1 and MAX_PARALLEL_WORKERS > 1:
+        return ('parallel', min(workers, MAX_PARALLEL_WORKERS))
+    chunk_size = input_data.get('streamChunkSize') if isinstance(input_data, dict) else None
+    if not isinstance(chunk_size, int) or isinstance(chunk_size, bool):
+        chunk_size = STREAM_CHUNK_SIZE
+    if chunk_size > 0:
+        chunk_size = min(max(chunk_size, MIN_STREAM_CHUNK_SIZE), MAX_STREAM_CHUNK_SIZE)
+        return ('streaming', 1 << (chunk_size.bit_length() - 1))
+    return ('serial', 0)
+
+
+def create_orchestrator(input_data: Any = None) -> 'AgentOrchestrator':
+    """
+    Returns a new serial orchestrator, the process-pool one when more than one
+    worker is requested via payload parallelWorkers or PRODUCT_ANALYSIS_WORKERS,
+    or the chunked streaming one when payload streamChunkSize or
+    PRODUCT_ANALYSIS_CHUNK_SIZE is set. Workers are clamped to the CPU count
+    and chunk sizes to MIN/MAX_STREAM_CHUNK_SIZE (a power of two), because
+    each distinct setting keeps a cached orchestrator and process pool. A latency budget (payload
+    latencyBudgetMs or PRODUCT_ANALYSIS_LATENCY_BUDGET_MS) selects the
+    approximate orchestrator, which takes precedence over the other modes.
+
+    Args:
+        input_data: Request payload
+
+    Returns:
+        AgentOrchestrator instance
+    """
+    mode, setting = _orchestrator_mode(input_data)
+    if mode == 'approximate':
+        from product_analysis_approximate import ApproximateAgentOrchestrator
+        return ApproximateAgentOrchestrator()
+    if mode == 'parallel':
+        from product_analysis_parallel import ParallelAgentOrchestrator
+        return ParallelAgentOrchestrator(setting)
+    if mode == 'streaming':
+        from product_analysis_streaming import StreamingAgentOrchestrator
+        return StreamingAgentOrchestrator(setting)
+    return AgentOrchestrator()
+
+
+# Warm orchestrators reused across requests, one per (mode, setting). The
+# analyzers keep no per-request state, so one instance serves every request
+# (and every tenant: thresholds are passed per call).
+_orchestrators: Dict[Tuple[str, int], 'AgentOrchestrator'] = {}
+_orchestrators_lock = threading.Lock()
+
+
+def get_orchestrator(input_data: Any = None) -> 'AgentOrchestrator':
+    """
+    Returns the process-wide orchestrator for the payload's mode, creating it
+    on first use (see create_orchestrator for the mode selection).
+
+    Args:
+        input_data: Request payload
+
+    Returns:
+        Shared AgentOrchestrator instance
+    """
+    key = _orchestrator_mode(input_data)
+    orchestrator = _orchestrators.get(key)
+    if orchestrator is None:
+        with _orchestrators_lock:
+            orchestrator = _orchestrators.get(key)
+            if orchestrator is None:
+                orchestrator = _orchestrators[key] = create_orchestrator(input_data)
+    return orchestrator
+
+
+def is_warmup_request(payload: Any) -> bool:
+    """
+    Whether the payload is a warmup ping ({"warmup": true, ...}).
+
+    Args:
+        payload: Request payload
+
+    Returns:
+        True for warmup payloads
+    """
+    return isinstance(payload, dict) and payload.get('warmup') is True
+
+
+def is_metrics_request(payload: Any) -> bool:
+    """
+    Whether the payload asks for the step histograms ({"metrics": true} or
+    {"metrics": "prometheus"}).
+
+    Args:
+        payload: Request payload
+
+    Returns:
+        True for metrics payloads
+    """
+    return isinstance(payload, dict) and payload.get('metrics') in (True, 'prometheus')
+
+
+def step_metrics(output_format: Any = True) -> Any:
+    """
+    Cumulative per-step duration histograms of this process (recorded while
+    PRODUCT_ANALYSIS_STEP_METRICS is on).
+
+    Args:
+        output_format: "prometheus" for the text exposition format, anything
+                       else for the JSON snapshot
+
+    Returns:
+        Prometheus text or {"enabled", "bucketsMs", "steps"}
+    """
+    if output_format == 'prometheus':
+        return STEP_HISTOGRAMS.render_prometheus()
+    return dict(STEP_HISTOGRAMS.snapshot(), enabled=STEP_METRICS_ENABLED)
+
+
+def warmup(payload: Optional[dict] = None) -> dict:
+    """
+    Prepares the process for traffic: creates the warm orchestrator(s),
+    compiles tenant settings, analyses a sample payload once and, in
+    parallel mode, starts the worker pool with initialized analyzers.
+
+    Args:
+        payload: Optional warmup payload: tenantIds (list) and
+                 parallelWorkers / streamChunkSize / latencyBudgetMs (modes
+                 to warm, clamped like request settings). The sample is
+                 always WARMUP_SAMPLE_PATH; the payload cannot name a file.
+
+    Returns:
+        Warmup summary: modes, tenants, sampleProducts, durationMs
+    """
+    start = time.perf_counter()
+    payload = payload if isinstance(payload, dict) else {}
+
+    tenant_ids = payload.get('tenantIds') or []
+    for tenant_id in tenant_ids:
+        get_tenant_thresholds(tenant_id)
+
+    sample = None
+    try:
+        with open(WARMUP_SAMPLE_PATH, 'r') as f:
+            sample = json.load(f)
+        sample = sample.get('input', sample) if isinstance(sample, dict) else None
+    except (OSError, ValueError):
+        sample = None
+
+    modes = [{}]
+    if 'parallelWorkers' in payload or PARALLEL_WORKERS > 1:
+        modes.append({'parallelWorkers': payload.get('parallelWorkers', PARALLEL_WORKERS)})
+    if 'streamChunkSize' in payload or STREAM_CHUNK_SIZE > 0:
+        modes.append({'streamChunkSize': payload.get('streamChunkSize', STREAM_CHUNK_SIZE)})
+    if 'latencyBudgetMs' in payload or LATENCY_BUDGET_MS > 0:
+        modes.append({'latencyBudgetMs': payload.get('latencyBudgetMs', LATENCY_BUDGET_MS)})
+
+    warmed = []
+    for mode in modes:
+        key = _orchestrator_mode(mode)
+        if key in warmed:
+            continue
+        orchestrator = get_orchestrator(mode)
+        if key[0] == 'parallel':
+            from product_analysis_parallel import warm_pool
+            warm_pool(key[1])
+        if sample is not None:
+            get_tenant_thresholds(sample.get('tenantId'))
+            orchestrator.execute(sample)
+        warmed.append(key)
+
+    return {
+        'modes': [f'{mode}:{setting}' if setting else mode for mode, setting in warmed],
+        'tenants': len(tenant_ids),
+        'sampleProducts': len(sample.get('products', [])) if isinstance(sample, dict) else 0,
+        'durationMs': round((time.perf_counter() - start) * 1000, 3)
+    }
+
 
 class AgentOrchestrator:
     """Coordinates the overall analysis workflow."""
@@ -948,15 +1678,21 @@ class AgentOrchestrator:
         Main entry point for agent execution.
         
         Args:
-            input_data: Dictionary containing tenantId, products, orderHistory,
-                       currentMonth, climateData
+            input_data: Dictionary containing tenantId, products, orderHistory
+                       (or salesSummary), currentMonth, climateData and
+                       optional debug / diagnostics / profile flags
         
         Returns:
-            ProductInsightJSON with all analysis results
+            ProductInsightJSON with all analysis results (plus per-step
+            timings under _trace when debug is set, and per-step
+            allocations and the sampling profile under _diagnostics when
+            diagnostics / profile are set)
         """
+        timer = StepTimer.for_request(input_data)
         try:
             # Step 1: Validate input
-            is_valid, error_message = self.validator.validate(input_data)
+            with timer.step('validate'):
+                is_valid, error_message = self.validator.validate(input_data)
             if not is_valid:
                 return {
                     'error': {
@@ -967,41 +1703,40 @@ class AgentOrchestrator:
             
             # Extract input data
             products = input_data['products']
-            order_history = input_data['orderHistory']
+            order_history = input_data.get('orderHistory', [])
+            sales_summary = input_data.get('salesSummary')
+            as_of = input_data.get('asOfDate')
             current_month = input_data['currentMonth']
             climate_data = input_data['climateData']
+            thresholds = get_tenant_thresholds(input_data.get('tenantId'))
             
             # Step 2: Run stock analysis
-            stock_metrics = self.stock_analyzer.analyze(products, order_history)
+            with timer.step('stock'):
+                stock_metrics = self.stock_analyzer.analyze(
+                    products, order_history, sales_summary, as_of, thresholds=thresholds
+                )
             
             # Step 3: Run performance segmentation
-            performance_metrics = self.performance_segmenter.segment(products, stock_metrics)
+            with timer.step('performance'):
+                performance_metrics = self.performance_segmenter.segment(products, stock_metrics, thresholds)
             
             # Step 4: Run seasonal analysis
-            seasonal_metrics = self.seasonal_analyzer.analyze(products, current_month, climate_data)
+            with timer.step('seasonal'):
+                seasonal_metrics = self.seasonal_analyzer.analyze(products, current_month, climate_data)
             
             # Step 5: Run recommendation engine for each product
-            recommendation_metrics = {}
-            for product in products:
-                product_id = product['productId']
-                perf_data = performance_metrics.get(product_id, {})
-                stock_data = stock_metrics.get(product_id, {})
-                seasonal_data = seasonal_metrics.get(product_id, {})
-                
-                recommended_action, urgency_level = self.recommendation_engine.recommend(
-                    product, perf_data, stock_data, seasonal_data
+            with timer.step('recommendation'):
+                recommendation_metrics = self.recommendation_engine.recommend_all(
+                    products, performance_metrics, stock_metrics, seasonal_metrics
                 )
-                
-                recommendation_metrics[product_id] = {
-                    'recommendedAction': recommended_action,
-                    'urgencyLevel': urgency_level
-                }
             
             # Step 6: Run category analysis
-            category_insights = self.category_analyzer.analyze(products, performance_metrics, stock_metrics)
+            with timer.step('category'):
+                category_insights = self.category_analyzer.analyze(products, performance_metrics, stock_metrics)
             
             # Step 7: Run price segment analysis
-            price_segment_analysis = self.price_segment_analyzer.analyze(products, performance_metrics, stock_metrics)
+            with timer.step('price_segment'):
+                price_segment_analysis = self.price_segment_analyzer.analyze(products, performance_metrics, stock_metrics)
             
             # Step 8: Format output
             all_metrics = {
@@ -1013,9 +1748,10 @@ class AgentOrchestrator:
                 'price_segment_analysis': price_segment_analysis
             }
             
-            result = self.output_formatter.format(products, all_metrics)
+            with timer.step('format'):
+                result = self.output_formatter.format(products, all_metrics)
             
-            return result
+            return timer.finish(result)
             
         except KeyError as e:
             return {
@@ -1033,6 +1769,67 @@ class AgentOrchestrator:
                     'details': {'type': type(e).__name__}
                 }
             }
+        finally:
+            timer.close()
+
+
+def handle_payload(payload: Any) -> Any:
+    """
+    Shared request path of the AgentCore and Lambda handlers.
+
+    The payload may arrive as a wire_codec envelope; when the caller sends
+    "_wireAccept", the result is returned in the negotiated compact encoding.
+    Warmup payloads ({"warmup": true}) only warm the process and metrics
+    payloads ({"metrics": true | "prometheus"}) return the step histograms.
+    Requests run on the process-wide orchestrator instead of constructing one
+    per call.
+
+    Args:
+        payload: Raw request payload
+
+    Returns:
+        ProductInsightJSON (possibly wire-encoded), {"warmup": summary} or
+        {"metrics": histograms}
+    """
+    try:
+        payload, response_encoding = decode_request(payload)
+    except ValueError as e:
+        # Malformed wire envelope: same error shape as execute() (plain JSON)
+        return {
+            'error': {
+                'code': 'INVALID_WIRE_PAYLOAD',
+                'message': str(e)
+            }
+        }
+    
+    # Handle Sandbox format: {"prompt": "...json string..."}
+    if isinstance(payload, dict) and 'prompt' in payload and len(payload) == 1:
+        prompt_value = payload['prompt']
+        if isinstance(prompt_value, str):
+            # Try to extract JSON from the prompt string
+            try:
+                parsed = json.loads(prompt_value)
+                if isinstance(parsed, dict) and 'tenantId' in parsed:
+                    payload = parsed
+            except (json.JSONDecodeError, ValueError):
+                # Try to find JSON object within the text
+                import re
+                match = re.search(r'\{.*\}', prompt_value, re.DOTALL)
+                if match:
+                    try:
+                        parsed = json.loads(match.group())
+                        if isinstance(parsed, dict) and 'tenantId' in parsed:
+                            payload = parsed
+                    except (json.JSONDecodeError, ValueError):
+                        pass
+    
+    if is_warmup_request(payload):
+        return {'warmup': warmup(payload)}
+    if is_metrics_request(payload):
+        return {'metrics': step_metrics(payload['metrics'])}
+    
+    result = get_orchestrator(payload).execute(payload)
+    return encode_response(result, response_encoding)
 
 
 try:
@@ -1041,32 +1838,8 @@ try:
 
     @app.entrypoint
     def invoke(payload):
-        """AgentCore Runtime entrypoint for product analysis."""
-        orchestrator = AgentOrchestrator()
-        
-        # Handle Sandbox format: {"prompt": "...json string..."}
-        if isinstance(payload, dict) and 'prompt' in payload and len(payload) == 1:
-            prompt_value = payload['prompt']
-            if isinstance(prompt_value, str):
-                # Try to extract JSON from the prompt string
-                try:
-                    parsed = json.loads(prompt_value)
-                    if isinstance(parsed, dict) and 'tenantId' in parsed:
-                        payload = parsed
-                except (json.JSONDecodeError, ValueError):
-                    # Try to find JSON object within the text
-                    import re
-                    match = re.search(r'\{.*\}', prompt_value, re.DOTALL)
-                    if match:
-                        try:
-                            parsed = json.loads(match.group())
-                            if isinstance(parsed, dict) and 'tenantId' in parsed:
-                                payload = parsed
-                        except (json.JSONDecodeError, ValueError):
-                            pass
-        
-        result = orchestrator.execute(payload)
-        return result
+        """AgentCore Runtime entrypoint for product analysis (see handle_payload)."""
+        return handle_payload(payload)
 
 except ImportError:
     app = None
@@ -1074,9 +1847,11 @@ except ImportError:
 
 def lambda_handler(event, context):
     """AWS Lambda handler (fallback for non-AgentCore environments)."""
-    orchestrator = AgentOrchestrator()
-    result = orchestrator.execute(event)
-    return {'statusCode': 200, 'body': json.dumps(result)}
+    return {'statusCode': 200, 'body': json.dumps(handle_payload(event))}
+
+
+if WARMUP_ON_IMPORT:
+    warmup()
 
 
 if __name__ == "__main__":
@@ -1088,6 +1863,6 @@ if __name__ == "__main__":
         input_file = sys.argv[1] if len(sys.argv) > 1 else 'test_input_valid.json'
         with open(input_file, 'r') as f:
             test_input = json.load(f)
-        orchestrator = AgentOrchestrator()
+        orchestrator = create_orchestrator(test_input)
         result = orchestrator.execute(test_input)
         print(json.dumps(result, indent=2))
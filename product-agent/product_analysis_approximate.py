@@ -0,0 +1,688 @@
+"""
+Approximate Product Analysis
+
+Latency-budgeted mode for AgentOrchestrator, for interactive callers that
+would rather have a fast approximate ProductInsight than wait for an exact
+full-catalog scan. The payload's latencyBudgetMs (or
+PRODUCT_ANALYSIS_LATENCY_BUDGET_MS) is the budget. Each request is costed
+with per-unit costs calibrated on earlier requests in this process. If the
+exact analysis fits, it runs unchanged. Otherwise:
+
+    sales       orderHistory is sampled in random blocks of consecutive
+                orders (about 1/k of them, fewer if the pass reaches its
+                deadline) and each product's stockDays rate is estimated from
+                the sample scaled up to the whole history
+                (sales_windows.stock_rate_index: one number per product
+                instead of 90 day buckets)
+    screen      products are stratified by (category, price segment). The
+                attribute-only fields (product counts, trend scores, stock,
+                stock value) are summed exactly over the whole catalog. The
+                sales-dependent fields (stockDays, stock and performance
+                segment counts) come from the screened products: all of
+                them when that fits the budget, otherwise a proportional
+                stratified sample
+    top-K       hero, new and seasonal products are picked from cheap
+                prefilters (trendScore > 80, NEW, seasonal rules for the
+                current season) evaluated best-first until each list is
+                full. New and seasonal lists do not depend on sales and are
+                exact. Heroes also need the Star/Rising segment, which uses
+                the stockDays rate, so they are exact only when every order
+                was used; with sampled orders they come from the sample.
+                Slow movers are the top stockDays among the screened
+                products. Only these candidates get full rows (sales
+                windows, climate matching, recommendations)
+
+The result has the ProductInsightJSON keys plus _approximation. That block
+holds the approximate flag, the budget and elapsed time, the sampling used
+and which lists are exact. When only products were sampled it also holds
+95% error bounds of the estimated fields. Order sampling biases stockDays
+(sold products' rates are scaled up, unsampled ones fall to the 999 cap,
+and stock / rate is convex), which a variance bound does not cover, so
+with sampled orders errorBounds is null and only the typical sales-rate
+error is reported.
+
+A budget below the estimated minimum for the payload (one pass over the
+catalog, the rows of all NEW products and the minimum samples) is rejected
+up front with a LATENCY_BUDGET_TOO_SMALL error instead of being overrun.
+"""
+
+import heapq
+import logging
+import math
+import random
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from product_analysis_agent import LATENCY_BUDGET_MS, AgentOrchestrator, StepTimer
+from sales_windows import SalesWindows, resolve_as_of, stock_rate_index
+from tenant_settings import get_tenant_thresholds
+
+logger = logging.getLogger(__name__)
+
+# Share of the budget that is planned; the rest is headroom for jitter
+BUDGET_SAFETY = 0.8
+
+# Sampling never goes below these sizes
+MIN_SAMPLED_ORDERS = 2000
+MIN_SAMPLED_PRODUCTS = 2000
+MIN_STRATUM_SAMPLE = 2
+
+# Orders are sampled in blocks of this many consecutive orders
+ORDER_BLOCK = 64
+
+# Output list sizes (see OutputFormatter) and the rows reserved for them
+HERO_LIMIT = 10
+SLOW_LIMIT = 15
+SEASONAL_LIMIT = 10
+
+Z_95 = 1.96
+
+# Starting per-unit costs in microseconds; every request refines them
+DEFAULT_UNIT_COSTS_US = {
+    'exactLine': 1.6,      # exact analysis, per order line
+    'exactProduct': 40.0,  # exact analysis, per product
+    'line': 1.0,           # per sampled order line and pass
+    'attribute': 1.2,      # stratification pass, per product
+    'screen': 6.0,         # screening, per product
+    'row': 50.0,           # full row, per candidate
+}
+CALIBRATION_WEIGHT = 0.3
+MIN_CALIBRATION_UNITS = 200
+
+
+class UnitCosts:
+    """Per-unit costs (microseconds), calibrated from observed step durations."""
+
+    def __init__(self, defaults: Optional[Dict[str, float]] = None):
+        self._costs = dict(defaults or DEFAULT_UNIT_COSTS_US)
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> float:
+        return self._costs[name]
+
+    def observe(self, name: str, seconds: float, units: float) -> None:
+        """
+        Folds one measurement into the cost of a unit.
+
+        Args:
+            name: Unit name
+            seconds: Measured duration
+            units: Units processed in that time (ignored below MIN_CALIBRATION_UNITS)
+        """
+        if units < MIN_CALIBRATION_UNITS:
+            return
+        measured = seconds * 1e6 / units
+        with self._lock:
+            self._costs[name] += CALIBRATION_WEIGHT * (measured - self._costs[name])
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {name: round(cost, 3) for name, cost in self._costs.items()}
+
+
+UNIT_COSTS = UnitCosts()
+
+
+class SamplingPlan(NamedTuple):
+    """How a request is run within its budget."""
+
+    exact: bool
+    order_stride: int
+    # Products to screen; 0 = all
+    sample_products: int
+    estimated_lines: int
+    # Planned cost of everything but the order passes
+    reserve_us: float = 0.0
+    # Estimated cost of the cheapest approximation
+    min_us: float = 0.0
+
+
+class _Stratum:
+    """Exact attribute sums and screened sales-dependent sums of one stratum."""
+
+    __slots__ = ('category', 'price_segment', 'size', 'trend', 'stock', 'stock_value', 'positions',
+                 'screened', 'stock_days', 'stock_days_sq', 'critical', 'excess', 'healthy', 'top', 'under')
+
+    def __init__(self, category: str, price_segment: str):
+        self.category = category
+        self.price_segment = price_segment
+        self.size = 0
+        self.trend = 0
+        self.stock = 0
+        self.stock_value = 0.0
+        self.positions = []
+        self.screened = 0
+        self.stock_days = 0.0
+        self.stock_days_sq = 0.0
+        self.critical = 0
+        self.excess = 0
+        self.healthy = 0
+        self.top = 0
+        self.under = 0
+
+
+def _estimate(strata: List['_Stratum'], value, pooled: tuple) -> tuple:
+    """
+    Stratified estimate of a total and the variance of that estimate.
+
+    Args:
+        strata: Strata of one group (category, price segment or all)
+        value: (stratum) -> (sum, sum of squares) of the screened values
+        pooled: (n, sum, sum of squares) over all screened products, used for
+                strata with fewer than two screened products
+
+    Returns:
+        (estimated total, variance)
+    """
+    pooled_n, pooled_sum, pooled_sq = pooled
+    pooled_mean = pooled_sum / pooled_n if pooled_n else 0.0
+    pooled_var = (pooled_sq - pooled_n * pooled_mean ** 2) / (pooled_n - 1) if pooled_n > 1 else 0.0
+
+    total = 0.0
+    variance = 0.0
+    for stratum in strata:
+        n = stratum.screened
+        if n == stratum.size:
+            total += value(stratum)[0]
+            continue
+        if n >= MIN_STRATUM_SAMPLE:
+            values_sum, values_sq = value(stratum)
+            mean = values_sum / n
+            var = max(values_sq - n * mean * mean, 0.0) / (n - 1)
+        else:
+            mean, var = pooled_mean, pooled_var
+        total += stratum.size * mean
+        variance += stratum.size ** 2 * (1 - n / stratum.size) * var / max(n, 1)
+    return total, variance
+
+
+class ApproximateAgentOrchestrator(AgentOrchestrator):
+    """Runs the analysis within a latency budget, sampling when it must."""
+
+    def __init__(self, unit_costs: Optional[UnitCosts] = None, seed: int = 0):
+        super().__init__()
+        self.unit_costs = unit_costs or UNIT_COSTS
+        self.seed = seed
+
+    def execute(self, input_data: dict) -> dict:
+        """
+        Budgeted entry point; same contract as AgentOrchestrator.execute plus
+        _approximation.
+
+        Without a budget (payload latencyBudgetMs or
+        PRODUCT_ANALYSIS_LATENCY_BUDGET_MS), with invalid input, or when the
+        exact analysis is predicted to fit, the serial path runs. Any failure
+        in the approximate path falls back to it as well.
+
+        Args:
+            input_data: Dictionary containing tenantId, products, orderHistory
+                       (or salesSummary), currentMonth, climateData,
+                       latencyBudgetMs and optional debug / diagnostics /
+                       profile flags
+
+        Returns:
+            ProductInsightJSON with _approximation
+        """
+        start = time.perf_counter()
+        budget_ms = input_data.get('latencyBudgetMs') if isinstance(input_data, dict) else None
+        if isinstance(budget_ms, bool) or not isinstance(budget_ms, (int, float)):
+            budget_ms = LATENCY_BUDGET_MS
+        if budget_ms <= 0 or not isinstance(input_data, dict):
+            return super().execute(input_data)
+
+        timer = StepTimer.for_request(input_data)
+        with timer.step('validate'):
+            is_valid, _ = self.validator.validate(input_data)
+        if not is_valid:
+            timer.close()
+            return super().execute(input_data)
+
+        try:
+            with timer.step('plan'):
+                plan = self.plan(input_data, budget_ms, time.perf_counter() - start)
+            if plan.exact:
+                timer.close()
+                return self._execute_exact(input_data, plan, budget_ms, start)
+            if plan.min_us > budget_ms * 1000 * BUDGET_SAFETY:
+                timer.close()
+                return self._reject(plan, budget_ms, start)
+            result = self.analyze_approximate(input_data, plan, budget_ms, start, timer)
+        except Exception as e:
+            logger.warning(f"Approximate analysis failed ({type(e).__name__}: {e}), running serially")
+            timer.close()
+            return super().execute(input_data)
+
+        return timer.finish(result)
+
+    def plan(self, input_data: dict, budget_ms: float, elapsed: float) -> SamplingPlan:
+        """
+        Chooses the order stride and product sample size for a budget.
+
+        Args:
+            input_data: Validated request payload
+            budget_ms: Latency budget in milliseconds
+            elapsed: Seconds already spent on the request
+
+        Returns:
+            SamplingPlan
+        """
+        costs = self.unit_costs
+        products = input_data['products']
+        n_products = len(products)
+        orders = [] if 'salesSummary' in input_data else input_data.get('orderHistory', [])
+        head = orders[:64]
+        n_lines = int(len(orders) * sum(len(order.get('items', ())) for order in head) / len(head)) if head else 0
+
+        available = budget_ms * 1000 * BUDGET_SAFETY - elapsed * 1e6
+        if n_lines * costs['exactLine'] + n_products * costs['exactProduct'] <= available:
+            return SamplingPlan(True, 1, 0, n_lines)
+
+        probe = products[::max(1, n_products // 512)]
+        new_share = sum(1 for product in probe if product.get('lifecycleStage') == 'NEW') / max(len(probe), 1)
+        rows = (HERO_LIMIT + SLOW_LIMIT + SEASONAL_LIMIT + new_share * n_products) * costs['row']
+        work = max(available - rows, 0.0)
+        # Two passes over the order lines: the rate index and the candidates' sales windows
+        lines = 2 * n_lines * costs['line']
+        screen = n_products * costs['screen']
+
+        # Product sampling is unbiased while order sampling is not (stockDays
+        # is convex in the sales rate), so orders are only sampled once the
+        # product sample is down to its minimum
+        attribute = n_products * costs['attribute']
+        lines_per_order = n_lines / len(orders) if orders else 0.0
+        min_products = min(MIN_SAMPLED_PRODUCTS, n_products)
+        min_us = (rows + attribute + min_products * costs['screen']
+                  + 2 * min(MIN_SAMPLED_ORDERS, len(orders)) * lines_per_order * costs['line'])
+
+        sample_products = 0
+        stride = 1
+        if lines + screen > work:
+            sample_products = int(max(work - lines - attribute, 0.0) / costs['screen'])
+            if sample_products < MIN_SAMPLED_PRODUCTS:
+                sample_products = MIN_SAMPLED_PRODUCTS
+                order_budget = work - attribute - sample_products * costs['screen']
+                stride = math.ceil(lines / order_budget) if order_budget > 0 else len(orders)
+                stride = max(1, min(stride, len(orders) // MIN_SAMPLED_ORDERS))
+            if sample_products >= n_products:
+                sample_products = 0
+        if sample_products:
+            reserve_us = rows + attribute + sample_products * costs['screen']
+        else:
+            reserve_us = rows + screen
+        return SamplingPlan(False, stride, sample_products, n_lines, reserve_us, min_us)
+
+    def _execute_exact(self, input_data: dict, plan: SamplingPlan, budget_ms: float, start: float) -> dict:
+        analysis_start = time.perf_counter()
+        result = super().execute(input_data)
+        if 'error' in result:
+            return result
+        # Rescale both exact unit costs by how far off their prediction was
+        costs = self.unit_costs
+        predicted = plan.estimated_lines * costs['exactLine'] + len(input_data['products']) * costs['exactProduct']
+        ratio = (time.perf_counter() - analysis_start) * 1e6 / predicted if predicted else 1.0
+        costs.observe('exactLine', ratio * costs['exactLine'] * plan.estimated_lines / 1e6, plan.estimated_lines)
+        costs.observe('exactProduct', ratio * costs['exactProduct'] * len(input_data['products']) / 1e6,
+                      len(input_data['products']))
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        result['_approximation'] = {
+            'approximate': False,
+            'budgetMs': budget_ms,
+            'elapsedMs': round(elapsed_ms, 3),
+            'withinBudget': elapsed_ms <= budget_ms
+        }
+        return result
+
+    def _reject(self, plan: SamplingPlan, budget_ms: float, start: float) -> dict:
+        min_ms = plan.min_us / 1000 / BUDGET_SAFETY
+        return {
+            'error': {
+                'code': 'LATENCY_BUDGET_TOO_SMALL',
+                'message': f'latencyBudgetMs {budget_ms:g} is below the estimated minimum of '
+                           f'{min_ms:.0f} ms for this payload'
+            },
+            '_approximation': {
+                'approximate': True,
+                'budgetMs': budget_ms,
+                'elapsedMs': round((time.perf_counter() - start) * 1000, 3),
+                'withinBudget': False,
+                'minBudgetMs': round(min_ms, 1)
+            }
+        }
+
+    def _sample_orders(self, orders: list, stride: int, deadline: float, rng: random.Random, sample: list):
+        """
+        Yields random blocks of consecutive orders, about 1/stride of all
+        orders, until the deadline (but at least MIN_SAMPLED_ORDERS).
+
+        Blocks are visited in random order, so stopping early still leaves a
+        random sample rather than the oldest or newest orders.
+
+        Args:
+            orders: Full order history
+            stride: Planned sampling step (1 = all orders)
+            deadline: perf_counter() time to stop at
+            rng: Seeded random generator
+            sample: Receives every yielded order
+        """
+        starts = list(range(0, len(orders), ORDER_BLOCK))
+        rng.shuffle(starts)
+        for block_start in starts[:math.ceil(len(starts) / stride)]:
+            if len(sample) >= MIN_SAMPLED_ORDERS and time.perf_counter() > deadline:
+                return
+            block = orders[block_start:block_start + ORDER_BLOCK]
+            sample.extend(block)
+            yield from block
+
+    def analyze_approximate(self, input_data: dict, plan: SamplingPlan, budget_ms: float,
+                            start: float, timer: StepTimer) -> dict:
+        """
+        Runs the sampled analysis described by a plan.
+
+        Args:
+            input_data: Validated request payload
+            plan: SamplingPlan from plan()
+            budget_ms: Latency budget in milliseconds
+            start: perf_counter() at the start of the request
+            timer: Request StepTimer
+
+        Returns:
+            ProductInsightJSON with _approximation
+        """
+        costs = self.unit_costs
+        products = input_data['products']
+        climate_data = input_data['climateData']
+        current_month = input_data['currentMonth']
+        sales_summary = input_data.get('salesSummary')
+        thresholds = get_tenant_thresholds(input_data.get('tenantId'))
+        window = self.stock_analyzer.rate_window
+
+        with timer.step('sales'):
+            step_start = time.perf_counter()
+            orders = input_data.get('orderHistory', [])
+            if sales_summary is not None:
+                summary_windows = SalesWindows.from_summary(sales_summary)
+                rates = {product_id: summary_windows.stock_rate(product_id, window) for product_id in sales_summary}
+                sampled_orders, as_of, scale = None, None, 1
+            else:
+                stride = plan.order_stride
+                as_of = resolve_as_of(orders[::stride] + orders[:64] + orders[-64:], input_data.get('asOfDate'))
+                # Half of what is left goes to this pass, half to the candidates' windows
+                remaining = start + budget_ms / 1000 * BUDGET_SAFETY - plan.reserve_us / 1e6 - step_start
+                rng = random.Random(f"{self.seed}:{input_data.get('tenantId')}:{len(orders)}")
+                sampled_orders = []
+                sampled = self._sample_orders(orders, stride, step_start + max(remaining, 0.0) / 2, rng,
+                                              sampled_orders)
+                if as_of is None:
+                    sampled = list(sampled)
+                rates = stock_rate_index(sampled, as_of, window)
+                scale = len(orders) / len(sampled_orders) if sampled_orders else 1
+                if scale != 1:
+                    rates = {product_id: rate * scale for product_id, rate in rates.items()}
+                costs.observe('line', time.perf_counter() - step_start,
+                              plan.estimated_lines * len(sampled_orders) / max(len(orders), 1))
+
+        segmenter = self.performance_segmenter
+        classify_performance = segmenter.classify_performance
+        classify_price_segment = segmenter.classify_price_segment
+        classify_stock_segment = thresholds.classify_stock_segment
+        seasonal_analyzer = self.seasonal_analyzer
+        current_season = seasonal_analyzer.get_current_season(current_month)
+        slow_heap = []
+
+        def stock_days_of(product) -> float:
+            rate = rates.get(product.get('productId'), 0.0)
+            return product.get('stock', 0) / rate if rate else 999.0
+
+        def screen(stratum: _Stratum, position: int, product) -> None:
+            stock_days = stock_days_of(product)
+            stock_segment = classify_stock_segment(stock_days)
+            performance_segment = classify_performance(product, stock_days, thresholds)
+            stratum.screened += 1
+            stratum.stock_days += stock_days
+            stratum.stock_days_sq += stock_days * stock_days
+            if stock_segment == 'Critical':
+                stratum.critical += 1
+            elif stock_segment == 'Excess':
+                stratum.excess += 1
+            else:
+                stratum.healthy += 1
+            if performance_segment in ('Star', 'Rising'):
+                stratum.top += 1
+            elif performance_segment == 'Underperformer':
+                stratum.under += 1
+            if stock_segment == 'Excess' or performance_segment == 'Underperformer':
+                # Largest stockDays first, earlier catalog position on ties
+                key = (stock_days, -position)
+                if len(slow_heap) < SLOW_LIMIT:
+                    heapq.heappush(slow_heap, key)
+                elif key > slow_heap[0]:
+                    heapq.heapreplace(slow_heap, key)
+
+        screen_all = plan.sample_products == 0
+        strata: Dict[tuple, _Stratum] = {}
+        hero_candidates = []
+        seasonal_candidates = []
+        new_positions = []
+        with timer.step('screen'):
+            step_start = time.perf_counter()
+            for position, product in enumerate(products):
+                category = product.get('category', 'Unknown')
+                price_segment = classify_price_segment(product.get('basePrice', 0))
+                stratum = strata.get((category, price_segment))
+                if stratum is None:
+                    stratum = strata[(category, price_segment)] = _Stratum(category, price_segment)
+                trend_score = product.get('trendScore', 0)
+                stock = product.get('stock', 0)
+                stratum.size += 1
+                stratum.trend += trend_score
+                stratum.stock += stock
+                stratum.stock_value += stock * product.get('cost', 0)
+
+                if trend_score > 80:
+                    hero_candidates.append((-trend_score, position))
+                if product.get('lifecycleStage', 'MATURE') == 'NEW':
+                    new_positions.append(position)
+                if product.get('seasonalityRules') and seasonal_analyzer.check_season_match(product, current_season):
+                    seasonal_candidates.append((-trend_score, position))
+
+                if screen_all:
+                    screen(stratum, position, product)
+                else:
+                    stratum.positions.append(position)
+            costs.observe('screen' if screen_all else 'attribute', time.perf_counter() - step_start, len(products))
+
+            if not screen_all:
+                step_start = time.perf_counter()
+                rng = random.Random(f"{self.seed}:{input_data.get('tenantId')}:{len(products)}")
+                sample = []
+                for stratum in strata.values():
+                    share = round(plan.sample_products * stratum.size / len(products))
+                    take = min(stratum.size, max(share, MIN_STRATUM_SAMPLE))
+                    sample.extend((stratum, position) for position in rng.sample(stratum.positions, take))
+                    stratum.positions = None
+                rng.shuffle(sample)
+                # Stop at the deadline; the shuffled prefix is still a stratified sample
+                deadline = start + budget_ms / 1000 * BUDGET_SAFETY - \
+                    (HERO_LIMIT + SLOW_LIMIT + SEASONAL_LIMIT + len(new_positions)) * costs['row'] / 1e6
+                for index, (stratum, position) in enumerate(sample):
+                    if index % 256 == 0 and index >= MIN_SAMPLED_PRODUCTS and time.perf_counter() > deadline:
+                        break
+                    screen(stratum, position, products[position])
+                costs.observe('screen', time.perf_counter() - step_start,
+                              sum(stratum.screened for stratum in strata.values()))
+
+        with timer.step('top_k'):
+            hero_candidates.sort()
+            heroes = []
+            for _, position in hero_candidates:
+                product = products[position]
+                if classify_performance(product, stock_days_of(product), thresholds) in ('Star', 'Rising'):
+                    heroes.append(position)
+                    if len(heroes) == HERO_LIMIT:
+                        break
+            seasonal_candidates.sort()
+            seasonal = []
+            for _, position in seasonal_candidates:
+                if seasonal_analyzer.check_climate_rules(products[position], climate_data)[0]:
+                    seasonal.append(position)
+                    if len(seasonal) == SEASONAL_LIMIT:
+                        break
+            candidates = sorted(set(heroes + seasonal + new_positions + [-key[1] for key in slow_heap]))
+
+        with timer.step('format'):
+            rows = [products[position] for position in candidates]
+            product_ids = {product.get('productId') for product in rows}
+            if sales_summary is not None:
+                windows = SalesWindows.from_summary(
+                    {product_id: sales for product_id, sales in sales_summary.items() if product_id in product_ids}
+                )
+            else:
+                windows = SalesWindows.from_orders(sampled_orders, as_of, product_ids=product_ids, scale=scale)
+            step_start = time.perf_counter()
+            stock_metrics = self.stock_analyzer.analyze(rows, [], sales_windows=windows, thresholds=thresholds)
+            performance_metrics = segmenter.segment(rows, stock_metrics, thresholds)
+            seasonal_metrics = seasonal_analyzer.analyze(rows, current_month, climate_data)
+            recommendation_metrics = self.recommendation_engine.recommend_all(
+                rows, performance_metrics, stock_metrics, seasonal_metrics
+            )
+            enriched = self.output_formatter.enrich(rows, {
+                'stock_metrics': stock_metrics,
+                'performance_metrics': performance_metrics,
+                'seasonal_metrics': seasonal_metrics,
+                'recommendation_metrics': recommendation_metrics
+            })
+            aggregates, bounds = self._aggregates(list(strata.values()))
+            result = self.output_formatter.assemble(enriched, *aggregates)
+            costs.observe('row', time.perf_counter() - step_start, len(candidates))
+
+        screened = sum(stratum.screened for stratum in strata.values())
+        orders_complete = sampled_orders is None or len(sampled_orders) == len(orders)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        approximation = {
+            'approximate': not orders_complete or screened < len(products),
+            'budgetMs': budget_ms,
+            'elapsedMs': round(elapsed_ms, 3),
+            'withinBudget': elapsed_ms <= budget_ms,
+            'productSampling': {
+                'totalProducts': len(products),
+                'screened': screened,
+                'fraction': round(screened / len(products), 4),
+                'strata': len(strata)
+            },
+            # Heroes (segment) and slow movers depend on the sales rates, new and
+            # seasonal do not; see the top-K step in the module docstring
+            'exactLists': (['heroProducts'] if orders_complete else []) + ['newProducts', 'seasonalProducts']
+                          + (['slowMovers'] if orders_complete and screened == len(products) else [])
+        }
+        if sampled_orders is not None:
+            fraction = len(sampled_orders) / max(len(orders), 1)
+            lines_per_product = plan.estimated_lines * fraction / max(len(rates), 1)
+            approximation['orderSampling'] = {
+                'ordersUsed': len(sampled_orders),
+                'ordersTotal': len(orders),
+                'fraction': round(fraction, 4),
+                # Typical 95% relative error of a sold product's daily sales rate
+                'rateRelativeError95': round(Z_95 * math.sqrt((1 - fraction) / max(lines_per_product, 1.0)), 4)
+            }
+        if not orders_complete:
+            # Order sampling bias is not covered by a variance bound (see module docstring)
+            approximation['errorBounds'] = None
+        elif bounds:
+            approximation['errorBounds'] = bounds
+        result['_approximation'] = approximation
+        return result
+
+    def _aggregates(self, strata: List[_Stratum]) -> tuple:
+        """
+        Category, price segment and inventory results from the strata.
+
+        Args:
+            strata: All strata in catalog first-seen order
+
+        Returns:
+            ((category insights, price segment analysis, inventory summary),
+             95% error bounds of the estimated fields, {} when every
+             product was screened)
+        """
+        screened = sum(stratum.screened for stratum in strata)
+        sampled = screened < sum(stratum.size for stratum in strata)
+
+        def pooled(attribute: str) -> tuple:
+            total = sum(getattr(stratum, attribute) for stratum in strata)
+            if attribute == 'stock_days':
+                return screened, total, sum(stratum.stock_days_sq for stratum in strata)
+            return screened, total, total
+
+        def estimate(group: List[_Stratum], attribute: str) -> tuple:
+            if attribute == 'stock_days':
+                value = lambda stratum: (stratum.stock_days, stratum.stock_days_sq)
+            else:
+                # Counts: the values are 0/1, so the sum of squares is the sum
+                value = lambda stratum: (getattr(stratum, attribute), getattr(stratum, attribute))
+            return _estimate(group, value, pooled(attribute))
+
+        def bound(variance: float, divisor: float = 1.0) -> float:
+            return round(Z_95 * math.sqrt(variance) / divisor, 2) if divisor else 0.0
+
+        by_category: Dict[str, List[_Stratum]] = {}
+        by_price: Dict[str, List[_Stratum]] = {}
+        for stratum in strata:
+            by_category.setdefault(stratum.category, []).append(stratum)
+            by_price.setdefault(stratum.price_segment, []).append(stratum)
+
+        bounds = {'categoryInsights': {}, 'priceSegmentAnalysis': {}, 'inventorySummary': {}}
+        category_totals = {}
+        for category, group in by_category.items():
+            size = sum(stratum.size for stratum in group)
+            stock_days, stock_days_var = estimate(group, 'stock_days')
+            top, top_var = estimate(group, 'top')
+            under, under_var = estimate(group, 'under')
+            category_totals[category] = {
+                'totalProducts': size,
+                'trendScore': sum(stratum.trend for stratum in group),
+                'stock': sum(stratum.stock for stratum in group),
+                'stockDays': stock_days,
+                'topPerformers': round(top),
+                'underperformers': round(under)
+            }
+            bounds['categoryInsights'][category] = {
+                'avgStockDays': bound(stock_days_var, size),
+                'topPerformers': bound(top_var),
+                'underperformers': bound(under_var)
+            }
+
+        price_totals = self.price_segment_analyzer.accumulate(None, [], {}, {})
+        for segment_name, totals in price_totals.items():
+            group = by_price.get(segment_name, [])
+            size = sum(stratum.size for stratum in group)
+            healthy, healthy_var = estimate(group, 'healthy')
+            totals['productCount'] = size
+            totals['trendScore'] = sum(stratum.trend for stratum in group)
+            totals['healthy'] = healthy
+            if size:
+                healthy_share = Z_95 * math.sqrt(healthy_var) / size
+                bounds['priceSegmentAnalysis'][segment_name] = {'healthyShare': round(healthy_share, 4)}
+
+        inventory_totals = self.output_formatter.accumulate_inventory(None, [], {})
+        size = sum(stratum.size for stratum in strata)
+        inventory_totals['totalProducts'] = size
+        inventory_totals['stockValue'] = sum(stratum.stock_value for stratum in strata)
+        inventory_bounds = bounds['inventorySummary']
+        for key, attribute, name in (('critical', 'critical', 'criticalStockProducts'),
+                                     ('excess', 'excess', 'excessStockProducts'),
+                                     ('healthy', 'healthy', 'healthyStockProducts')):
+            value, variance = estimate(strata, attribute)
+            inventory_totals[key] = round(value)
+            inventory_bounds[name] = bound(variance)
+        stock_days, stock_days_var = estimate(strata, 'stock_days')
+        inventory_totals['stockDays'] = stock_days
+        inventory_bounds['avgStockDays'] = bound(stock_days_var, size)
+
+        aggregates = (
+            self.category_analyzer.finalize_totals(category_totals),
+            self.price_segment_analyzer.finalize_totals(price_totals),
+            self.output_formatter.finalize_inventory_totals(inventory_totals)
+        )
+        return aggregates, bounds if sampled else {}
@@ -0,0 +1,320 @@
+"""
+Parallel Product Analysis
+
+Process-pool mode for AgentOrchestrator. Products are sharded across worker
+processes by a stable hash of productId, and order history items are
+partitioned with the same hash so each worker only scans the sales of its own
+products. Workers return running category, price segment and inventory
+totals (the same ones streaming mode accumulates) plus their top-K candidate
+rows; the parent merges them, keeping categories and rows in catalog order.
+The result matches the serial AgentOrchestrator.execute output; only the
+float sums behind avgStockDays and totalStockValue are added shard by shard
+and may differ in the last bit before rounding.
+"""
+
+import logging
+import os
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from product_analysis_agent import AgentOrchestrator, StepTimer
+from sales_windows import resolve_as_of
+from tenant_settings import get_tenant_thresholds
+from shared_catalog import open_catalog, write_catalog
+
+logger = logging.getLogger(__name__)
+
+# Catalogs smaller than this are analyzed serially (process overhead dominates)
+MIN_PARALLEL_PRODUCTS = int(os.environ.get('PRODUCT_ANALYSIS_PARALLEL_MIN_PRODUCTS', '2000'))
+
+# Ship the catalog to workers as one shared memory-mapped file instead of
+# pickled product dicts per shard
+SHARED_CATALOG = os.environ.get('PRODUCT_ANALYSIS_SHARED_CATALOG', 'false').lower() in ('1', 'true', 'yes')
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+# Per-process orchestrator reused across shards
+_worker_orchestrator = None
+
+
+def shard_of(product_id, shards: int) -> int:
+    """
+    Stable shard index for a productId (independent of PYTHONHASHSEED).
+
+    Args:
+        product_id: Product identifier
+        shards: Number of shards
+
+    Returns:
+        Shard index in [0, shards)
+    """
+    return zlib.crc32(str(product_id).encode('utf-8')) % shards
+
+
+def partition(products: list, order_history: list, shards: int,
+              sales_summary: Optional[dict] = None) -> List[dict]:
+    """
+    Splits products and order items into shards by productId hash.
+
+    Each shard keeps its products and order items in their original relative
+    order, so per-product sales totals accumulate exactly as in the serial path.
+    With a sales_summary, each shard gets the summary entries of its products
+    instead and order_history is not scanned.
+
+    Args:
+        products: List of product dictionaries
+        order_history: List of order dictionaries
+        shards: Number of shards
+        sales_summary: Optional pre-aggregated sales by productId
+
+    Returns:
+        List of shards: {positions, products, orders[, salesSummary]}; orders
+        keep their orderDate so shards bucket sales by day like the serial path
+    """
+    parts = [{'positions': [], 'products': [], 'orders': []} for _ in range(shards)]
+    shard_cache = {}
+
+    for position, product in enumerate(products):
+        product_id = product.get('productId')
+        shard = shard_cache.get(product_id)
+        if shard is None:
+            shard = shard_cache[product_id] = shard_of(product_id, shards)
+        parts[shard]['positions'].append(position)
+        parts[shard]['products'].append(product)
+
+    if sales_summary is not None:
+        for part in parts:
+            part['salesSummary'] = {}
+        for product_id, sales in sales_summary.items():
+            shard = shard_cache.get(product_id)
+            if shard is not None:
+                parts[shard]['salesSummary'][product_id] = sales
+        return parts
+
+    for order in order_history:
+        if 'items' not in order:
+            continue
+        items_by_shard = {}
+        for item in order['items']:
+            product_id = item.get('productId')
+            shard = shard_cache.get(product_id)
+            if shard is None:
+                shard = shard_cache[product_id] = shard_of(product_id, shards)
+            items_by_shard.setdefault(shard, []).append(item)
+        for shard, items in items_by_shard.items():
+            parts[shard]['orders'].append({'orderDate': order.get('orderDate'), 'items': items})
+
+    return parts
+
+
+def analyze_shard(shard: dict, current_month: int, climate_data: dict) -> dict:
+    """
+    Runs the per-product stages for one shard and collects partial aggregates.
+
+    When the shard carries a catalogPath instead of products, rows and climate
+    data are read from the shared catalog file.
+
+    Args:
+        shard: Shard from partition()
+        current_month: Current month (1-12)
+        climate_data: Climate data by city (ignored with a shared catalog)
+
+    Returns:
+        Dictionary with category, price, inventory partials and candidate rows
+        as (catalog position, enriched row) pairs
+    """
+    if 'catalogPath' in shard:
+        with open_catalog(shard['catalogPath']) as catalog:
+            return _analyze_products(
+                catalog.rows_at(shard['positions']), shard, current_month, catalog.climate_data
+            )
+    return _analyze_products(shard['products'], shard, current_month, climate_data)
+
+
+def _analyze_products(products: list, shard: dict, current_month: int, climate_data: dict) -> dict:
+    global _worker_orchestrator
+    if _worker_orchestrator is None:
+        _worker_orchestrator = AgentOrchestrator()
+    orchestrator = _worker_orchestrator
+
+    positions = shard['positions']
+
+    thresholds = shard.get('thresholds')
+    stock_metrics = orchestrator.stock_analyzer.analyze(
+        products, shard['orders'], shard.get('salesSummary'), shard.get('asOf'), thresholds=thresholds
+    )
+    performance_metrics = orchestrator.performance_segmenter.segment(products, stock_metrics, thresholds)
+    seasonal_metrics = orchestrator.seasonal_analyzer.analyze(products, current_month, climate_data)
+    recommendation_metrics = orchestrator.recommendation_engine.recommend_all(
+        products, performance_metrics, stock_metrics, seasonal_metrics
+    )
+
+    formatter = orchestrator.output_formatter
+    enriched = formatter.enrich(products, {
+        'stock_metrics': stock_metrics,
+        'performance_metrics': performance_metrics,
+        'seasonal_metrics': seasonal_metrics,
+        'recommendation_metrics': recommendation_metrics
+    })
+
+    return {
+        'category': orchestrator.category_analyzer.accumulate(
+            {}, products, performance_metrics, stock_metrics, positions
+        ),
+        'price': orchestrator.price_segment_analyzer.accumulate(
+            None, products, performance_metrics, stock_metrics
+        ),
+        'inventory': formatter.accumulate_inventory(None, products, stock_metrics),
+        'candidates': [(positions[index], enriched[index]) for index in formatter.candidate_indices(enriched)]
+    }
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Returns the shared process pool for a worker count, creating it on first use.
+
+    Args:
+        workers: Number of worker processes
+
+    Returns:
+        ProcessPoolExecutor with that many workers
+    """
+    pool = _pools.get(workers)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(workers)
+            if pool is None:
+                pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+    return pool
+
+
+def _init_worker() -> int:
+    global _worker_orchestrator
+    if _worker_orchestrator is None:
+        _worker_orchestrator = AgentOrchestrator()
+    return os.getpid()
+
+
+def warm_pool(workers: int) -> int:
+    """
+    Starts the shared pool's worker processes and initializes their
+    orchestrators, so the first sharded request does not pay for process
+    start-up and imports.
+
+    Args:
+        workers: Number of worker processes
+
+    Returns:
+        Number of distinct worker processes that answered
+    """
+    pool = get_pool(workers)
+    futures = [pool.submit(_init_worker) for _ in range(workers)]
+    return len({future.result() for future in futures})
+
+
+class ParallelAgentOrchestrator(AgentOrchestrator):
+    """Runs the analysis on a process pool with products sharded by productId."""
+
+    def __init__(self, workers: int = None, min_products: int = MIN_PARALLEL_PRODUCTS,
+                 shared_catalog: bool = SHARED_CATALOG):
+        super().__init__()
+        self.workers = workers or os.cpu_count() or 1
+        self.min_products = min_products
+        self.shared_catalog = shared_catalog
+
+    def execute(self, input_data: dict) -> dict:
+        """
+        Parallel entry point; same contract and output as AgentOrchestrator.execute.
+
+        Small catalogs, a single worker and invalid input are handled by the
+        serial path. With shared_catalog (or payload sharedCatalog) the
+        products are written once to a memory-mapped columnar file that all
+        workers read instead of receiving pickled product dicts. Any failure in the parallel path falls back to the serial
+        path so errors are reported exactly as before.
+
+        Args:
+            input_data: Dictionary containing tenantId, products, orderHistory
+                       (or salesSummary), currentMonth, climateData and
+                       optional debug / diagnostics / profile flags
+
+        Returns:
+            ProductInsightJSON with all analysis results
+        """
+        if self.workers <= 1 or not isinstance(input_data, dict):
+            return super().execute(input_data)
+
+        timer = StepTimer.for_request(input_data)
+        with timer.step('validate'):
+            is_valid, _ = self.validator.validate(input_data)
+        if not is_valid or len(input_data['products']) < self.min_products:
+            timer.close()
+            return super().execute(input_data)
+
+        shared_catalog = input_data.get('sharedCatalog', self.shared_catalog)
+        catalog_path = None
+        try:
+            products = input_data['products']
+            climate_data = input_data['climateData']
+
+            with timer.step('partition'):
+                order_history = input_data.get('orderHistory', [])
+                shards = [shard for shard in partition(products, order_history, self.workers,
+                                                       input_data.get('salesSummary'))
+                          if shard['positions']]
+                # Every shard must use the same as-of date and tenant thresholds
+                as_of = resolve_as_of(order_history, input_data.get('asOfDate'))
+                thresholds = get_tenant_thresholds(input_data.get('tenantId'))
+                for shard in shards:
+                    shard['asOf'] = as_of
+                    shard['thresholds'] = thresholds
+
+            if shared_catalog:
+                with timer.step('catalog'):
+                    catalog_path = write_catalog(products, climate_data)
+                    for shard in shards:
+                        del shard['products']
+                        shard['catalogPath'] = catalog_path
+                    climate_data = None
+
+            with timer.step('shards'):
+                pool = get_pool(self.workers)
+                futures = [
+                    pool.submit(analyze_shard, shard, input_data['currentMonth'], climate_data)
+                    for shard in shards
+                ]
+                partials = [future.result() for future in futures]
+
+            with timer.step('merge'):
+                category_insights = self.category_analyzer.finalize_totals(
+                    self.category_analyzer.merge_totals([partial['category'] for partial in partials])
+                )
+                price_segment_analysis = self.price_segment_analyzer.finalize_totals(
+                    self.price_segment_analyzer.merge_totals([partial['price'] for partial in partials])
+                )
+                inventory_summary = self.output_formatter.finalize_inventory_totals(
+                    self.output_formatter.merge_inventory_totals([partial['inventory'] for partial in partials])
+                )
+                candidates = sorted(
+                    (candidate for partial in partials for candidate in partial['candidates']),
+                    key=lambda candidate: candidate[0]
+                )
+
+            with timer.step('format'):
+                result = self.output_formatter.assemble(
+                    [row for _, row in candidates],
+                    category_insights,
+                    price_segment_analysis,
+                    inventory_summary
+                )
+        except Exception as e:
+            logger.warning(f"Parallel analysis failed ({type(e).__name__}: {e}), running serially")
+            timer.close()
+            return super().execute(input_data)
+        finally:
+            if catalog_path is not None:
+                os.unlink(catalog_path)
+
+        return timer.finish(result)
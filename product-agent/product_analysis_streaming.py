@@ -0,0 +1,179 @@
+"""
+Streaming Product Analysis
+
+Memory-bounded mode for AgentOrchestrator. Products are processed in chunks:
+each chunk flows through stock -> performance -> seasonal -> recommendation,
+is folded into running category, price segment and inventory totals, and only
+the rows that can still appear in an output list are kept. The per-product
+metric dicts and enriched rows of a chunk are dropped before the next one, so
+working memory is O(chunk + K + groups + sold products), where K is the
+output list sizes (10 hero, 15 slow movers, 10 seasonal, plus every NEW
+product, which the contract returns in full).
+
+products may be any iterable, e.g. a generator over an export or a shared
+catalog, so callers never need the whole catalog in memory. Sales are indexed
+once before the first chunk: orderHistory into a sales_windows.SalesRateIndex
+(a few totals per sold product instead of 90 day buckets), salesSummary into
+a SalesWindows. The result is identical to the serial
+AgentOrchestrator.execute output (with STOCK_RATE_WINDOW=ewma up to floating
+point rounding of the rates).
+"""
+
+import itertools
+import logging
+import os
+from typing import Any, Iterable, Optional
+
+from product_analysis_agent import AgentOrchestrator, StepTimer
+from sales_windows import SalesRateIndex, SalesWindows
+from tenant_settings import TenantThresholds, get_tenant_thresholds
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = int(os.environ.get('PRODUCT_ANALYSIS_DEFAULT_CHUNK_SIZE', '10000'))
+
+# Output lists whose members are bounded top-K selections
+TOP_K_LISTS = ('hero', 'slow', 'seasonal')
+
+
+class StreamingAgentOrchestrator(AgentOrchestrator):
+    """Runs the analysis over product chunks keeping only running aggregates."""
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        super().__init__()
+        self.chunk_size = max(1, chunk_size)
+
+    def execute(self, input_data: dict) -> dict:
+        """
+        Streaming entry point; same contract and output as AgentOrchestrator.execute.
+
+        Invalid input is reported by the serial path, and any failure in the
+        streaming path falls back to it so errors look exactly as before.
+
+        Args:
+            input_data: Dictionary containing tenantId, products, orderHistory
+                       (or salesSummary), currentMonth, climateData and
+                       optional debug / diagnostics / profile flags
+
+        Returns:
+            ProductInsightJSON with all analysis results
+        """
+        if not isinstance(input_data, dict):
+            return super().execute(input_data)
+
+        timer = StepTimer.for_request(input_data)
+        with timer.step('validate'):
+            is_valid, _ = self.validator.validate(input_data)
+        if not is_valid:
+            timer.close()
+            return super().execute(input_data)
+
+        try:
+            result = self.analyze_stream(
+                input_data['products'],
+                input_data.get('orderHistory', []),
+                input_data['currentMonth'],
+                input_data['climateData'],
+                sales_summary=input_data.get('salesSummary'),
+                as_of=input_data.get('asOfDate'),
+                thresholds=get_tenant_thresholds(input_data.get('tenantId')),
+                timer=timer
+            )
+        except Exception as e:
+            logger.warning(f"Streaming analysis failed ({type(e).__name__}: {e}), running serially")
+            timer.close()
+            return super().execute(input_data)
+
+        return timer.finish(result)
+
+    def analyze_stream(self, products: Iterable[dict], order_history: list, current_month: int,
+                       climate_data: dict, sales_summary: Optional[dict] = None, as_of: Any = None,
+                       thresholds: Optional[TenantThresholds] = None,
+                       timer: Optional[StepTimer] = None) -> dict:
+        """
+        Analyzes an iterable of products chunk by chunk.
+
+        Args:
+            products: Products in catalog order (list, generator or any iterable)
+            order_history: List of order dictionaries (ignored with sales_summary)
+            current_month: Current month (1-12)
+            climate_data: Climate data by city
+            sales_summary: Optional pre-aggregated sales by productId
+            as_of: As-of date for the sales windows
+            thresholds: Tenant thresholds (defaults to DEFAULT_THRESHOLDS)
+            timer: Optional StepTimer
+
+        Returns:
+            ProductInsightJSON dictionary
+        """
+        timer = timer or StepTimer()
+        formatter = self.output_formatter
+
+        with timer.step('sales'):
+            if sales_summary is not None:
+                sales_windows = SalesWindows.from_summary(sales_summary)
+            else:
+                sales_windows = SalesRateIndex.from_orders(
+                    order_history, as_of, stock_window=self.stock_analyzer.rate_window
+                )
+
+        category_totals = {}
+        price_totals = self.price_segment_analyzer.accumulate(None, [], {}, {})
+        inventory_totals = formatter.accumulate_inventory(None, [], {})
+        # (catalog position, enriched row) pairs that can still reach an output list
+        top_rows = []
+        new_rows = []
+
+        with timer.step('chunks'):
+            iterator = iter(products)
+            base = 0
+            while True:
+                chunk = list(itertools.islice(iterator, self.chunk_size))
+                if not chunk:
+                    break
+
+                stock_metrics = self.stock_analyzer.analyze(
+                    chunk, [], sales_windows=sales_windows, thresholds=thresholds
+                )
+                performance_metrics = self.performance_segmenter.segment(chunk, stock_metrics, thresholds)
+                seasonal_metrics = self.seasonal_analyzer.analyze(chunk, current_month, climate_data)
+                recommendation_metrics = self.recommendation_engine.recommend_all(
+                    chunk, performance_metrics, stock_metrics, seasonal_metrics
+                )
+
+                category_totals = self.category_analyzer.accumulate(
+                    category_totals, chunk, performance_metrics, stock_metrics
+                )
+                price_totals = self.price_segment_analyzer.accumulate(
+                    price_totals, chunk, performance_metrics, stock_metrics
+                )
+                inventory_totals = formatter.accumulate_inventory(inventory_totals, chunk, stock_metrics)
+
+                enriched = formatter.enrich(chunk, {
+                    'stock_metrics': stock_metrics,
+                    'performance_metrics': performance_metrics,
+                    'seasonal_metrics': seasonal_metrics,
+                    'recommendation_metrics': recommendation_metrics
+                })
+                new_rows.extend((base + index, enriched[index])
+                                for index in formatter.candidate_indices(enriched, ('new',)))
+
+                # Re-select the top-K lists over the kept rows plus this chunk's
+                # candidates; earlier positions come first, so ties resolve as
+                # in the stable full-catalog sort
+                pool = top_rows + [(base + index, enriched[index])
+                                   for index in formatter.candidate_indices(enriched, TOP_K_LISTS)]
+                top_rows = [pool[index] for index in
+                            formatter.candidate_indices([row for _, row in pool], TOP_K_LISTS)]
+
+                base += len(chunk)
+
+        with timer.step('format'):
+            candidates = dict(top_rows)
+            candidates.update(new_rows)
+            return formatter.assemble(
+                [candidates[position] for position in sorted(candidates)],
+                self.category_analyzer.finalize_totals(category_totals),
+                self.price_segment_analyzer.finalize_totals(price_totals),
+                formatter.finalize_inventory_totals(inventory_totals)
+            )
@@ -0,0 +1,497 @@
+"""
+Time-Windowed Sales Engine
+
+Buckets order lines by day once and answers per-product sales rates for any
+window up to the horizon in O(1) through prefix sums over the day buckets:
+
+    prefix[d] = quantity sold in the last d days (day 0 = the as-of date)
+    rate(product, w) = prefix[w] / w
+
+Exponentially weighted rates (weighted mean of the daily quantities, weights
+halving every half_life days) are computed once per half-life for all
+products and cached, so each lookup is O(1) as well.
+
+The as-of date is the payload's asOfDate or, by default, the latest order
+date, so results do not depend on when the analysis runs. Order lines older
+than the horizon are dropped; lines without a parseable orderDate are put in
+the oldest bucket, so they still count toward the full-horizon rate (the
+legacy "all orders / 90" behaviour) but not toward shorter windows.
+
+SalesRateIndex answers the same queries for the configured windows only,
+keeping a few totals per product instead of the day buckets, for callers
+that must keep memory small (streaming mode).
+"""
+
+import os
+from datetime import date
+from itertools import accumulate
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+SUMMARY_DAYS = 90
+
+SALES_HORIZON_DAYS = int(os.environ.get('SALES_HORIZON_DAYS', str(SUMMARY_DAYS)))
+EWMA_HALF_LIFE_DAYS = float(os.environ.get('SALES_EWMA_HALF_LIFE_DAYS', '14'))
+
+
+def parse_window_days(value: str, name: str) -> int:
+    """
+    Parses a sales window length from configuration.
+
+    Args:
+        value: Window length in days
+        name: Setting name, for the error message
+
+    Returns:
+        Window length in days
+
+    Raises:
+        ValueError: If the value is not an integer of at least 1
+    """
+    days = int(value)
+    if days < 1:
+        raise ValueError(f"{name} windows must be at least 1 day, got {value!r}")
+    return days
+
+
+SALES_WINDOWS = tuple(parse_window_days(days, 'SALES_WINDOWS')
+                      for days in os.environ.get('SALES_WINDOWS', '7,30,90').split(','))
+
+# Window behind dailySalesRate / stockDays: a number of days or "ewma"
+STOCK_RATE_WINDOW = os.environ.get('STOCK_RATE_WINDOW', str(SUMMARY_DAYS))
+if STOCK_RATE_WINDOW != 'ewma':
+    parse_window_days(STOCK_RATE_WINDOW, 'STOCK_RATE_WINDOW')
+
+
+def parse_order_date(value) -> Optional[date]:
+    """
+    Parses an orderDate ("2024-01-15" or an ISO timestamp) to a date.
+
+    Args:
+        value: orderDate value from an order
+
+    Returns:
+        Date, or None if missing or not parseable
+    """
+    if not isinstance(value, str) or len(value) < 10:
+        return None
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        return None
+
+
+def resolve_as_of(order_history: Iterable[dict], as_of=None) -> Optional[date]:
+    """
+    Resolves the as-of date: the given date, else the latest order date.
+
+    Args:
+        order_history: List of order dictionaries
+        as_of: Explicit as-of date (date or ISO string)
+
+    Returns:
+        As-of date, or None if there is none and no order is dated
+    """
+    if isinstance(as_of, date):
+        return as_of
+    if as_of is not None:
+        return parse_order_date(as_of)
+    latest = None
+    seen = set()
+    for order in order_history:
+        value = order.get('orderDate')
+        if value in seen:
+            continue
+        seen.add(value)
+        order_date = parse_order_date(value)
+        if order_date is not None and (latest is None or order_date > latest):
+            latest = order_date
+    return latest
+
+
+class SalesWindows:
+    """Per-product day-bucket prefix sums with O(1) window and EWMA rates."""
+
+    def __init__(self, horizon: int = SALES_HORIZON_DAYS, as_of: Optional[date] = None):
+        self.horizon = max(horizon, *SALES_WINDOWS, 1)
+        self.as_of = as_of
+        self._prefix = {}
+        self._flat = {}
+        self._ewma = {}
+
+    @classmethod
+    def from_orders(cls, order_history: list, as_of=None,
+                    horizon: int = SALES_HORIZON_DAYS, product_ids: Optional[set] = None,
+                    scale: float = 1) -> 'SalesWindows':
+        """
+        Buckets all order lines by day in a single pass.
+
+        Args:
+            order_history: List of order dictionaries (orderDate, items)
+            as_of: As-of date (date or ISO string); defaults to the latest order date
+            horizon: Number of day buckets kept
+            product_ids: Only bucket these products (default: all)
+            scale: Factor applied to every quantity (e.g. 1 / sampling fraction
+                when order_history is a sample)
+
+        Returns:
+            SalesWindows over the order history
+        """
+        engine = cls(horizon, resolve_as_of(order_history, as_of))
+        horizon = engine.horizon
+        oldest = horizon - 1
+        day_cache = {}
+        buckets = {}
+
+        for order in order_history:
+            if 'items' not in order:
+                continue
+            value = order.get('orderDate')
+            day = day_cache.get(value)
+            if day is None:
+                order_date = parse_order_date(value)
+                if order_date is None or engine.as_of is None:
+                    day = oldest
+                else:
+                    day = max((engine.as_of - order_date).days, 0)
+                day_cache[value] = day
+            if day >= horizon:
+                continue
+            for item in order['items']:
+                product_id = item.get('productId')
+                if product_ids is not None and product_id not in product_ids:
+                    continue
+                product_buckets = buckets.get(product_id)
+                if product_buckets is None:
+                    product_buckets = buckets[product_id] = [0] * horizon
+                product_buckets[day] += item.get('quantity', 0)
+
+        if scale != 1:
+            for product_buckets in buckets.values():
+                product_buckets[:] = [quantity * scale for quantity in product_buckets]
+        engine._prefix = {product_id: list(accumulate(product_buckets, initial=0))
+                          for product_id, product_buckets in buckets.items()}
+        return engine
+
+    @classmethod
+    def from_summary(cls, sales_summary: dict, horizon: int = SALES_HORIZON_DAYS) -> 'SalesWindows':
+        """
+        Builds the engine from a pre-aggregated salesSummary.
+
+        Args:
+            sales_summary: {productId: quantity90d} (spread evenly over 90 days)
+                or {productId: [daily quantities, oldest first]}
+            horizon: Number of day buckets kept
+
+        Returns:
+            SalesWindows over the summary
+        """
+        engine = cls(horizon)
+        for product_id, sales in sales_summary.items():
+            if isinstance(sales, list):
+                recent = sales[::-1][:engine.horizon]
+                recent += [0] * (engine.horizon - len(recent))
+                engine._prefix[product_id] = list(accumulate(recent, initial=0))
+            else:
+                engine._flat[product_id] = sales
+        return engine
+
+    def total(self, product_id: str, days: int) -> Union[int, float]:
+        """
+        Quantity sold in the last `days` days (clipped to the horizon).
+
+        Args:
+            product_id: Product identifier
+            days: Window length in days
+
+        Returns:
+            Quantity sold in the window
+        """
+        days = min(days, self.horizon)
+        prefix = self._prefix.get(product_id)
+        if prefix is not None:
+            return prefix[days]
+        flat = self._flat.get(product_id)
+        if flat is not None:
+            return flat * min(days, SUMMARY_DAYS) / SUMMARY_DAYS
+        return 0
+
+    def rate(self, product_id: str, days: int) -> float:
+        """
+        Average daily sales over the last `days` days (clipped to the horizon).
+
+        Args:
+            product_id: Product identifier
+            days: Window length in days
+
+        Returns:
+            Daily sales rate
+        """
+        flat = self._flat.get(product_id)
+        if flat is not None:
+            return flat / float(SUMMARY_DAYS)
+        days = min(days, self.horizon)
+        return self.total(product_id, days) / float(days)
+
+    def ewma_rate(self, product_id: str, half_life: float = EWMA_HALF_LIFE_DAYS) -> float:
+        """
+        Exponentially weighted daily sales rate.
+
+        Args:
+            product_id: Product identifier
+            half_life: Days after which a day's weight halves
+
+        Returns:
+            Weighted mean of the daily quantities over the horizon
+        """
+        flat = self._flat.get(product_id)
+        if flat is not None:
+            return flat / float(SUMMARY_DAYS)
+        rates = self._ewma.get(half_life)
+        if rates is None:
+            rates = self._ewma[half_life] = self._compute_ewma(half_life)
+        return rates.get(product_id, 0.0)
+
+    def _compute_ewma(self, half_life: float) -> Dict[str, float]:
+        decay = 0.5 ** (1.0 / half_life)
+        weights = [decay ** day for day in range(self.horizon)]
+        norm = sum(weights)
+        rates = {}
+        for product_id, prefix in self._prefix.items():
+            weighted = 0.0
+            for day, weight in enumerate(weights):
+                quantity = prefix[day + 1] - prefix[day]
+                if quantity:
+                    weighted += quantity * weight
+            rates[product_id] = weighted / norm
+        return rates
+
+    def rates(self, product_id: str, windows: Tuple[int, ...] = SALES_WINDOWS) -> Dict[str, float]:
+        """
+        All configured window rates plus the EWMA rate for one product.
+
+        Args:
+            product_id: Product identifier
+            windows: Window lengths in days
+
+        Returns:
+            {'7d': float, '30d': float, '90d': float, 'ewma': float}
+        """
+        result = {f'{days}d': self.rate(product_id, days) for days in windows}
+        result['ewma'] = self.ewma_rate(product_id)
+        return result
+
+    def stock_rate(self, product_id: str, window: str = STOCK_RATE_WINDOW) -> float:
+        """
+        Daily sales rate used for stockDays.
+
+        Args:
+            product_id: Product identifier
+            window: Number of days (as string or int) or "ewma"
+
+        Returns:
+            Daily sales rate
+        """
+        if window == 'ewma':
+            return self.ewma_rate(product_id)
+        return self.rate(product_id, int(window))
+
+
+class SalesRateIndex:
+    """
+    Window totals and the EWMA rate per product, without day buckets.
+
+    Answers the same rate(), ewma_rate(), rates() and stock_rate() queries as
+    SalesWindows.from_orders for the configured windows, but keeps a handful
+    of numbers per sold product instead of horizon + 1 prefix sums, so the
+    index of a large catalog stays small (streaming mode). Day window rates
+    match SalesWindows exactly; EWMA rates up to floating point rounding.
+    """
+
+    def __init__(self, windows: Tuple[int, ...], horizon: int, as_of: Optional[date],
+                 half_life: float = EWMA_HALF_LIFE_DAYS):
+        self.horizon = max(horizon, *SALES_WINDOWS, 1)
+        self.windows = tuple(sorted({min(days, self.horizon) for days in windows}))
+        self.as_of = as_of
+        self.half_life = half_life
+        self._column = {days: column for column, days in enumerate(self.windows)}
+        self._totals: Dict[str, list] = {}
+
+    @classmethod
+    def from_orders(cls, order_history: list, as_of=None, horizon: int = SALES_HORIZON_DAYS,
+                    stock_window: str = STOCK_RATE_WINDOW) -> 'SalesRateIndex':
+        """
+        Sums all order lines into per-product window totals in a single pass.
+
+        Args:
+            order_history: List of order dictionaries (orderDate, items)
+            as_of: As-of date (date or ISO string); defaults to the latest order date
+            horizon: Horizon of the equivalent SalesWindows
+            stock_window: stockDays window; added to SALES_WINDOWS if it is a
+                number of days not among them
+
+        Returns:
+            SalesRateIndex over the order history
+        """
+        windows = SALES_WINDOWS if stock_window == 'ewma' else SALES_WINDOWS + (int(stock_window),)
+        index = cls(windows, horizon, resolve_as_of(order_history, as_of))
+        horizon = index.horizon
+        oldest = horizon - 1
+        n_windows = len(index.windows)
+        decay = 0.5 ** (1.0 / index.half_life)
+        # Columns a line of each day adds to: windows longer than the day, then the EWMA
+        first_column = [sum(1 for days in index.windows if days <= day) for day in range(horizon)]
+        weights = [decay ** day for day in range(horizon)]
+        day_cache = {}
+        totals = index._totals
+
+        for order in order_history:
+            if 'items' not in order:
+                continue
+            value = order.get('orderDate')
+            day = day_cache.get(value)
+            if day is None:
+                order_date = parse_order_date(value)
+                if order_date is None or index.as_of is None:
+                    day = oldest
+                else:
+                    day = max((index.as_of - order_date).days, 0)
+                day_cache[value] = day
+            if day >= horizon:
+                continue
+            first = first_column[day]
+            weight = weights[day]
+            for item in order['items']:
+                product_id = item.get('productId')
+                quantity = item.get('quantity', 0)
+                product_totals = totals.get(product_id)
+                if product_totals is None:
+                    product_totals = totals[product_id] = [0] * n_windows + [0.0]
+                for column in range(first, n_windows):
+                    product_totals[column] += quantity
+                product_totals[n_windows] += quantity * weight
+
+        norm = sum(weights)
+        for product_totals in totals.values():
+            product_totals[n_windows] /= norm
+        return index
+
+    def rate(self, product_id: str, days: int) -> float:
+        """
+        Average daily sales over the last `days` days (a configured window).
+
+        Args:
+            product_id: Product identifier
+            days: Window length in days
+
+        Returns:
+            Daily sales rate
+        """
+        days = min(days, self.horizon)
+        column = self._column.get(days)
+        if column is None:
+            raise ValueError(f"{days}-day window is not indexed (windows: {self.windows})")
+        product_totals = self._totals.get(product_id)
+        return (product_totals[column] if product_totals is not None else 0) / float(days)
+
+    def ewma_rate(self, product_id: str, half_life: float = EWMA_HALF_LIFE_DAYS) -> float:
+        """
+        Exponentially weighted daily sales rate (indexed half-life only).
+
+        Args:
+            product_id: Product identifier
+            half_life: Days after which a day's weight halves
+
+        Returns:
+            Weighted mean of the daily quantities over the horizon
+        """
+        if half_life != self.half_life:
+            raise ValueError(f"EWMA half-life {half_life} is not indexed (half-life: {self.half_life})")
+        product_totals = self._totals.get(product_id)
+        return product_totals[-1] if product_totals is not None else 0.0
+
+    def rates(self, product_id: str, windows: Tuple[int, ...] = SALES_WINDOWS) -> Dict[str, float]:
+        """
+        All configured window rates plus the EWMA rate for one product.
+
+        Args:
+            product_id: Product identifier
+            windows: Window lengths in days
+
+        Returns:
+            {'7d': float, '30d': float, '90d': float, 'ewma': float}
+        """
+        result = {f'{days}d': self.rate(product_id, days) for days in windows}
+        result['ewma'] = self.ewma_rate(product_id)
+        return result
+
+    def stock_rate(self, product_id: str, window: str = STOCK_RATE_WINDOW) -> float:
+        """
+        Daily sales rate used for stockDays.
+
+        Args:
+            product_id: Product identifier
+            window: Number of days (as string or int) or "ewma"
+
+        Returns:
+            Daily sales rate
+        """
+        if window == 'ewma':
+            return self.ewma_rate(product_id)
+        return self.rate(product_id, int(window))
+
+
+def stock_rate_index(order_history: list, as_of=None, window: str = STOCK_RATE_WINDOW,
+                     horizon: int = SALES_HORIZON_DAYS, scale: float = 1) -> Dict[str, float]:
+    """
+    stockDays sales rate of every sold product in one pass, without day buckets.
+
+    Equivalent to SalesWindows.from_orders(order_history, as_of, horizon,
+    scale=scale).stock_rate(productId, window) for every product (up to
+    floating point rounding; day windows match exactly), but only one number
+    is kept per product, so it is far cheaper when the per-window rates are
+    not needed, e.g. to screen a whole catalog.
+
+    Args:
+        order_history: List of order dictionaries (orderDate, items)
+        as_of: As-of date (date or ISO string); defaults to the latest order date
+        window: Number of days (as string or int) or "ewma"
+        horizon: Number of day buckets of the equivalent SalesWindows
+        scale: Factor applied to every quantity
+
+    Returns:
+        {productId: daily sales rate}; products without sales are absent
+    """
+    as_of = resolve_as_of(order_history, as_of)
+    horizon = max(horizon, *SALES_WINDOWS, 1)
+    oldest = horizon - 1
+    if window == 'ewma':
+        decay = 0.5 ** (1.0 / EWMA_HALF_LIFE_DAYS)
+        weights = [decay ** day for day in range(horizon)]
+        divisor = sum(weights)
+    else:
+        days = min(int(window), horizon)
+        weights = [1.0 if day < days else 0.0 for day in range(horizon)]
+        divisor = float(days)
+
+    day_cache = {}
+    totals = {}
+    for order in order_history:
+        if 'items' not in order:
+            continue
+        value = order.get('orderDate')
+        day = day_cache.get(value)
+        if day is None:
+            order_date = parse_order_date(value)
+            if order_date is None or as_of is None:
+                day = oldest
+            else:
+                day = max((as_of - order_date).days, 0)
+            day_cache[value] = day
+        if day >= horizon or not weights[day]:
+            continue
+        weight = weights[day]
+        for item in order['items']:
+            product_id = item.get('productId')
+            totals[product_id] = totals.get(product_id, 0) + item.get('quantity', 0) * weight
+
+    return {product_id: total * scale / divisor for product_id, total in totals.items()}
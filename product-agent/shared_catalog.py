@@ -0,0 +1,291 @@
+"""
+Shared Columnar Catalog
+
+Memory-mapped, column-oriented copy of a tenant catalog for multi-worker
+product analysis. The catalog is written once to a file (on /dev/shm when
+available, so it lives in shared memory) and every worker maps the same pages
+read-only instead of unpickling its own list of product dicts.
+
+Column kinds:
+    i  int64 values
+    f  float64 values
+    s  UTF-8 strings (blob + offsets), decoded on access
+    c  dictionary-coded values (int32 codes into a small value table), used
+       for low-cardinality fields such as category, lifecycleStage or
+       seasonalityRules
+    j  per-row JSON (blob + offsets) for anything else
+
+Each column has an optional presence mask, so a missing key still falls back
+to the caller's .get() default exactly like a dict. CatalogRow exposes the
+dict read API (get / [] / in), so StockAnalyzer, PerformanceSegmenter and
+SeasonalAnalyzer read rows straight from the mapped columns.
+"""
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from typing import Any, Iterator, List, Optional
+
+MAGIC = b'PACAT001'
+_HEADER = struct.Struct('<8sQ')
+_ALIGN = 8
+
+# Columns with at most this many distinct values (and at most a quarter of the
+# rows) are dictionary-coded
+MAX_CODED_VALUES = 4096
+
+_MISSING = object()
+
+
+def _is_int(value) -> bool:
+    return type(value) is int and -(1 << 63) <= value < (1 << 63)
+
+
+def _pad(length: int) -> int:
+    return (-length) % _ALIGN
+
+
+class _ColumnWriter:
+    """Encodes one product field into column buffers."""
+
+    def __init__(self, name: str, values: list, rows: int):
+        self.name = name
+        present = [value is not _MISSING for value in values]
+        self.mask = None if all(present) else array('b', present)
+        actual = [value for value in values if value is not _MISSING]
+        filler = lambda default: [default if value is _MISSING else value for value in values]
+
+        self.meta = {}
+        self.buffers = []
+
+        if actual and all(_is_int(value) for value in actual):
+            self.kind = 'i'
+            self.buffers.append(('data', array('q', filler(0)).tobytes()))
+        elif actual and all(type(value) is float for value in actual):
+            self.kind = 'f'
+            self.buffers.append(('data', array('d', filler(0.0)).tobytes()))
+        elif self._try_code(values, actual, rows):
+            self.kind = 'c'
+        elif actual and all(type(value) is str for value in actual):
+            self.kind = 's'
+            self._blob(filler(''), lambda value: value.encode('utf-8'))
+        else:
+            self.kind = 'j'
+            self._blob(filler(None), lambda value: json.dumps(value).encode('utf-8'))
+
+        if self.mask is not None:
+            self.buffers.append(('mask', self.mask.tobytes()))
+
+    def _try_code(self, values: list, actual: list, rows: int) -> bool:
+        # Distinct key -> (code, first seen value); the type is part of the key
+        # so 1, 1.0 and True stay distinct
+        limit = min(MAX_CODED_VALUES, max(16, rows // 4))
+        distinct = {}
+        keys = []
+        for value in values:
+            if value is _MISSING:
+                keys.append(None)
+                continue
+            if isinstance(value, (str, int, float, bool)) or value is None:
+                key = (type(value), value)
+            else:
+                key = json.dumps(value, sort_keys=True)
+            if key not in distinct:
+                if len(distinct) >= limit:
+                    return False
+                distinct[key] = (len(distinct), value)
+            keys.append(key)
+
+        self.meta['values'] = [value for _, value in distinct.values()]
+        codes = array('i', (-1 if key is None else distinct[key][0] for key in keys))
+        self.buffers.append(('data', codes.tobytes()))
+        return True
+
+    def _blob(self, values: list, encode) -> None:
+        offsets = array('q', [0])
+        chunks = []
+        total = 0
+        for value in values:
+            chunk = encode(value)
+            chunks.append(chunk)
+            total += len(chunk)
+            offsets.append(total)
+        self.buffers.append(('offsets', offsets.tobytes()))
+        self.buffers.append(('blob', b''.join(chunks)))
+
+
+def write_catalog(products: list, climate_data: Optional[dict] = None, path: Optional[str] = None) -> str:
+    """
+    Writes products (and climate data) as a columnar catalog file.
+
+    Args:
+        products: List of product dictionaries (JSON-compatible values)
+        climate_data: Climate data by city, stored in the header
+        path: Target file; defaults to a new file in shared memory (/dev/shm)
+            or the temp directory
+
+    Returns:
+        Path of the written catalog
+    """
+    if path is None:
+        directory = '/dev/shm' if os.path.isdir('/dev/shm') else None
+        fd, path = tempfile.mkstemp(prefix='product-catalog-', suffix='.pacat', dir=directory)
+        os.close(fd)
+
+    rows = len(products)
+    fields = []
+    for product in products:
+        for key in product:
+            if key not in fields:
+                fields.append(key)
+
+    columns = {}
+    body = []
+    offset = 0
+    for name in fields:
+        column = _ColumnWriter(name, [product.get(name, _MISSING) for product in products], rows)
+        meta = dict(column.meta, kind=column.kind)
+        for buffer_name, data in column.buffers:
+            meta[buffer_name] = [offset, len(data)]
+            body.append(data + b'\0' * _pad(len(data)))
+            offset += len(data) + _pad(len(data))
+        columns[name] = meta
+
+    header = json.dumps({
+        'rows': rows,
+        'columns': columns,
+        'climateData': climate_data or {}
+    }, ensure_ascii=False).encode('utf-8')
+    header += b' ' * _pad(_HEADER.size + len(header))
+
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, len(header)))
+        f.write(header)
+        for chunk in body:
+            f.write(chunk)
+    return path
+
+
+class _Column:
+    """Read-only view of one mapped column."""
+
+    __slots__ = ('kind', 'data', 'mask', 'offsets', 'blob', 'values')
+
+    def __init__(self, buffer: memoryview, base: int, meta: dict):
+        def view(name, fmt=None):
+            if name not in meta:
+                return None
+            start, length = meta[name]
+            region = buffer[base + start:base + start + length]
+            return region.cast(fmt) if fmt else region
+
+        self.kind = meta['kind']
+        self.mask = view('mask', 'b')
+        self.values = meta.get('values')
+        self.offsets = view('offsets', 'q')
+        self.blob = view('blob')
+        self.data = view('data', {'i': 'q', 'f': 'd', 'c': 'i'}.get(self.kind, 'B')) if 'data' in meta else None
+
+    def get(self, index: int, default: Any = None) -> Any:
+        if self.mask is not None and not self.mask[index]:
+            return default
+        kind = self.kind
+        if kind == 'i' or kind == 'f':
+            return self.data[index]
+        if kind == 'c':
+            return self.values[self.data[index]]
+        raw = self.blob[self.offsets[index]:self.offsets[index + 1]]
+        if kind == 's':
+            return str(raw, 'utf-8')
+        return json.loads(bytes(raw))
+
+
+class CatalogRow:
+    """Dict-like, read-only view of one catalog row."""
+
+    __slots__ = ('_catalog', '_index')
+
+    def __init__(self, catalog: 'SharedCatalog', index: int):
+        self._catalog = catalog
+        self._index = index
+
+    def get(self, key: str, default: Any = None) -> Any:
+        column = self._catalog.columns.get(key)
+        if column is None:
+            return default
+        return column.get(self._index, default)
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def to_dict(self) -> dict:
+        """Materializes the row as a plain product dictionary."""
+        return {key: value for key in self._catalog.columns
+                for value in (self.get(key, _MISSING),) if value is not _MISSING}
+
+
+class SharedCatalog:
+    """Memory-mapped columnar catalog written by write_catalog()."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+
+        magic, header_length = _HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a product catalog file: {path}")
+        header = json.loads(bytes(self._buffer[_HEADER.size:_HEADER.size + header_length]))
+        base = _HEADER.size + header_length
+
+        self.rows = header['rows']
+        self.climate_data = header['climateData']
+        self.columns = {name: _Column(self._buffer, base, meta) for name, meta in header['columns'].items()}
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def row(self, index: int) -> CatalogRow:
+        """Row view at a catalog position."""
+        return CatalogRow(self, index)
+
+    def rows_at(self, positions: Optional[list] = None) -> List[CatalogRow]:
+        """Row views for the given positions (all rows by default)."""
+        if positions is None:
+            positions = range(self.rows)
+        return [CatalogRow(self, index) for index in positions]
+
+    def __iter__(self) -> Iterator[CatalogRow]:
+        return iter(self.rows_at())
+
+    def close(self) -> None:
+        """Releases the mapping; row views must not be used afterwards."""
+        for column in self.columns.values():
+            for name in ('data', 'mask', 'offsets', 'blob'):
+                view = getattr(column, name)
+                if view is not None:
+                    view.release()
+        self.columns = {}
+        self._buffer.release()
+        self._mmap.close()
+
+    def __enter__(self) -> 'SharedCatalog':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_catalog(path: str) -> SharedCatalog:
+    """Maps a catalog file written by write_catalog()."""
+    return SharedCatalog(path)
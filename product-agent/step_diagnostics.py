@@ -0,0 +1,286 @@
+"""
+Step Diagnostics
+
+Instrumentation for the execute() steps of the orchestrators, used through
+StepTimer (product_analysis_agent.py):
+
+    StepHistograms    cumulative per-step duration histograms for the
+                      process, fed by every request while
+                      PRODUCT_ANALYSIS_STEP_METRICS is on and exposed as a
+                      snapshot (metrics request) or Prometheus text
+    SamplingProfiler  a stack sampler thread for one request thread,
+                      activated by the payload "profile" flag; samples are
+                      attributed to the step running when they were taken
+    allocations       net and peak tracemalloc bytes per step, activated by
+                      the payload "diagnostics" flag; tracing is process-wide,
+                      so concurrent requests see each other's allocations
+
+The profiler and allocation tracing change process-wide state (the switch
+interval, tracemalloc) and slow down every concurrent request, so the
+payload flags are ignored unless PRODUCT_ANALYSIS_REQUEST_DIAGNOSTICS is on.
+
+Nothing here runs unless enabled: a request without debug, diagnostics or
+profile flags and with step metrics off takes the same no-op path as before.
+"""
+
+import bisect
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+# Record every request's step durations into STEP_HISTOGRAMS
+STEP_METRICS_ENABLED = os.environ.get('PRODUCT_ANALYSIS_STEP_METRICS', 'false').lower() in ('1', 'true', 'yes')
+
+# Upper bounds (ms) of the histogram buckets; a final +Inf bucket is implied
+STEP_BUCKETS_MS = (0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0, 5000.0, 10000.0)
+
+# Honor the payload "diagnostics" and "profile" flags
+REQUEST_DIAGNOSTICS_ENABLED = os.environ.get(
+    'PRODUCT_ANALYSIS_REQUEST_DIAGNOSTICS', 'false'
+).lower() in ('1', 'true', 'yes')
+
+# Default and smallest sampling interval of the request profiler
+PROFILE_INTERVAL_MS = float(os.environ.get('PRODUCT_ANALYSIS_PROFILE_INTERVAL_MS', '2'))
+MIN_PROFILE_INTERVAL_MS = 1.0
+
+# Functions and folded stacks returned in a profile report
+PROFILE_TOP_FUNCTIONS = 20
+PROFILE_TOP_STACKS = 50
+
+
+class StepHistograms:
+    """Cumulative step duration histograms, safe to update from any thread."""
+
+    def __init__(self, bounds: Tuple[float, ...] = STEP_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self._steps: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, duration_ms: float) -> None:
+        """
+        Adds one step duration.
+
+        Args:
+            name: Step name
+            duration_ms: Step wall time in milliseconds
+        """
+        index = bisect.bisect_left(self.bounds, duration_ms)
+        with self._lock:
+            entry = self._steps.get(name)
+            if entry is None:
+                # [bucket counts..., +Inf count, total count, sum ms]
+                entry = self._steps[name] = [0] * (len(self.bounds) + 2) + [0.0]
+            entry[index] += 1
+            entry[-2] += 1
+            entry[-1] += duration_ms
+
+    def snapshot(self) -> dict:
+        """
+        Current histograms.
+
+        Returns:
+            {"bucketsMs": upper bounds, "steps": {name: {"count", "sumMs",
+            "buckets": cumulative counts per bound, then +Inf}}}
+        """
+        with self._lock:
+            steps = {name: list(entry) for name, entry in self._steps.items()}
+        result = {}
+        for name, entry in steps.items():
+            cumulative = []
+            running = 0
+            for count in entry[:len(self.bounds) + 1]:
+                running += count
+                cumulative.append(running)
+            result[name] = {'count': entry[-2], 'sumMs': round(entry[-1], 3), 'buckets': cumulative}
+        return {'bucketsMs': list(self.bounds), 'steps': result}
+
+    def render_prometheus(self, metric: str = 'product_analysis_step_duration_ms') -> str:
+        """
+        Histograms in the Prometheus text exposition format.
+
+        Args:
+            metric: Metric name
+
+        Returns:
+            Exposition text
+        """
+        snapshot = self.snapshot()
+        lines = [f'# HELP {metric} Wall time of AgentOrchestrator.execute steps.', f'# TYPE {metric} histogram']
+        bounds = [f'{bound:g}' for bound in snapshot['bucketsMs']] + ['+Inf']
+        for name, entry in sorted(snapshot['steps'].items()):
+            for bound, count in zip(bounds, entry['buckets']):
+                lines.append(f'{metric}_bucket{{step="{name}",le="{bound}"}} {count}')
+            lines.append(f'{metric}_sum{{step="{name}"}} {entry["sumMs"]}')
+            lines.append(f'{metric}_count{{step="{name}"}} {entry["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self) -> None:
+        """Drops all recorded durations."""
+        with self._lock:
+            self._steps.clear()
+
+
+STEP_HISTOGRAMS = StepHistograms()
+
+
+_tracemalloc_users = 0
+_tracemalloc_owned = False
+_tracemalloc_lock = threading.Lock()
+
+
+def acquire_tracemalloc() -> None:
+    """Starts tracemalloc for a request unless it is already tracing."""
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_owned = True
+        _tracemalloc_users += 1
+
+
+def release_tracemalloc() -> None:
+    """Stops tracemalloc when the last request that needed it is done."""
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+
+
+_switch_users = 0
+_switch_interval = None
+_switch_lock = threading.Lock()
+
+
+def _shorten_switch_interval(interval: float) -> None:
+    global _switch_users, _switch_interval
+    with _switch_lock:
+        if _switch_users == 0:
+            _switch_interval = sys.getswitchinterval()
+        _switch_users += 1
+        if interval < sys.getswitchinterval():
+            sys.setswitchinterval(interval)
+
+
+def _restore_switch_interval() -> None:
+    global _switch_users
+    with _switch_lock:
+        _switch_users -= 1
+        if _switch_users == 0:
+            sys.setswitchinterval(_switch_interval)
+
+
+def _frame_key(code) -> Tuple[str, str, int]:
+    return (os.path.basename(code.co_filename), code.co_name, code.co_firstlineno)
+
+
+class SamplingProfiler:
+    """
+    Samples the call stack of one thread at a fixed interval.
+
+    Runs in a daemon thread reading sys._current_frames(), so the profiled
+    code is not instrumented and pays only for the GIL hand-offs of the
+    sampler (a few percent at the default interval). The sampler can only
+    run when the profiled thread yields the GIL, so while any profiler runs
+    the interpreter switch interval (sys.setswitchinterval, 5 ms by default)
+    is lowered to the sampling interval. Work done in other threads or
+    processes (e.g. the parallel mode's shard workers) is seen as the
+    request thread waiting on it.
+    """
+
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS, thread_id: Optional[int] = None,
+                 max_depth: int = 64):
+        self.interval = max(interval_ms, MIN_PROFILE_INTERVAL_MS) / 1000
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.max_depth = max_depth
+        self.step = None
+        self.samples = 0
+        self._stacks: Dict[tuple, int] = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._started_at = None
+        self._elapsed = 0.0
+
+    def start(self) -> None:
+        """Starts sampling (no-op if already running)."""
+        if self._thread is not None:
+            return
+        self._started_at = time.perf_counter()
+        _shorten_switch_interval(self.interval)
+        self._thread = threading.Thread(target=self._run, name='step-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops sampling and waits for the sampler thread."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        _restore_switch_interval()
+        self._elapsed += time.perf_counter() - self._started_at
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None or self._stop.is_set():
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(_frame_key(frame.f_code))
+                frame = frame.f_back
+            key = (self.step or '-', tuple(reversed(stack)))
+            self._stacks[key] = self._stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def report(self, top: int = PROFILE_TOP_FUNCTIONS, top_stacks: int = PROFILE_TOP_STACKS) -> dict:
+        """
+        Summarizes the samples taken so far.
+
+        Args:
+            top: Number of functions to list
+            top_stacks: Number of folded stacks to list
+
+        Returns:
+            intervalMs, durationMs, samples, samples per step, the functions
+            with the most samples (self = on top of the stack, total =
+            anywhere on it) and the hottest stacks in folded
+            "step;outer;...;inner count" form for flame graph tools
+        """
+        stacks = dict(self._stacks)
+        by_step: Dict[str, int] = {}
+        own: Dict[tuple, int] = {}
+        total: Dict[tuple, int] = {}
+        for (step, stack), count in stacks.items():
+            by_step[step] = by_step.get(step, 0) + count
+            if stack:
+                own[stack[-1]] = own.get(stack[-1], 0) + count
+            for frame in set(stack):
+                total[frame] = total.get(frame, 0) + count
+
+        samples = sum(stacks.values()) or 1
+        functions: List[dict] = []
+        for frame, count in sorted(own.items(), key=lambda item: (-item[1], item[0]))[:top]:
+            filename, name, line = frame
+            functions.append({
+                'function': f'{name} ({filename}:{line})',
+                'selfSamples': count,
+                'totalSamples': total[frame],
+                'selfPct': round(count * 100 / samples, 1),
+            })
+        folded = [
+            ';'.join([step] + [f'{name} ({filename}:{line})' for filename, name, line in stack]) + f' {count}'
+            for (step, stack), count in sorted(stacks.items(), key=lambda item: -item[1])[:top_stacks]
+        ]
+        return {
+            'intervalMs': round(self.interval * 1000, 3),
+            'durationMs': round(self._elapsed * 1000, 3),
+            'samples': sum(stacks.values()),
+            'byStep': dict(sorted(by_step.items(), key=lambda item: -item[1])),
+            'topFunctions': functions,
+            'folded': folded,
+        }
@@ -0,0 +1,248 @@
+"""
+Tenant Settings Cache
+
+Per-tenant analyzer thresholds compiled from the tenants configuration
+(mock-data/tenants.json, mirroring the `tenants` collection):
+
+    settings.stockDaysThreshold  Excess / inventoryPressure cutoff (default 60);
+                                 the Critical cutoff is a quarter of it (15)
+                                 unless settings.criticalStockDays is given.
+                                 It also bounds the performance segments:
+                                 Steady needs stockDays below it, Star below
+                                 half of it (30)
+    settings.marginFloor         POOR / MODERATE margin cutoff (default 25);
+                                 GOOD and EXCELLENT stay at 40 / 60 unless the
+                                 floor is above them
+    settings.maxRecommendations  carried for the campaign layer
+    settings.currency            carried for the campaign layer
+
+The product agent ships its own tenants file (data/tenants.json, tenantId
+and settings only); TENANT_SETTINGS_PATH points elsewhere. A process that
+finds no file logs a warning once and serves every tenant the defaults.
+
+The file is read and compiled once per process into immutable
+TenantThresholds tuples. It is re-checked at most every
+TENANT_SETTINGS_REFRESH_SECONDS and recompiled only when its size or mtime
+changed, so a warm process serves any number of tenants without a config
+lookup per request. Unknown tenants and a missing file use the defaults,
+which reproduce the original hardcoded cutoffs.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_ROOT = os.path.dirname(_HERE)
+
+TENANT_SETTINGS_CANDIDATES = (
+    os.path.join(_HERE, 'data', 'tenants.json'),
+    os.path.join(_ROOT, 'mock-data', 'tenants.json'),
+    os.path.join(_ROOT, 'customer-segment-agent', 'mock-data', 'tenants.json'),
+)
+TENANT_SETTINGS_PATH = os.environ.get('TENANT_SETTINGS_PATH', '')
+TENANT_SETTINGS_REFRESH_SECONDS = float(os.environ.get('TENANT_SETTINGS_REFRESH_SECONDS', '30'))
+
+DEFAULT_STOCK_DAYS_THRESHOLD = 60
+DEFAULT_MARGIN_FLOOR = 25.0
+DEFAULT_MAX_RECOMMENDATIONS = 3
+CRITICAL_STOCK_DAYS_RATIO = 0.25
+STAR_STOCK_DAYS_RATIO = 0.5
+GOOD_MARGIN = 40.0
+EXCELLENT_MARGIN = 60.0
+
+
+class TenantThresholds(NamedTuple):
+    """Compiled analyzer cutoffs for one tenant."""
+
+    critical_stock_days: float
+    excess_stock_days: float
+    # Performance segment cutoffs: Star below star_stock_days, Steady below steady_stock_days
+    star_stock_days: float
+    steady_stock_days: float
+    # (exclusive lower bound, marginHealth), highest band first; below all -> POOR
+    margin_bands: Tuple[Tuple[float, str], ...]
+    max_recommendations: int
+    currency: str
+
+    def classify_stock_segment(self, stock_days: float) -> str:
+        """
+        Classify as Critical, Healthy or Excess.
+
+        Args:
+            stock_days: Days of inventory remaining
+
+        Returns:
+            Stock segment classification
+        """
+        if stock_days < self.critical_stock_days:
+            return "Critical"
+        elif stock_days <= self.excess_stock_days:
+            return "Healthy"
+        return "Excess"
+
+    def classify_margin(self, margin: float) -> str:
+        """
+        Classify a margin percentage as EXCELLENT, GOOD, MODERATE or POOR.
+
+        Args:
+            margin: Margin percentage
+
+        Returns:
+            Margin health classification
+        """
+        for bound, label in self.margin_bands:
+            if margin > bound:
+                return label
+        return "POOR"
+
+
+def _number(settings: dict, key: str, default: float) -> float:
+    value = settings.get(key)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        return default
+    return value
+
+
+def compile_thresholds(settings: Optional[dict] = None) -> TenantThresholds:
+    """
+    Compiles a tenant's settings into threshold tables.
+
+    Args:
+        settings: Tenant settings dictionary (missing or invalid values use
+                  the defaults)
+
+    Returns:
+        TenantThresholds
+    """
+    settings = settings if isinstance(settings, dict) else {}
+    excess = _number(settings, 'stockDaysThreshold', DEFAULT_STOCK_DAYS_THRESHOLD)
+    critical = min(_number(settings, 'criticalStockDays', excess * CRITICAL_STOCK_DAYS_RATIO), excess)
+    floor = min(_number(settings, 'marginFloor', DEFAULT_MARGIN_FLOOR), 100.0)
+    good = max(GOOD_MARGIN, floor)
+    max_recommendations = settings.get('maxRecommendations')
+    if isinstance(max_recommendations, bool) or not isinstance(max_recommendations, int) \
+            or max_recommendations < 1:
+        max_recommendations = DEFAULT_MAX_RECOMMENDATIONS
+    currency = settings.get('currency')
+    return TenantThresholds(
+        critical_stock_days=critical,
+        excess_stock_days=excess,
+        star_stock_days=excess * STAR_STOCK_DAYS_RATIO,
+        steady_stock_days=excess,
+        margin_bands=((max(EXCELLENT_MARGIN, good), "EXCELLENT"), (good, "GOOD"), (floor, "MODERATE")),
+        max_recommendations=max_recommendations,
+        currency=currency if isinstance(currency, str) else 'TRY',
+    )
+
+
+DEFAULT_THRESHOLDS = compile_thresholds()
+
+
+def default_settings_path() -> Optional[str]:
+    """
+    Returns TENANT_SETTINGS_PATH or the first existing candidate file.
+
+    Returns:
+        Path to the tenants file, or None if there is none
+    """
+    if TENANT_SETTINGS_PATH:
+        return TENANT_SETTINGS_PATH
+    for path in TENANT_SETTINGS_CANDIDATES:
+        if os.path.exists(path):
+            return path
+    logger.warning("No tenants file found (set TENANT_SETTINGS_PATH); every tenant uses the default thresholds")
+    return None
+
+
+class TenantSettingsCache:
+    """Compiled TenantThresholds per tenantId, reloaded when the file changes."""
+
+    def __init__(self, path: Optional[str] = None,
+                 refresh_seconds: float = TENANT_SETTINGS_REFRESH_SECONDS):
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self._tables: Dict[str, TenantThresholds] = {}
+        self._signature = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def get(self, tenant_id: Optional[str]) -> TenantThresholds:
+        """
+        Thresholds for a tenant.
+
+        Args:
+            tenant_id: Tenant identifier from the payload
+
+        Returns:
+            The tenant's TenantThresholds, or DEFAULT_THRESHOLDS if unknown
+        """
+        now = time.monotonic()
+        checked_at = self._checked_at
+        if checked_at is None or now - checked_at >= self.refresh_seconds:
+            self._refresh(now)
+        return self._tables.get(tenant_id, DEFAULT_THRESHOLDS)
+
+    def _refresh(self, now: float) -> None:
+        with self._lock:
+            checked_at = self._checked_at
+            if checked_at is not None and now - checked_at < self.refresh_seconds:
+                return
+            self._checked_at = now
+            if self.path is None:
+                return
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                signature = None
+            else:
+                signature = (stat.st_size, stat.st_mtime_ns)
+            if signature == self._signature:
+                return
+            self._tables = self._load() if signature is not None else {}
+            self._signature = signature
+
+    def _load(self) -> Dict[str, TenantThresholds]:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Tenant settings not loaded from {self.path}: {e}")
+            return self._tables
+        tenants = data.get('tenants', []) if isinstance(data, dict) else data
+        tables = {}
+        for tenant in tenants if isinstance(tenants, list) else []:
+            if isinstance(tenant, dict) and isinstance(tenant.get('tenantId'), str) \
+                    and tenant.get('isActive', True) is not False:
+                tables[tenant['tenantId']] = compile_thresholds(tenant.get('settings'))
+        logger.info(f"Tenant settings compiled for {len(tables)} tenant(s) from {self.path}")
+        return tables
+
+
+_cache: Optional[TenantSettingsCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_tenant_thresholds(tenant_id: Optional[str]) -> TenantThresholds:
+    """
+    Thresholds for a tenant from the process-wide cache.
+
+    Args:
+        tenant_id: Tenant identifier from the payload
+
+    Returns:
+        TenantThresholds
+    """
+    global _cache
+    cache = _cache
+    if cache is None:
+        with _cache_lock:
+            cache = _cache
+            if cache is None:
+                cache = _cache = TenantSettingsCache(default_settings_path())
+    return cache.get(tenant_id)
@@ -0,0 +1,99 @@
+"""
+Performance Test: Latency-budgeted approximate mode vs the exact analysis
+
+Runs ApproximateAgentOrchestrator on a synthetic catalog for a range of
+latencyBudgetMs values and compares every answer with the exact
+AgentOrchestrator result. Reported per budget:
+
+    elapsed       wall time against the budget (withinBudget)
+    sampling      screened products and the fraction of orders used
+    lists         which lists match the exact result, and whether
+                  _approximation.exactLists claims no list that differs
+    bounds        estimated fields outside their 95% errorBounds
+                  ("-" when no bounds are given)
+
+A budget below the payload's minimum must be rejected with
+LATENCY_BUDGET_TOO_SMALL; any other run must finish within its budget.
+
+Usage:
+    python tests/performance_test_approximate.py [products] [orders] [budget_ms ...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from product_analysis_agent import AgentOrchestrator
+from product_analysis_approximate import ApproximateAgentOrchestrator
+from synthetic_catalog import build_payload
+
+LISTS = ("heroProducts", "newProducts", "seasonalProducts", "slowMovers")
+
+
+def ids(items: list) -> list:
+    return [item["productId"] for item in items]
+
+
+def outside_bounds(result: dict, exact: dict, bounds: dict) -> tuple:
+    outside = total = 0
+    for section in ("categoryInsights", "priceSegmentAnalysis"):
+        for key, fields in bounds.get(section, {}).items():
+            for field, bound in fields.items():
+                total += 1
+                outside += abs(result[section][key][field] - exact[section][key][field]) > bound + 0.01
+    for field, bound in bounds.get("inventorySummary", {}).items():
+        total += 1
+        outside += abs(result["inventorySummary"][field] - exact["inventorySummary"][field]) > bound + 0.01
+    return outside, total
+
+
+if __name__ == "__main__":
+    n_products = int(sys.argv[1]) if len(sys.argv) > 1 else 30_000
+    n_orders = int(sys.argv[2]) if len(sys.argv) > 2 else 60_000
+    budgets = [float(value) for value in sys.argv[3:]] or [2000, 1000, 500, 300, 100, 30]
+
+    payload = build_payload(n_products, n_orders)
+    start = time.perf_counter()
+    exact = AgentOrchestrator().execute(payload)
+    exact_ms = (time.perf_counter() - start) * 1000
+
+    orchestrator = ApproximateAgentOrchestrator()
+    # One run to calibrate the unit costs, as a warm agent would have
+    orchestrator.execute(dict(payload, latencyBudgetMs=budgets[0]))
+
+    print("=" * 100)
+    print(f"APPROXIMATE MODE ({n_products:,} products, {n_orders:,} orders, exact {exact_ms:.0f} ms)")
+    print("=" * 100)
+    print(f"{'budget':>8} {'elapsed':>9} {'within':>7} {'screened':>9} {'orders':>7} "
+          f"{'lists (H N S L)':>16} {'claims':>7} {'bounds':>8}")
+    print("-" * 100)
+    failed = False
+    for budget in budgets:
+        result = orchestrator.execute(dict(payload, latencyBudgetMs=budget))
+        approximation = result.pop("_approximation")
+        elapsed = approximation["elapsedMs"]
+        if "error" in result:
+            print(f"{budget:>8.0f} {elapsed:>9.1f} {'no':>7}  rejected: {result['error']['code']} "
+                  f"(minimum {approximation['minBudgetMs']:.0f} ms)")
+            failed |= result["error"]["code"] != "LATENCY_BUDGET_TOO_SMALL" or elapsed > budget
+            continue
+        matches = {key: ids(result[key]) == ids(exact[key]) for key in LISTS}
+        claims_ok = all(matches[key] for key in approximation.get("exactLists", LISTS))
+        bounds = approximation.get("errorBounds")
+        if bounds is None:
+            bounds_text = "-"
+        else:
+            outside, total = outside_bounds(result, exact, bounds)
+            bounds_text = f"{outside}/{total}"
+        screened = approximation.get("productSampling", {}).get("screened", n_products)
+        fraction = approximation.get("orderSampling", {}).get("fraction", 1.0)
+        lists_text = " ".join("=" if matches[key] else "x" for key in LISTS)
+        print(f"{budget:>8.0f} {elapsed:>9.1f} {'yes' if elapsed <= budget else 'NO':>7} {screened:>9,} "
+              f"{fraction:>7.3f} {lists_text:>16} {'ok' if claims_ok else 'WRONG':>7} {bounds_text:>8}")
+        failed |= elapsed > budget or not claims_ok
+    print("=" * 100)
+
+    if failed:
+        sys.exit(1)
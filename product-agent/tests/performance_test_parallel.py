@@ -0,0 +1,112 @@
+"""
+Performance Test: Sharded parallel product analysis, scaling from 1 to N workers
+
+Generates a synthetic catalog with order history, runs the serial
+AgentOrchestrator once as reference, then ParallelAgentOrchestrator with
+1..N workers. Every parallel result must be identical to the serial one.
+
+Usage:
+    python tests/performance_test_parallel.py [products] [orders] [max_workers]
+"""
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from product_analysis_agent import AgentOrchestrator
+from product_analysis_parallel import ParallelAgentOrchestrator
+
+CATEGORIES = ["MAKEUP", "SKINCARE", "HAIRCARE", "FRAGRANCE", "PERSONAL_CARE", "WELLNESS"]
+LIFECYCLES = ["NEW", "GROWTH", "MATURE", "DECLINING"]
+RULES = [
+    {"ruleType": "HIGH_HUMIDITY", "threshold": 70},
+    {"ruleType": "LOW_TEMP", "threshold": 10},
+    {"ruleType": "HIGH_RAINFALL", "threshold": 60},
+    {"ruleType": "SEASON_TAG", "threshold": 0, "thresholdText": "winter"},
+]
+CLIMATE = {
+    "Istanbul": {"humidityPct": 72.5, "avgTempC": 12.3, "rainfallMm": 85.2, "seasonTag": "winter"},
+    "Antalya": {"humidityPct": 65.0, "avgTempC": 18.5, "rainfallMm": 45.0, "seasonTag": "spring"},
+    "Izmir": {"humidityPct": 68.0, "avgTempC": 14.8, "rainfallMm": 62.5, "seasonTag": "winter"},
+    "Erzurum": {"humidityPct": 55.0, "avgTempC": -4.0, "rainfallMm": 40.0, "seasonTag": "winter"},
+}
+
+
+def iter_products(n_products: int, rng: random.Random):
+    for i in range(n_products):
+        cost = round(rng.uniform(5, 400), 2)
+        seasonal = rng.random() < 0.3
+        yield {
+            "productId": f"P{i:07d}",
+            "productName": f"Product {i}",
+            "category": rng.choice(CATEGORIES),
+            "brand": "Farmasi",
+            "isSeasonal": seasonal,
+            "seasonCode": rng.choice(["WINTER", "SUMMER", "all"]) if seasonal else "all",
+            "stock": rng.randint(0, 2000),
+            "cost": cost,
+            "basePrice": round(cost * rng.uniform(1.1, 3.5), 2),
+            "lifecycleStage": rng.choice(LIFECYCLES),
+            "trendScore": rng.randint(20, 100),
+            "seasonalityRules": rng.sample(RULES, rng.randint(0, 2)),
+        }
+
+
+def build_input(n_products: int, n_orders: int, seed: int = 42) -> dict:
+    rng = random.Random(seed)
+    products = list(iter_products(n_products, rng))
+    orders = []
+    for i in range(n_orders):
+        items = [
+            {"productId": f"P{rng.randrange(n_products):07d}", "quantity": rng.randint(1, 5)}
+            for _ in range(rng.randint(1, 4))
+        ]
+        orders.append({"orderId": f"O{i:08d}", "orderDate": "2024-01-15", "items": items})
+    return {
+        "tenantId": "bench-tenant",
+        "products": products,
+        "orderHistory": orders,
+        "currentMonth": 1,
+        "climateData": CLIMATE,
+    }
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    n_products = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    n_orders = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 1)
+
+    payload = build_input(n_products, n_orders)
+    serial_result, serial_s = timed(AgentOrchestrator().execute, payload)
+    serial_json = json.dumps(serial_result, sort_keys=True)
+
+    print("=" * 70)
+    print(f"PARALLEL PRODUCT ANALYSIS ({n_products:,} products, {n_orders:,} orders, "
+          f"{os.cpu_count()} CPUs)")
+    print("=" * 70)
+    print(f"{'Mode':<14} {'Seconds':>10} {'Speedup':>10}  Identical")
+    print(f"{'serial':<14} {serial_s:>10.3f} {1.0:>10.2f}  -")
+
+    workers = 1
+    while True:
+        orchestrator = ParallelAgentOrchestrator(workers, min_products=0)
+        # Warm the pool so process start-up is not counted
+        orchestrator.execute(build_input(workers * 10, 10, seed=1))
+        result, seconds = timed(orchestrator.execute, payload)
+        identical = json.dumps(result, sort_keys=True) == serial_json
+        print(f"{f'{workers} workers':<14} {seconds:>10.3f} {serial_s / seconds:>10.2f}  {identical}")
+        assert identical, f"parallel result with {workers} workers differs from serial"
+        if workers >= max_workers:
+            break
+        workers = min(workers * 2, max_workers)
+
+    print("=" * 70)
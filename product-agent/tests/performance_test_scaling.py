@@ -0,0 +1,148 @@
+"""
+Performance Test: Per-stage scaling of AgentOrchestrator.execute with a regression gate
+
+Generates synthetic payloads (tests/synthetic_catalog.py) for each size,
+runs the serial AgentOrchestrator with debug tracing and records the best
+(minimum) duration of every execute() step (validate, stock, performance,
+seasonal, recommendation, category, price_segment, format) over several
+repeats; the minimum is far less sensitive to scheduler noise than the mean.
+As with timeit, the cyclic garbage collector is paused during each run so
+its pauses do not land in arbitrary steps.
+
+Results are written as JSON. When a baseline results file is given, every
+step slower than baseline * (1 + threshold) is reported as a regression and
+the script exits with status 1; steps below --min-ms in both runs are
+ignored as noise.
+
+Usage:
+    python tests/performance_test_scaling.py [--sizes 1000x5000,10000x50000]
+        [--cities 10] [--repeats 3] [--output results.json]
+        [--baseline baseline.json] [--threshold 0.25] [--min-ms 10]
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from product_analysis_agent import AgentOrchestrator
+from synthetic_catalog import build_payload
+
+DEFAULT_SIZES = "1000x5000,10000x50000,50000x250000"
+
+
+def parse_sizes(value: str) -> list:
+    sizes = []
+    for size in value.split(","):
+        products, _, orders = size.partition("x")
+        sizes.append((int(products), int(orders or 5 * int(products))))
+    return sizes
+
+
+def measure(n_products: int, n_orders: int, n_cities: int, repeats: int) -> dict:
+    payload = build_payload(n_products, n_orders, n_cities)
+    payload["debug"] = True
+    orchestrator = AgentOrchestrator()
+
+    steps = {}
+    totals = []
+    for _ in range(repeats):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            result = orchestrator.execute(payload)
+            totals.append((time.perf_counter() - start) * 1000)
+        finally:
+            gc.enable()
+        if "error" in result:
+            raise RuntimeError(f"analysis failed: {result['error']}")
+        for step in result["_trace"]:
+            steps.setdefault(step["name"], []).append(step["durationMs"])
+
+    return {
+        "products": n_products,
+        "orders": n_orders,
+        "cities": n_cities,
+        "steps": {name: round(min(values), 3) for name, values in steps.items()},
+        "totalMs": round(min(totals), 3),
+        "totalMedianMs": round(statistics.median(totals), 3),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_ms: float) -> list:
+    regressions = []
+    for size, current in results["results"].items():
+        previous = baseline.get("results", {}).get(size)
+        if previous is None:
+            continue
+        pairs = dict(current["steps"], totalMs=current["totalMs"])
+        reference = dict(previous["steps"], totalMs=previous["totalMs"])
+        for name, value in pairs.items():
+            before = reference.get(name)
+            if before is None or max(value, before) < min_ms:
+                continue
+            if value > before * (1 + threshold):
+                regressions.append((size, name, before, value))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated PRODUCTSxORDERS")
+    parser.add_argument("--cities", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown (0.25 = +25%%)")
+    parser.add_argument("--min-ms", type=float, default=10.0, help="ignore steps faster than this")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeats": args.repeats,
+            "recordedAt": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": {},
+    }
+
+    print("=" * 100)
+    print(f"PRODUCT ANALYSIS SCALING (best of {args.repeats}, ms)")
+    print("=" * 100)
+    header = None
+    for n_products, n_orders in parse_sizes(args.sizes):
+        stats = measure(n_products, n_orders, args.cities, args.repeats)
+        results["results"][f"{n_products}x{n_orders}"] = stats
+        if header is None:
+            header = list(stats["steps"])
+            print(f"{'Products':>9} {'Orders':>9} " + " ".join(f"{name[:10]:>10}" for name in header)
+                  + f" {'total':>10} {'us/prod':>8}")
+        print(f"{n_products:>9,} {n_orders:>9,} "
+              + " ".join(f"{stats['steps'].get(name, 0):>10.1f}" for name in header)
+              + f" {stats['totalMs']:>10.1f} {stats['totalMs'] * 1000 / n_products:>8.1f}")
+    print("=" * 100)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_ms)
+        for size, name, before, value in regressions:
+            print(f"REGRESSION {size} {name}: {before:.1f} ms -> {value:.1f} ms "
+                  f"(+{(value / before - 1) * 100:.0f}%, limit +{args.threshold * 100:.0f}%)")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond +{args.threshold * 100:.0f}% against {args.baseline}")
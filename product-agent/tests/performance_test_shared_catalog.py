@@ -0,0 +1,103 @@
+"""
+Performance Test: Per-worker memory with pickled product dicts vs shared catalog
+
+Each measurement runs in a fresh worker process and reports how much private
+(anonymous) RSS the worker gains while holding its view of the catalog:
+
+    dicts    catalog received as a pickled list of product dicts
+    shared   catalog mapped from the shared columnar file (CatalogRow views)
+
+Pages of the mapped file are shared between workers (RssShmem/RssFile), so
+they are reported separately. Both views must produce identical analysis.
+
+Usage:
+    python tests/performance_test_shared_catalog.py [products]
+"""
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from product_analysis_agent import AgentOrchestrator
+from shared_catalog import open_catalog, write_catalog
+
+
+def read_rss() -> dict:
+    rss = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(("RssAnon", "RssFile", "RssShmem")):
+                name, value = line.split(":")
+                rss[name] = int(value.split()[0])
+    return rss
+
+
+def hold_dicts(blob: bytes) -> dict:
+    before = read_rss()
+    products = pickle.loads(blob)
+    touched = sum(len(product["productName"]) for product in products)
+    after = read_rss()
+    return {key: after[key] - before[key] for key in after} | {"touched": touched}
+
+
+def hold_shared(path: str) -> dict:
+    before = read_rss()
+    catalog = open_catalog(path)
+    products = catalog.rows_at()
+    touched = sum(len(product["productName"]) for product in products)
+    after = read_rss()
+    return {key: after[key] - before[key] for key in after} | {"touched": touched}
+
+
+def analyze_both(path: str, products: list, climate: dict) -> bool:
+    orchestrator = AgentOrchestrator()
+    stock = orchestrator.stock_analyzer
+    performance = orchestrator.performance_segmenter
+    seasonal = orchestrator.seasonal_analyzer
+    with open_catalog(path) as catalog:
+        rows = catalog.rows_at(range(len(products)))
+        stock_metrics = stock.analyze(products, [])
+        same_stock = stock.analyze(rows, []) == stock_metrics
+        same_performance = performance.segment(rows, stock_metrics) == performance.segment(products, stock_metrics)
+        same_seasonal = seasonal.analyze(rows, 1, climate) == seasonal.analyze(products, 1, climate)
+    return same_stock and same_performance and same_seasonal
+
+
+if __name__ == "__main__":
+    from performance_test_parallel import CLIMATE, build_input
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    products = build_input(n, 0)["products"]
+
+    start = time.perf_counter()
+    path = write_catalog(products, CLIMATE)
+    write_s = time.perf_counter() - start
+    blob = pickle.dumps(products)
+
+    try:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            dicts = pool.submit(hold_dicts, blob).result()
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            shared = pool.submit(hold_shared, path).result()
+
+        print("=" * 72)
+        print(f"SHARED CATALOG ({n:,} products)")
+        print("=" * 72)
+        print(f"Catalog file: {os.path.getsize(path) / 1024 / 1024:.1f} MB, written in {write_s:.2f}s; "
+              f"pickle: {len(blob) / 1024 / 1024:.1f} MB")
+        print(f"{'Worker view':<12} {'RssAnon MB':>12} {'RssFile MB':>12} {'RssShmem MB':>12}")
+        for name, rss in (("dicts", dicts), ("shared", shared)):
+            print(f"{name:<12} {rss['RssAnon'] / 1024:>12.1f} {rss['RssFile'] / 1024:>12.1f} "
+                  f"{rss['RssShmem'] / 1024:>12.1f}")
+        assert dicts["touched"] == shared["touched"]
+
+        identical = analyze_both(path, products[:20_000], CLIMATE)
+        print(f"Analyzer results identical on catalog rows: {identical}")
+        assert identical
+        print("=" * 72)
+    finally:
+        os.unlink(path)
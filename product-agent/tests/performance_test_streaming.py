@@ -0,0 +1,162 @@
+"""
+Performance Test: Peak memory of batch vs chunked streaming product analysis
+
+Each measurement runs in a fresh worker process. Sales are given either as a
+pre-aggregated salesSummary or as an orderHistory (ORDERS_PER_PRODUCT orders
+per product over the last 90 days, held in memory as input); the batch run
+receives the catalog as a list, the streaming run as a generator, so the
+catalog is never materialized.
+Reported per run:
+
+    input MB   resident memory of the inputs before the analysis starts
+    peak MB    additional peak resident memory during the analysis
+
+Streaming seconds include generating the catalog rows on the fly.
+
+The batch and streaming results on the same catalog must be identical.
+
+Usage:
+    python tests/performance_test_streaming.py [products] [chunk_size] [batch_products] [summary|orders]
+"""
+import gc
+import hashlib
+import json
+import os
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from performance_test_parallel import CLIMATE, iter_products
+from product_analysis_agent import AgentOrchestrator
+from product_analysis_streaming import StreamingAgentOrchestrator
+
+ORDERS_PER_PRODUCT = 2
+AS_OF = date(2024, 3, 31)
+
+
+def build_orders(n_products: int, rng: random.Random) -> list:
+    # Most products sell rarely, a few often; one to three lines per order
+    orders = []
+    for i in range(n_products * ORDERS_PER_PRODUCT):
+        items = [
+            {"productId": f"P{int(n_products * rng.random() ** 3) * 7919 % n_products:07d}",
+             "quantity": rng.randint(1, 5)}
+            for _ in range(rng.randint(1, 3))
+        ]
+        orders.append({
+            "orderId": f"O{i:08d}",
+            "orderDate": (AS_OF - timedelta(days=rng.randrange(90))).isoformat(),
+            "items": items,
+        })
+    return orders
+
+
+def read_rss_kb() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS"):
+                return int(line.split()[1])
+    return 0
+
+
+def reset_peak() -> bool:
+    # Resets VmHWM so the peak covers the analysis only (Linux >= 4.0)
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def read_peak_kb() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM"):
+                return int(line.split()[1])
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run(mode: str, n_products: int, chunk_size: int, sales: str) -> dict:
+    start_rss = read_rss_kb()
+    rng = random.Random(42)
+    if sales == "orders":
+        sales_summary = None
+        order_history = build_orders(n_products, random.Random(7))
+    else:
+        sales_summary = {f"P{i:07d}": (i * 7919) % 120 for i in range(n_products)}
+        order_history = []
+    products = iter_products(n_products, rng)
+    if mode == "batch":
+        products = list(products)
+
+    gc.collect()
+    before = read_rss_kb()
+    reset_peak()
+    start = time.perf_counter()
+    if mode == "batch":
+        payload = {
+            "tenantId": "bench-tenant",
+            "products": products,
+            "orderHistory": order_history,
+            "currentMonth": 1,
+            "climateData": CLIMATE,
+        }
+        if sales_summary is not None:
+            payload["salesSummary"] = sales_summary
+        result = AgentOrchestrator().execute(payload)
+    else:
+        result = StreamingAgentOrchestrator(chunk_size).analyze_stream(
+            products, order_history, 1, CLIMATE, sales_summary=sales_summary
+        )
+    seconds = time.perf_counter() - start
+    peak = read_peak_kb()
+
+    return {
+        "inputMb": (before - start_rss) / 1024,
+        "peakMb": max(0, peak - before) / 1024,
+        "seconds": seconds,
+        "digest": hashlib.sha1(json.dumps(result, sort_keys=True).encode()).hexdigest(),
+        "newProducts": len(result["newProducts"]),
+    }
+
+
+def measure(mode: str, n_products: int, chunk_size: int, sales: str) -> dict:
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(run, mode, n_products, chunk_size, sales).result()
+
+
+if __name__ == "__main__":
+    n_products = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    batch_products = int(sys.argv[3]) if len(sys.argv) > 3 else 200_000
+    sales = sys.argv[4] if len(sys.argv) > 4 else "summary"
+
+    runs = [
+        ("batch", batch_products),
+        ("streaming", batch_products),
+        ("streaming", n_products),
+    ]
+
+    print("=" * 78)
+    print(f"STREAMING PRODUCT ANALYSIS (chunk {chunk_size:,}, sales from {sales})")
+    print("=" * 78)
+    print(f"{'Mode':<12} {'Products':>10} {'Input MB':>10} {'Peak MB':>10} {'Seconds':>10} {'NEW rows':>10}")
+
+    results = {}
+    for mode, n in runs:
+        stats = measure(mode, n, chunk_size, sales)
+        results[(mode, n)] = stats
+        print(f"{mode:<12} {n:>10,} {stats['inputMb']:>10.1f} {stats['peakMb']:>10.1f} "
+              f"{stats['seconds']:>10.2f} {stats['newProducts']:>10,}")
+
+    identical = results[("batch", batch_products)]["digest"] == results[("streaming", batch_products)]["digest"]
+    print(f"Streaming result identical to batch ({batch_products:,} products): {identical}")
+    assert identical
+    print("=" * 78)
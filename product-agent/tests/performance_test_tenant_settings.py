@@ -0,0 +1,83 @@
+"""
+Performance Test: Per-request tenant config lookup vs the warm settings cache
+
+Writes a tenants file with N tenants and serves mixed multi-tenant traffic:
+
+    per-request   read + parse tenants.json and compile the tenant's thresholds
+    cached        TenantSettingsCache.get (a change check at most every refresh)
+
+Usage:
+    python tests/performance_test_tenant_settings.py [tenants] [requests]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from tenant_settings import TenantSettingsCache, compile_thresholds
+
+
+def write_tenants(path: str, n_tenants: int, rng: random.Random) -> list:
+    tenants = [
+        {
+            "tenantId": f"tenant-{i:05d}",
+            "settings": {
+                "marginFloor": rng.choice([15, 20, 25, 30, 35]),
+                "stockDaysThreshold": rng.choice([30, 45, 60, 90]),
+                "maxRecommendations": rng.randint(1, 5),
+                "currency": "TRY",
+            },
+        }
+        for i in range(n_tenants)
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"tenants": tenants}, f)
+    return [tenant["tenantId"] for tenant in tenants]
+
+
+def per_request_lookup(path: str, tenant_id: str):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    for tenant in data["tenants"]:
+        if tenant["tenantId"] == tenant_id:
+            return compile_thresholds(tenant.get("settings"))
+    return compile_thresholds()
+
+
+if __name__ == "__main__":
+    n_tenants = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    n_requests = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tenants.json")
+        tenant_ids = write_tenants(path, n_tenants, rng)
+        traffic = [rng.choice(tenant_ids) for _ in range(n_requests)]
+
+        start = time.perf_counter()
+        for tenant_id in traffic:
+            expected = per_request_lookup(path, tenant_id)
+        per_request = time.perf_counter() - start
+
+        cache = TenantSettingsCache(path)
+        start = time.perf_counter()
+        cache.get(traffic[0])
+        first = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for tenant_id in traffic:
+            thresholds = cache.get(tenant_id)
+        cached = time.perf_counter() - start
+        assert thresholds == expected
+
+    print("=" * 70)
+    print(f"TENANT SETTINGS ({n_tenants:,} tenants, {n_requests:,} requests)")
+    print("=" * 70)
+    print(f"Per-request lookup: {per_request / n_requests * 1e6:10.1f} us/request")
+    print(f"Cache first load:   {first * 1000:10.2f} ms")
+    print(f"Cached lookup:      {cached / n_requests * 1e6:10.2f} us/request")
+    print("=" * 70)
@@ -0,0 +1,103 @@
+"""
+Performance Test: Cold vs warm latency of the AgentCore and Lambda handlers
+
+Cold: each sample is a fresh interpreter that imports product_analysis_agent
+and serves one request, with PRODUCT_ANALYSIS_WARMUP off (the first request
+pays for everything) and on (warmup runs at import, i.e. during cold start).
+
+Warm: in one process, after warmup(), repeated requests through the shared
+handler path (invoke / handle_payload) and lambda_handler, compared with the
+previous behaviour of constructing a new orchestrator per request.
+
+The payload is test/request.json, so the timings are dominated by fixed
+per-request overhead rather than analysis work.
+
+Usage:
+    python tests/performance_test_warm_handlers.py [cold_samples] [warm_requests]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+AGENT_DIR = os.path.join(HERE, "..")
+sys.path.insert(0, AGENT_DIR)
+
+REQUEST_PATH = os.path.join(AGENT_DIR, "test", "request.json")
+
+COLD_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import product_analysis_agent as agent
+imported = time.perf_counter()
+with open(sys.argv[1]) as f:
+    payload = json.load(f)
+payload = payload.get("input", payload)
+handler = sys.argv[2]
+if handler == "lambda":
+    agent.lambda_handler(payload, None)
+else:
+    (getattr(agent, "invoke", None) or agent.handle_payload)(payload)
+done = time.perf_counter()
+print(json.dumps({"importMs": (imported - start) * 1000, "firstRequestMs": (done - imported) * 1000}))
+"""
+
+
+def cold_sample(handler: str, warmup: bool) -> dict:
+    env = dict(os.environ, PRODUCT_ANALYSIS_WARMUP="1" if warmup else "0")
+    output = subprocess.run(
+        [sys.executable, "-c", COLD_SCRIPT, REQUEST_PATH, handler],
+        cwd=AGENT_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def timed(fn, payload, n: int) -> float:
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn(payload)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+if __name__ == "__main__":
+    cold_samples = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    warm_requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    print("=" * 78)
+    print(f"HANDLER COLD START ({cold_samples} fresh processes per row, median)")
+    print("=" * 78)
+    print(f"{'Handler':<10} {'Warmup':<8} {'Import ms':>12} {'1st request ms':>16} {'Total ms':>12}")
+    for handler in ("invoke", "lambda"):
+        for warmup in (False, True):
+            runs = [cold_sample(handler, warmup) for _ in range(cold_samples)]
+            import_ms = statistics.median(run["importMs"] for run in runs)
+            first_ms = statistics.median(run["firstRequestMs"] for run in runs)
+            print(f"{handler:<10} {'on' if warmup else 'off':<8} {import_ms:>12.2f} {first_ms:>16.2f} "
+                  f"{import_ms + first_ms:>12.2f}")
+
+    import product_analysis_agent as agent
+
+    with open(REQUEST_PATH) as f:
+        payload = json.load(f)
+    payload = payload.get("input", payload)
+    agent.warmup({"tenantIds": [payload.get("tenantId")]})
+    invoke = getattr(agent, "invoke", None) or agent.handle_payload
+
+    rows = [
+        ("invoke, new orchestrator per request", lambda p: agent.create_orchestrator(p).execute(p)),
+        ("invoke, warm orchestrator", invoke),
+        ("lambda_handler, warm orchestrator", lambda p: agent.lambda_handler(p, None)),
+        ("orchestrator construction only", lambda p: agent.create_orchestrator(p)),
+        ("get_orchestrator only", lambda p: agent.get_orchestrator(p)),
+    ]
+    print("=" * 78)
+    print(f"WARM PROCESS ({warm_requests} requests per row, median)")
+    print("=" * 78)
+    for name, fn in rows:
+        print(f"{name:<44} {timed(fn, payload, warm_requests) * 1000:>12.1f} us")
+    print("=" * 78)
@@ -0,0 +1,287 @@
+"""
+Synthetic product analysis payloads modeled on data/products*.json
+
+The real catalogs are profiled once (category mix, per-category price
+distribution, cost/price ratio, stock levels, lifecycle mix per category,
+trend score per lifecycle, share of seasonal products and their
+seasonalityRules, sales volume per lifecycle). The generators then sample
+N products, M orders over the sales horizon and K cities from that profile,
+deterministically for a given seed.
+
+    products    log-normal prices/stock per category, lifecycle-dependent
+                trend scores, seasonal products with rules taken from real
+                seasonal products of the same season
+    orders      1-6 lines per order (geometric), products drawn by a
+                popularity weight derived from their lifecycle sales level,
+                dates spread over the horizon with more recent days busier
+    climate     the real cities plus synthetic ones, with temperatures,
+                humidity and rainfall typical of the month's season
+
+Usage:
+    python tests/synthetic_catalog.py [products] [orders] [cities] [seed] > payload.json
+"""
+import json
+import math
+import os
+import random
+import statistics
+import sys
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+PROFILE_SOURCES = ("products.json", "products_2.json")
+
+AS_OF = date(2026, 1, 31)
+HORIZON_DAYS = 90
+
+BASE_CITIES = {
+    "Istanbul": (7.0, 74.0, 85.0),
+    "Ankara": (2.5, 65.0, 45.0),
+    "Izmir": (9.5, 68.0, 95.0),
+    "Antalya": (11.0, 64.0, 110.0),
+    "Erzurum": (-8.0, 70.0, 40.0),
+}
+
+# (avgTempC, humidityPct, rainfallMm) offsets by season, relative to winter
+SEASON_CLIMATE = {
+    "winter": (0.0, 0.0, 0.0),
+    "spring": (8.0, -5.0, -20.0),
+    "summer": (18.0, -12.0, -60.0),
+    "fall": (9.0, -3.0, -10.0),
+}
+
+
+def season_of(month: int) -> str:
+    if month in (12, 1, 2):
+        return "winter"
+    if month in (3, 4, 5):
+        return "spring"
+    if month in (6, 7, 8):
+        return "summer"
+    return "fall"
+
+
+def _log_stats(values: List[float]) -> tuple:
+    logs = [math.log(max(value, 1e-6)) for value in values]
+    return statistics.fmean(logs), (statistics.pstdev(logs) or 0.3)
+
+
+class CatalogProfile:
+    """Distributions fitted on the real product catalogs."""
+
+    def __init__(self, products: List[dict]):
+        by_category: Dict[str, List[dict]] = {}
+        for product in products:
+            by_category.setdefault(product["category"], []).append(product)
+
+        self.categories = sorted(by_category)
+        self.category_weights = [len(by_category[category]) for category in self.categories]
+        self.subcategories = {
+            category: sorted({p.get("subcategory") or category.title() for p in rows})
+            for category, rows in by_category.items()
+        }
+        self.price = {category: _log_stats([p["basePrice"] for p in rows]) for category, rows in by_category.items()}
+        self.stock = _log_stats([p["stock"] for p in products])
+        ratios = [p["cost"] / p["basePrice"] for p in products if p["basePrice"]]
+        self.cost_ratio = (min(ratios), max(ratios))
+
+        self.lifecycles = {}
+        for category, rows in by_category.items():
+            counts: Dict[str, int] = {}
+            for product in rows:
+                counts[product["lifecycleStage"]] = counts.get(product["lifecycleStage"], 0) + 1
+            self.lifecycles[category] = (list(counts), list(counts.values()))
+
+        by_stage: Dict[str, List[dict]] = {}
+        for product in products:
+            by_stage.setdefault(product["lifecycleStage"], []).append(product)
+        self.trend = {
+            stage: (statistics.fmean(p["trendScore"] for p in rows),
+                    statistics.pstdev([p["trendScore"] for p in rows]) or 5.0)
+            for stage, rows in by_stage.items()
+        }
+        self.sales = {
+            stage: _log_stats([p.get("last30DaysSales", 1) for p in rows])
+            for stage, rows in by_stage.items()
+        }
+
+        seasonal = [p for p in products if p.get("isSeasonal")]
+        self.seasonal_share = len(seasonal) / len(products)
+        self.seasonal_templates: Dict[str, List[list]] = {}
+        for product in seasonal:
+            self.seasonal_templates.setdefault(product["seasonCode"], []).append(product.get("seasonalityRules", []))
+        self.season_codes = sorted(self.seasonal_templates)
+
+    @classmethod
+    def load(cls, data_dir: str = DATA_DIR) -> "CatalogProfile":
+        products = []
+        for name in PROFILE_SOURCES:
+            with open(os.path.join(data_dir, name), encoding="utf-8") as f:
+                products.extend(json.load(f)["products"])
+        return cls(products)
+
+
+def generate_products(n_products: int, rng: random.Random,
+                      profile: Optional[CatalogProfile] = None) -> Iterator[dict]:
+    """
+    Yields synthetic products in the product analysis input format.
+
+    Args:
+        n_products: Number of products
+        rng: Random generator (fixes the catalog for a seed)
+        profile: Fitted profile (defaults to CatalogProfile.load())
+
+    Yields:
+        Product dictionaries with productId S0000000, S0000001, ...
+    """
+    profile = profile or CatalogProfile.load()
+    low_ratio, high_ratio = profile.cost_ratio
+    stock_mu, stock_sigma = profile.stock
+    categories = rng.choices(profile.categories, profile.category_weights, k=n_products)
+
+    for i, category in enumerate(categories):
+        price_mu, price_sigma = profile.price[category]
+        base_price = round(min(max(rng.lognormvariate(price_mu, price_sigma), 9.9), 2999.9), 1)
+        stages, weights = profile.lifecycles[category]
+        stage = rng.choices(stages, weights)[0]
+        trend_mu, trend_sigma = profile.trend[stage]
+        seasonal = rng.random() < profile.seasonal_share
+        season_code = rng.choice(profile.season_codes) if seasonal else "all"
+        subcategory = rng.choice(profile.subcategories[category])
+
+        yield {
+            "productId": f"S{i:07d}",
+            "productName": f"{subcategory} {i}",
+            "category": category,
+            "brand": "Farmasi",
+            "basePrice": base_price,
+            "cost": round(base_price * rng.uniform(low_ratio, high_ratio), 2),
+            "stock": max(0, int(rng.lognormvariate(stock_mu, stock_sigma))),
+            "trendScore": int(min(99, max(1, rng.gauss(trend_mu, trend_sigma)))),
+            "lifecycleStage": stage,
+            "isSeasonal": seasonal,
+            "seasonCode": season_code,
+            "seasonalityRules": rng.choice(profile.seasonal_templates[season_code]) if seasonal else [],
+        }
+
+
+def generate_orders(products: List[dict], n_orders: int, rng: random.Random,
+                    profile: Optional[CatalogProfile] = None, as_of: date = AS_OF,
+                    horizon_days: int = HORIZON_DAYS) -> List[dict]:
+    """
+    Generates order history for a product list.
+
+    Args:
+        products: Products from generate_products
+        n_orders: Number of orders
+        rng: Random generator
+        profile: Fitted profile (defaults to CatalogProfile.load())
+        as_of: Date of the most recent order day
+        horizon_days: Days covered by the orders
+
+    Returns:
+        List of order dictionaries (orderId, orderDate, customerId, items)
+    """
+    if not products or n_orders <= 0:
+        return []
+    profile = profile or CatalogProfile.load()
+    popularity = []
+    for product in products:
+        sales_mu, sales_sigma = profile.sales.get(product["lifecycleStage"], (2.0, 1.0))
+        popularity.append(rng.lognormvariate(sales_mu, sales_sigma))
+    cumulative = list(_accumulate(popularity))
+    ids = [product["productId"] for product in products]
+    prices = [product["basePrice"] for product in products]
+    days = [(as_of - timedelta(days=day)).isoformat() for day in range(horizon_days)]
+    # Recent days are busier: weight halves over the horizon
+    day_weights = list(_accumulate(0.5 ** (day / horizon_days) for day in range(horizon_days)))
+
+    orders = []
+    for order_index in range(n_orders):
+        n_lines = min(6, 1 + int(math.log(1 - rng.random()) / math.log(0.55)))
+        picks = {index for index in rng.choices(range(len(ids)), cum_weights=cumulative, k=n_lines)}
+        orders.append({
+            "orderId": f"SO-{order_index:08d}",
+            "orderDate": rng.choices(days, cum_weights=day_weights)[0],
+            "customerId": f"C{rng.randrange(max(1, n_orders // 4)):07d}",
+            "items": [
+                {"productId": ids[index], "quantity": 1 + int(rng.expovariate(0.5)), "unitPrice": prices[index]}
+                for index in sorted(picks)
+            ],
+        })
+    return orders
+
+
+def generate_climate(n_cities: int, month: int, rng: random.Random) -> Dict[str, dict]:
+    """
+    Climate data for the real cities plus synthetic ones, typical of the month.
+
+    Args:
+        n_cities: Number of cities
+        month: Month (1-12)
+        rng: Random generator
+
+    Returns:
+        Climate data by city
+    """
+    season = season_of(month)
+    d_temp, d_humidity, d_rain = SEASON_CLIMATE[season]
+    bases = list(BASE_CITIES.items())
+    climate = {}
+    for i in range(n_cities):
+        if i < len(bases):
+            city, (temp, humidity, rain) = bases[i]
+        else:
+            city = f"City-{i:03d}"
+            temp, humidity, rain = rng.uniform(-8, 12), rng.uniform(50, 80), rng.uniform(30, 120)
+        climate[city] = {
+            "month": month,
+            "avgTempC": round(temp + d_temp + rng.gauss(0, 1.5), 1),
+            "humidityPct": round(min(95.0, max(20.0, humidity + d_humidity + rng.gauss(0, 3))), 1),
+            "rainfallMm": round(max(0.0, rain + d_rain + rng.gauss(0, 8)), 1),
+            "seasonTag": season,
+        }
+    return climate
+
+
+def build_payload(n_products: int, n_orders: int, n_cities: int = 5, seed: int = 42,
+                  month: int = AS_OF.month) -> dict:
+    """
+    Complete AgentOrchestrator.execute input.
+
+    Args:
+        n_products: Number of products
+        n_orders: Number of orders
+        n_cities: Number of cities in climateData
+        seed: Random seed
+        month: currentMonth
+
+    Returns:
+        Product analysis payload
+    """
+    rng = random.Random(seed)
+    profile = CatalogProfile.load()
+    products = list(generate_products(n_products, rng, profile))
+    return {
+        "tenantId": "bench-tenant",
+        "products": products,
+        "orderHistory": generate_orders(products, n_orders, rng, profile),
+        "currentMonth": month,
+        "climateData": generate_climate(n_cities, month, rng),
+    }
+
+
+def _accumulate(values) -> Iterator[float]:
+    total = 0.0
+    for value in values:
+        total += value
+        yield total
+
+
+if __name__ == "__main__":
+    n_products = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    n_orders = int(sys.argv[2]) if len(sys.argv) > 2 else 5 * n_products
+    n_cities = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else 42
+    json.dump(build_payload(n_products, n_orders, n_cities, seed), sys.stdout, ensure_ascii=False)
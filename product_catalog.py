@@ -0,0 +1,394 @@
+"""Ürün kataloğu zenginleştirme indeksi.
+
+`urunler.json`, Farmasi ürün sayfalarından kazınmış kayıtları (urun_adi,
+urun_kodu, aciklama, kullanim_sartlari, uyarilar, resim_url) içerir. Bu modül
+dosyayı bir kez ayrıştırır, ürün kodlarını `productId` şemasına (7 haneli
+sayısal string) normalize eder ve açıklamalar üzerinde kompakt bir anahtar
+kelime / ters indeks kurar.
+
+İndeks diske (varsayılan: kaynak dosyanın yanında `urunler.index.json`)
+kompakt JSON olarak yazılır ve kaynak dosyanın boyutu / mtime'ı değişmedikçe
+sonraki process'ler ayrıştırma ve tokenizasyon yapmadan onu okur. Yükleme ve
+disk yazımı süreç başlangıcında `preload_catalog_index` ile yapılır; istek
+yolundaki `get_catalog_index` yalnızca önbellekten okur, önbellek boşsa
+indeksi diske yazmadan bellekte kurar. Kampanya agent'ı hero ürün
+açıklamalarını payload'larda taşımak yerine
+`get_catalog_index().copy_for(productId)` ile O(1) okur.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+CATALOG_PATH = os.environ.get("CATALOG_PATH", os.path.join(_ROOT, "urunler.json"))
+CATALOG_INDEX_PATH = os.environ.get("CATALOG_INDEX_PATH", "")
+INDEX_VERSION = 1
+
+# productId şeması: başında sıfırlarla 7 haneli sayısal kod
+PRODUCT_ID_DIGITS = 7
+DEFAULT_COPY_CHARS = 200
+
+_INVISIBLE = ("\u200b", "\u200c", "\u200d", "\ufeff", "\xad")
+_TOKEN_RE = re.compile(r"[0-9a-zçğıöşüâîû]+")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Açıklamalarda ayırt ediciliği olmayan sık kelimeler
+STOPWORDS = frozenset(
+    "acaba ama ancak bile bir biri bu bunu da daha de diye en gibi göre her "
+    "hem için ile ise kadar ki mi mu mı mü ne olan olarak ve veya ya yani "
+    "şekilde sayesinde sağlar çok ml gr adet".split()
+)
+
+
+def clean_text(value: Any) -> str:
+    """Görünmez karakterleri (zero-width space vb.) atar, boşlukları sadeleştirir."""
+    if not isinstance(value, str):
+        return ""
+    # str.replace, Türkçe metinde dict'li str.translate'ten çok daha hızlıdır
+    for char in _INVISIBLE:
+        if char in value:
+            value = value.replace(char, "")
+    return " ".join(value.split())
+
+
+def turkish_lower(text: str) -> str:
+    """Türkçe kurallarıyla küçük harfe çevirir (I → ı, İ → i)."""
+    return text.replace("I", "ı").replace("İ", "i").lower()
+
+
+def tokenize(text: str) -> List[str]:
+    """Metni indeks terimlerine ayırır (küçük harf, stopword ve tek harf hariç).
+
+    Args:
+        text: Ürün adı veya açıklama metni.
+
+    Returns:
+        Metindeki sırayla terim listesi (tekrarlar korunur).
+    """
+    return [
+        token
+        for token in _TOKEN_RE.findall(turkish_lower(clean_text(text)))
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def normalize_product_code(value: Any) -> str | None:
+    """Kazınmış ürün kodunu `productId` şemasına çevirir.
+
+    "1002705", " 1002705 ", 1002705 ve "FRM-1002705" gibi
+    değerler aynı 7 haneli sayısal string'e normalize edilir.
+
+    Args:
+        value: urun_kodu (str / int) veya URL'deki pid değeri.
+
+    Returns:
+        Normalize edilmiş productId, kod yoksa None.
+    """
+    if isinstance(value, bool) or value is None:
+        return None
+    digits = "".join(ch for ch in str(value) if ch.isdigit())
+    if not digits:
+        return None
+    return digits.lstrip("0").zfill(PRODUCT_ID_DIGITS)
+
+
+def _pid_from_url(url: Any) -> str | None:
+    if not isinstance(url, str):
+        return None
+    match = re.search(r"[?&]pid=([^&#]+)", url)
+    return normalize_product_code(match.group(1)) if match else None
+
+
+def summarize_copy(description: str, max_chars: int = DEFAULT_COPY_CHARS) -> str:
+    """Açıklamanın kampanya metnine eklenecek kısa özetini üretir.
+
+    Tam cümleler max_chars'a sığdığı kadar alınır; ilk cümle bile sığmazsa
+    kelime sınırında kesilip "…" eklenir.
+    """
+    description = clean_text(description)
+    if len(description) <= max_chars:
+        return description
+    summary = ""
+    for sentence in _SENTENCE_END_RE.split(description):
+        candidate = f"{summary} {sentence}".strip()
+        if len(candidate) > max_chars:
+            break
+        summary = candidate
+    if summary:
+        return summary
+    return description[: max_chars - 1].rsplit(" ", 1)[0].rstrip(",;:") + "…"
+
+
+# ---------------------------------------------------------------------------
+# Katalog kaydı
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogEntry:
+    """Kazınmış ürün sayfasının normalize edilmiş hali."""
+
+    productId: str
+    productName: str
+    description: str
+    usage: str
+    warnings: str
+    imageUrl: str
+    url: str
+
+    def copy(self, max_chars: int = DEFAULT_COPY_CHARS) -> str:
+        """Kampanya metni için kısa ürün açıklaması."""
+        return summarize_copy(self.description, max_chars)
+
+
+_ENTRY_FIELDS = CatalogEntry.__slots__
+
+
+def parse_catalog(records: Iterable[dict[str, Any]]) -> List[CatalogEntry]:
+    """Kazınmış kayıtları CatalogEntry listesine çevirir.
+
+    Başarısız (status != "success") veya ürün kodu çözülemeyen kayıtlar
+    atlanır. Aynı productId birden çok kez geçerse son kayıt geçerlidir.
+
+    Args:
+        records: `urunler.json` içeriği.
+
+    Returns:
+        Kaynak sırasıyla, productId'si tekil CatalogEntry listesi.
+    """
+    entries: Dict[str, CatalogEntry] = {}
+    skipped = 0
+    for record in records:
+        if not isinstance(record, dict) or record.get("status", "success") != "success":
+            skipped += 1
+            continue
+        data = record.get("data") or {}
+        product_id = normalize_product_code(data.get("urun_kodu")) or _pid_from_url(record.get("url"))
+        if product_id is None:
+            skipped += 1
+            continue
+        entries.pop(product_id, None)
+        entries[product_id] = CatalogEntry(
+            productId=product_id,
+            productName=clean_text(data.get("urun_adi")),
+            description=clean_text(data.get("aciklama")),
+            usage=clean_text(data.get("kullanim_sartlari")),
+            warnings=clean_text(data.get("uyarilar")),
+            imageUrl=clean_text(data.get("resim_url")),
+            url=clean_text(record.get("url")),
+        )
+    if skipped:
+        logger.info("Katalogda %d kayıt atlandı (başarısız veya ürün kodu yok)", skipped)
+    return list(entries.values())
+
+
+# ---------------------------------------------------------------------------
+# İndeks
+# ---------------------------------------------------------------------------
+
+
+class CatalogIndex:
+    """productId → kayıt tablosu ve terim → ürün ters indeksi.
+
+    Posting listeleri, kayıtların kaynak sırasındaki sıra numaralarından
+    oluşan artan tuple'lardır; diskte de aynı biçimde (int listesi) tutulur.
+    """
+
+    def __init__(self, entries: List[CatalogEntry], postings: Dict[str, Tuple[int, ...]]) -> None:
+        self._entries = entries
+        self._by_id = {entry.productId: entry for entry in entries}
+        self._postings = postings
+        self._copies: Dict[Tuple[str, int], str] = {}
+
+    @classmethod
+    def build(cls, entries: List[CatalogEntry]) -> "CatalogIndex":
+        """Ad ve açıklama terimlerinden ters indeksi kurar."""
+        postings: Dict[str, List[int]] = {}
+        for ordinal, entry in enumerate(entries):
+            for token in set(tokenize(entry.productName)) | set(tokenize(entry.description)):
+                postings.setdefault(token, []).append(ordinal)
+        return cls(entries, {token: tuple(ids) for token, ids in postings.items()})
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, product_id: object) -> bool:
+        return normalize_product_code(product_id) in self._by_id
+
+    def __iter__(self) -> Iterator[CatalogEntry]:
+        return iter(self._entries)
+
+    def get(self, product_id: Any) -> CatalogEntry | None:
+        """productId (veya normalize edilebilir ürün kodu) için katalog kaydı."""
+        entry = self._by_id.get(product_id)
+        if entry is None:
+            entry = self._by_id.get(normalize_product_code(product_id))
+        return entry
+
+    def copy_for(self, product_id: Any, max_chars: int = DEFAULT_COPY_CHARS) -> str:
+        """Ürünün kısa açıklaması; katalogda yoksa boş string (özetler önbelleklenir)."""
+        entry = self.get(product_id)
+        if entry is None:
+            return ""
+        key = (entry.productId, max_chars)
+        copy = self._copies.get(key)
+        if copy is None:
+            copy = self._copies[key] = entry.copy(max_chars)
+        return copy
+
+    def search(self, text: str, limit: int | None = None) -> List[CatalogEntry]:
+        """Sorgudaki tüm terimleri içeren ürünler (AND, kaynak sırasıyla).
+
+        Args:
+            text: Serbest metin sorgu (ör. "aloe vera diş macunu").
+            limit: En fazla dönecek kayıt sayısı.
+
+        Returns:
+            Eşleşen CatalogEntry listesi; sorguda terim yoksa boş liste.
+        """
+        terms = set(tokenize(text))
+        if not terms:
+            return []
+        postings = sorted((self._postings.get(term, ()) for term in terms), key=len)
+        matched = set(postings[0])
+        for ids in postings[1:]:
+            if not matched:
+                break
+            matched.intersection_update(ids)
+        ordinals = sorted(matched)[:limit]
+        return [self._entries[ordinal] for ordinal in ordinals]
+
+    # --- Disk biçimi ---
+
+    def to_payload(self, source: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "version": INDEX_VERSION,
+            "source": source,
+            "fields": list(_ENTRY_FIELDS),
+            "entries": [[getattr(entry, field) for field in _ENTRY_FIELDS] for entry in self._entries],
+            "postings": {token: list(ids) for token, ids in self._postings.items()},
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "CatalogIndex":
+        if payload.get("version") != INDEX_VERSION or payload.get("fields") != list(_ENTRY_FIELDS):
+            raise ValueError("catalog index format mismatch")
+        entries = [CatalogEntry(*row) for row in payload["entries"]]
+        postings = {token: tuple(ids) for token, ids in payload["postings"].items()}
+        return cls(entries, postings)
+
+
+def _source_signature(path: str) -> Dict[str, Any]:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def default_index_path(catalog_path: str) -> str:
+    """Kaynak dosyanın yanındaki indeks dosyası (CATALOG_INDEX_PATH ile değişir)."""
+    if CATALOG_INDEX_PATH and os.path.abspath(catalog_path) == os.path.abspath(CATALOG_PATH):
+        return CATALOG_INDEX_PATH
+    root, _ = os.path.splitext(catalog_path)
+    return f"{root}.index.json"
+
+
+def load_catalog_index(
+    catalog_path: str = CATALOG_PATH,
+    index_path: str | None = None,
+    write: bool = True,
+) -> CatalogIndex:
+    """Disk indeksini okur; yoksa veya kaynak değiştiyse yeniden kurup yazar.
+
+    İndeks dosyası yazılamazsa (salt okunur imaj vb.) bellekteki indeks
+    kullanılır. Kaynak dosya yoksa boş indeks döner.
+
+    Args:
+        catalog_path: Kazınmış katalog JSON'u.
+        index_path: İndeks dosyası (varsayılan: `default_index_path`).
+        write: False ise yeniden kurulan indeks diske yazılmaz (istek yolu).
+
+    Returns:
+        CatalogIndex.
+    """
+    index_path = index_path or default_index_path(catalog_path)
+    try:
+        source = _source_signature(catalog_path)
+    except OSError:
+        logger.warning("Ürün kataloğu bulunamadı: %s — açıklamalar eklenmeyecek", catalog_path)
+        return CatalogIndex([], {})
+
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("source") == source:
+            return CatalogIndex.from_payload(payload)
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    with open(catalog_path, encoding="utf-8") as f:
+        index = CatalogIndex.build(parse_catalog(json.load(f)))
+    logger.info("Ürün kataloğu indekslendi: %d ürün (%s)", len(index), catalog_path)
+    if not write:
+        return index
+
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    try:
+        encoded = json.dumps(index.to_payload(source), ensure_ascii=False, separators=(",", ":"))
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(encoded)
+        os.replace(tmp_path, index_path)
+    except OSError as exc:
+        logger.info("Katalog indeksi diske yazılamadı (%s), bellekten kullanılacak", exc)
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+    return index
+
+
+# ---------------------------------------------------------------------------
+# Process genelinde önbellek
+# ---------------------------------------------------------------------------
+
+_indexes: Dict[str, CatalogIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_catalog_index(catalog_path: str = CATALOG_PATH) -> CatalogIndex:
+    """Katalog indeksini önbellekten döner.
+
+    Süreç başlangıcında `preload_catalog_index` çağrılmadıysa indeks bir kez
+    yüklenir, ancak istek yolunda diske yazılmaz.
+    """
+    index = _indexes.get(catalog_path)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(catalog_path)
+            if index is None:
+                logger.warning("Katalog indeksi önceden yüklenmemiş, istek sırasında yükleniyor")
+                index = load_catalog_index(catalog_path, write=False)
+                _indexes[catalog_path] = index
+    return index
+
+
+def preload_catalog_index(catalog_path: str = CATALOG_PATH) -> CatalogIndex:
+    """Süreç başlangıcında indeksi yükler (gerekirse diske yazar) ve önbelleğe koyar."""
+    index = load_catalog_index(catalog_path)
+    with _indexes_lock:
+        _indexes[catalog_path] = index
+    return index
+
+
+def clear_catalog_cache() -> None:
+    """Önbelleği temizler (katalog dosyası güncellendiğinde)."""
+    with _indexes_lock:
+        _indexes.clear()
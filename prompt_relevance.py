@@ -0,0 +1,342 @@
+"""Prompt → ürün ilgi sıralaması (yerel, deterministik BM25).
+
+`match_customer_product_segments` kullanıcı prompt'unu alır, ancak prompt'a
+duyarlı tek yol `_run_with_agent` içindeki LLM çağrısıdır. Bu modül ürün adı,
+kategori, alt kategori, etiket ve açıklamalar üzerinde BM25 indeksi kurar;
+fallback yolu aday ürünleri prompt'a göre milisaniyeler içinde sıralar.
+
+Türkçe uyumlu analiz:
+    - Türkçe küçük harf (I → ı, İ → i), ardından ASCII katlama (ş → s, ı → i…):
+      "Saç Bakımı", "sac bakimi" ve "SAÇ BAKIMI" aynı terimlere düşer.
+    - Hafif ek kırpma (ör. "şampuanı" → "sampuan", "aloe veralı" → "aloe vera",
+      "kışın" → "kis"); kök en az 3 harf kalır.
+    - Kategori kodları Türkçe karşılıklarıyla indekslenir (MAKEUP → makyaj).
+
+Kaynaklar: ürün veri dosyaları (`RELEVANCE_PRODUCT_SOURCES`, varsayılan
+product-agent/data/products*.json ve customer-segment-agent/mock-data/farmasi/products.json) ve
+`product_catalog` indeksindeki kazınmış açıklamalar. İndekste olmayan ürünler
+(ör. yalnızca insight satırında gelen) aynı korpus istatistikleriyle satırdaki
+ad / kategori / marka üzerinden puanlanır.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from product_catalog import get_catalog_index, tokenize
+
+logger = logging.getLogger(__name__)
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+_DEFAULT_SOURCES = (
+    os.path.join(_ROOT, "product-agent", "data", "products.json"),
+    os.path.join(_ROOT, "product-agent", "data", "products_2.json"),
+    os.path.join(_ROOT, "customer-segment-agent", "mock-data", "farmasi", "products.json"),
+)
+PRODUCT_SOURCES = tuple(
+    path for path in os.environ.get("RELEVANCE_PRODUCT_SOURCES", "").split(os.pathsep) if path
+) or _DEFAULT_SOURCES
+
+# BM25 parametreleri
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Alan ağırlıkları (terim frekansına çarpan olarak eklenir)
+FIELD_WEIGHTS = {
+    "productName": 3.0,
+    "subcategory": 2.0,
+    "tags": 2.0,
+    "category": 1.0,
+    "season": 1.0,
+    "brand": 1.0,
+    "description": 1.0,
+}
+
+CATEGORY_LABELS = {
+    "MAKEUP": "makyaj",
+    "SKINCARE": "cilt bakım",
+    "HAIRCARE": "saç bakım",
+    "FRAGRANCE": "parfüm koku",
+    "PERSONALCARE": "kişisel bakım",
+    "WELLNESS": "sağlık takviye vitamin",
+}
+
+SEASON_LABELS = {
+    "winter": "kış",
+    "summer": "yaz",
+    "spring": "ilkbahar bahar",
+    "fall": "sonbahar",
+}
+
+_ASCII_FOLD = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+
+# ASCII katlanmış ekler, uzundan kısaya
+_SUFFIXES = (
+    "larindan", "lerinden", "lardan", "lerden", "larina", "lerine", "larda", "lerde",
+    "lari", "leri", "lar", "ler", "dan", "den", "da", "de",
+    "li", "lu", "si", "su", "in", "un", "i", "u",
+)
+_MIN_STEM = 3
+_MAX_STRIPS = 2
+
+# Kampanya prompt'larında ürünü ayırt etmeyen kelimeler (yalnızca prompt'tan atılır)
+_PROMPT_STOPWORDS_TEXT = (
+    "kampanya öneri oluştur hazırla üret planla indirim fırsat satış müşteri "
+    "ürün için sezon dönem yeni özel"
+)
+
+
+def stem(token: str) -> str:
+    """ASCII katlanmış terimden çekim eklerini kırpar (en fazla iki ek)."""
+    for _ in range(_MAX_STRIPS):
+        for suffix in _SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= _MIN_STEM:
+                token = token[: -len(suffix)]
+                break
+        else:
+            break
+    return token
+
+
+@lru_cache(maxsize=65536)
+def _term(token: str) -> str:
+    return stem(token.translate(_ASCII_FOLD))
+
+
+def analyze(text: str) -> List[str]:
+    """Metni BM25 terimlerine çevirir (tokenize → ASCII katlama → ek kırpma).
+
+    Args:
+        text: Prompt, ürün adı, etiket veya açıklama.
+
+    Returns:
+        Terim listesi (tekrarlar korunur).
+    """
+    return [_term(token) for token in tokenize(text)]
+
+
+PROMPT_STOPWORDS = frozenset(analyze(_PROMPT_STOPWORDS_TEXT))
+
+
+def prompt_terms(prompt: str) -> set[str]:
+    """Prompt'un ayırt edici terimleri (kampanya jargonu hariç)."""
+    return {term for term in analyze(prompt) if term not in PROMPT_STOPWORDS}
+
+
+def _field_texts(product: Dict[str, Any]) -> Iterable[Tuple[str, str]]:
+    for field in ("productName", "subcategory", "brand", "description"):
+        value = product.get(field)
+        if isinstance(value, str):
+            yield field, value
+    tags = product.get("tags")
+    if isinstance(tags, list):
+        yield "tags", " ".join(tag.replace("-", " ") for tag in tags if isinstance(tag, str))
+    category = product.get("category")
+    if isinstance(category, str):
+        yield "category", CATEGORY_LABELS.get(category.upper(), category)
+    season = product.get("season") or product.get("seasonCode")
+    if isinstance(season, str):
+        yield "season", SEASON_LABELS.get(season.lower(), "")
+
+
+def weighted_terms(product: Dict[str, Any]) -> Dict[str, float]:
+    """Ürün alanlarından ağırlıklı terim frekansları (BM25F benzeri)."""
+    frequencies: Dict[str, float] = {}
+    for field, text in _field_texts(product):
+        weight = FIELD_WEIGHTS[field]
+        for term in analyze(text):
+            frequencies[term] = frequencies.get(term, 0.0) + weight
+    return frequencies
+
+
+# ---------------------------------------------------------------------------
+# İndeks
+# ---------------------------------------------------------------------------
+
+
+class RelevanceIndex:
+    """Ürünler üzerinde BM25 ters indeksi.
+
+    Posting'ler terim → {belge no: ağırlıklı tf} biçimindedir; bir prompt
+    yalnızca kendi terimlerinin posting'lerini gezer, aday satır sıralaması
+    ise belge başına terim sayısı kadar dict okumasıdır.
+    """
+
+    def __init__(self, products: Iterable[Dict[str, Any]]) -> None:
+        self._ids: List[str] = []
+        self._lengths: List[float] = []
+        self._ordinals: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[int, float]] = {}
+
+        documents: Dict[str, Dict[str, float]] = {}
+        for product in products:
+            product_id = product.get("productId")
+            if not isinstance(product_id, str):
+                continue
+            terms = documents.setdefault(product_id, {})
+            for term, weight in weighted_terms(product).items():
+                terms[term] = terms.get(term, 0.0) + weight
+
+        for ordinal, (product_id, terms) in enumerate(documents.items()):
+            self._ids.append(product_id)
+            self._ordinals[product_id] = ordinal
+            self._lengths.append(sum(terms.values()))
+            for term, weight in terms.items():
+                self._postings.setdefault(term, {})[ordinal] = weight
+
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 1.0
+        n_docs = len(self._ids)
+        self._idf = {
+            term: math.log(1.0 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+        # Korpusta hiç geçmeyen terim için idf (ad-hoc puanlamada kullanılır)
+        self._unseen_idf = math.log(1.0 + (n_docs + 0.5) / 0.5)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, product_id: object) -> bool:
+        return product_id in self._ordinals
+
+    def _term_score(self, idf: float, tf: float, length: float) -> float:
+        norm = BM25_K1 * (1.0 - BM25_B + BM25_B * length / self._avg_length)
+        return idf * tf * (BM25_K1 + 1.0) / (tf + norm)
+
+    def scores(self, prompt: str) -> Dict[str, float]:
+        """Prompt terimlerini içeren indeksli ürünlerin BM25 puanları.
+
+        Args:
+            prompt: Kullanıcının serbest metni.
+
+        Returns:
+            productId → puan (yalnızca pozitif puanlılar).
+        """
+        totals: Dict[int, float] = {}
+        for term in prompt_terms(prompt):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for ordinal, tf in self._postings[term].items():
+                totals[ordinal] = totals.get(ordinal, 0.0) + self._term_score(idf, tf, self._lengths[ordinal])
+        return {self._ids[ordinal]: score for ordinal, score in totals.items()}
+
+    def score_product(self, prompt_terms: Iterable[str], product: Dict[str, Any]) -> float:
+        """İndekste olmayan bir ürünü korpus istatistikleriyle puanlar."""
+        terms = weighted_terms(product)
+        length = sum(terms.values())
+        score = 0.0
+        for term in prompt_terms:
+            tf = terms.get(term)
+            if tf:
+                score += self._term_score(self._idf.get(term, self._unseen_idf), tf, length)
+        return score
+
+    def rank(self, prompt: str, rows: Sequence[Any], limit: int | None = None) -> List[Tuple[Any, float]]:
+        """Aday satırları prompt ilgisine göre sıralar.
+
+        Sıralama kararlıdır: eşit puanlı (ör. ilgisiz) satırlar gelen sırayı
+        korur. Satırlar dict veya attribute'lu kayıt olabilir (productId,
+        productName, category, brand).
+
+        Args:
+            prompt: Kullanıcının serbest metni.
+            rows: Aday ürün satırları.
+            limit: En fazla dönecek satır sayısı.
+
+        Returns:
+            (satır, puan) listesi, puana göre azalan.
+        """
+        terms = prompt_terms(prompt)
+        weights = [(self._idf[term], self._postings[term]) for term in terms if term in self._idf]
+        scored = []
+        for row in rows:
+            product = row if isinstance(row, dict) else _row_fields(row)
+            ordinal = self._ordinals.get(product.get("productId"))
+            if ordinal is None:
+                score = self.score_product(terms, product)
+            else:
+                length = self._lengths[ordinal]
+                score = 0.0
+                for idf, postings in weights:
+                    tf = postings.get(ordinal)
+                    if tf:
+                        score += self._term_score(idf, tf, length)
+            scored.append((row, score))
+        scored.sort(key=lambda pair: -pair[1])
+        return scored[:limit] if limit is not None else scored
+
+
+def _row_fields(row: Any) -> Dict[str, Any]:
+    return {
+        field: getattr(row, field, None)
+        for field in ("productId", "productName", "category", "brand", "subcategory", "tags")
+    }
+
+
+def _read_products(path: str) -> List[Dict[str, Any]]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        # Eksik kaynak indeksi o kaynağın etiketleri olmadan kurar; sessiz geçilmez
+        logger.warning("Prompt ilgi kaynağı okunamadı, atlanıyor: %s (%s)", path, e)
+        return []
+    if isinstance(data, dict):
+        data = data.get("products", [])
+    return [product for product in data if isinstance(product, dict)] if isinstance(data, list) else []
+
+
+def build_relevance_index(sources: Sequence[str] = PRODUCT_SOURCES) -> RelevanceIndex:
+    """Ürün veri dosyaları ve katalog açıklamalarından indeksi kurar.
+
+    Args:
+        sources: products.json biçimindeki dosyalar (liste veya {"products": [...]}).
+
+    Returns:
+        RelevanceIndex; hiçbir kaynak okunamazsa boş indeks.
+    """
+    products: List[Dict[str, Any]] = []
+    for path in sources:
+        products.extend(_read_products(path))
+    # Kazınmış açıklamalar aynı productId'nin belgesine eklenir
+    products.extend(
+        {"productId": entry.productId, "productName": entry.productName, "description": entry.description}
+        for entry in get_catalog_index()
+    )
+    return RelevanceIndex(products)
+
+
+# ---------------------------------------------------------------------------
+# Process genelinde önbellek
+# ---------------------------------------------------------------------------
+
+_index: RelevanceIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_relevance_index() -> RelevanceIndex:
+    """İndeksi process başına bir kez kurar ve önbellekten döner."""
+    global _index
+    index = _index
+    if index is None:
+        with _index_lock:
+            index = _index
+            if index is None:
+                index = _index = build_relevance_index()
+                logger.info("Prompt ilgi indeksi kuruldu: %d ürün", len(index))
+    return index
+
+
+def clear_relevance_cache() -> None:
+    """Önbelleği temizler (ürün veri dosyaları güncellendiğinde)."""
+    global _index
+    with _index_lock:
+        _index = None
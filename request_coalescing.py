@@ -0,0 +1,171 @@
+"""Aynı anda gelen özdeş istekler için single-flight birleştirme.
+
+Yük altında aynı tenant için birçok orkestrasyon isteği aynı `productData`
+payload'ı ile gelir. Aynı kanonik payload hash'ine sahip eşzamanlı istekler tek
+bir uçuştaki (in-flight) runtime çağrısını ve sonucunu paylaşır.
+
+Kanonik hash (sıralı anahtarlarla tüm payload'ın JSON'u) büyük payload'larda
+pahalıdır. Bu yüzden önce ucuz bir parmak izi (üst düzey anahtarlar ve
+değerlerin boyu) bakılır. Uçuşta aynı parmak izli bir çağrı yoksa istek hash
+hesaplamadan çalışır. Hash yalnızca eşleşme ihtimali olduğunda, gerektiğinde
+uçuştaki çağrının payload'ı için de hesaplanır.
+
+Bekleyen olduysa her çağırana sonucun ayrı bir kopyası verilir; böylece
+çağıranlar sonucu birbirini etkilemeden değiştirebilir.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def canonical_payload_hash(payload: Any) -> str:
+    """Anahtar sırasından bağımsız, kanonik JSON üzerinden SHA-256 hash."""
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def payload_fingerprint(payload: Any) -> Hashable:
+    """Ucuz ön anahtar: üst düzey anahtarlar, skaler değerler ve koleksiyon boyları.
+
+    Özdeş payload'lar her zaman aynı parmak izini verir; tersi garanti değildir
+    (eşitlik kanonik hash ile doğrulanır).
+    """
+    if not isinstance(payload, dict):
+        return (type(payload).__name__, len(payload) if isinstance(payload, (list, str)) else None)
+    parts = []
+    for key in sorted(payload):
+        value = payload[key]
+        if isinstance(value, (dict, list, str)):
+            parts.append((key, type(value).__name__, len(value)))
+        elif value is None or isinstance(value, (bool, int, float)):
+            parts.append((key, value))
+        else:
+            parts.append((key, type(value).__name__))
+    return tuple(parts)
+
+
+class _Call:
+    __slots__ = ("payload", "key", "done", "result", "error", "waiters")
+
+    def __init__(self, payload: Any, key: str | None) -> None:
+        self.payload = payload
+        self.key = key
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Aynı payload'lı eşzamanlı çağrıları tek çalıştırmaya indirger."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        # parmak izi → uçuştaki çağrılar
+        self._calls: Dict[Hashable, List[_Call]] = {}
+        self._lock = threading.Lock()
+        self._executed = 0
+        self._deduplicated = 0
+        self._hashed = 0
+
+    def _hash(self, payload: Any) -> str:
+        key = canonical_payload_hash(payload)
+        with self._lock:
+            self._hashed += 1
+        return key
+
+    def do(self, payload: Any, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Aynı payload için uçuşta bir çağrı varsa onu bekler, yoksa fn'i çalıştırır.
+
+        Args:
+            payload: Birleştirme için karşılaştırılan JSON uyumlu payload (değiştirilmemeli).
+            fn: Asıl çağrı.
+
+        Returns:
+            (sonuç, paylaşıldı mı) — paylaşıldı True ise başka bir isteğin
+            çağrısının sonucu kullanılmıştır. Bekleyen olduysa sonuç kopyadır.
+
+        Raises:
+            fn'in yükselttiği hata (bekleyenlere de aynı hata iletilir).
+        """
+        fingerprint = payload_fingerprint(payload)
+        key: str | None = None
+        while True:
+            with self._lock:
+                calls = self._calls.get(fingerprint)
+                if not calls:
+                    # Aynı parmak izli çağrı yok: hash hesaplamadan çalıştır
+                    call = _Call(payload, key)
+                    self._calls[fingerprint] = [call]
+                    self._executed += 1
+                    leader = True
+                    break
+                if key is not None:
+                    call = next((c for c in calls if c.key == key), None)
+                    if call is not None:
+                        call.waiters += 1
+                        self._deduplicated += 1
+                        leader = False
+                        break
+                    unhashed = [c for c in calls if c.key is None]
+                    if not unhashed:
+                        call = _Call(payload, key)
+                        calls.append(call)
+                        self._executed += 1
+                        leader = True
+                        break
+                else:
+                    unhashed = [c for c in calls if c.key is None]
+            # Hash'ler kilit dışında hesaplanır
+            if key is None:
+                key = self._hash(payload)
+            for other in unhashed:
+                if other.key is None:
+                    other.key = self._hash(other.payload)
+
+        if not leader:
+            logger.info("%s: özdeş istek uçuşta, sonucu bekleniyor (%s…)", self.name, key[:12])
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result), True
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                calls = self._calls.get(fingerprint, [])
+                if call in calls:
+                    calls.remove(call)
+                if not calls:
+                    self._calls.pop(fingerprint, None)
+                shared = call.waiters > 0
+            call.payload = None
+            call.done.set()
+        # Bekleyenler kendi kopyalarını alır; lider de ortak nesneye dokunmaz
+        return (copy.deepcopy(call.result) if shared else call.result), False
+
+    def stats(self) -> Dict[str, Any]:
+        """Çalıştırılan ve birleştirilen çağrı sayıları."""
+        with self._lock:
+            total = self._executed + self._deduplicated
+            return {
+                "name": self.name,
+                "requests": total,
+                "executed": self._executed,
+                "deduplicated": self._deduplicated,
+                "hashed": self._hashed,
+                "inFlight": sum(len(calls) for calls in self._calls.values()),
+                "dedupRate": round(self._deduplicated / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,292 @@
+"""Alt ajan runtime çağrıları için circuit breaker, hedged request ve deadline.
+
+Orkestrasyonun kuyruk gecikmesi en yavaş runtime tarafından belirlenir. Bu modül:
+
+- Her ARN için bir circuit breaker tutar (CLOSED → OPEN → HALF_OPEN). Son
+  çağrılardaki hata oranı veya yavaş çağrı oranı eşiği aşınca devre açılır ve
+  çağrılar beklemeden `CircuitOpenError` ile reddedilir; bekleme süresinden
+  sonra tek bir deneme çağrısına izin verilir.
+- Opsiyonel olarak, ilk istek ARN'ın p95 gecikmesi içinde dönmezse ikinci
+  (hedged) bir istek başlatır ve önce dönen başarılı sonucu kullanır.
+- Tüm çağrıları bir orkestrasyon deadline'ına bağlar; süre dolarsa
+  `DeadlineExceeded` yükseltilir ve çağıran kısmi sonuç dönebilir.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Konfigürasyon (environment variables ile override edilebilir)
+# ---------------------------------------------------------------------------
+BREAKER_WINDOW = int(os.environ.get("RUNTIME_BREAKER_WINDOW", "20"))
+BREAKER_MIN_CALLS = int(os.environ.get("RUNTIME_BREAKER_MIN_CALLS", "5"))
+BREAKER_ERROR_RATE = float(os.environ.get("RUNTIME_BREAKER_ERROR_RATE", "0.5"))
+BREAKER_SLOW_CALL_MS = float(os.environ.get("RUNTIME_BREAKER_SLOW_CALL_MS", "30000"))
+BREAKER_SLOW_CALL_RATE = float(os.environ.get("RUNTIME_BREAKER_SLOW_CALL_RATE", "0.8"))
+BREAKER_OPEN_SECONDS = float(os.environ.get("RUNTIME_BREAKER_OPEN_SECONDS", "30"))
+
+HEDGING_ENABLED = os.environ.get("RUNTIME_HEDGING", "false").lower() in ("1", "true", "yes")
+HEDGE_MIN_SAMPLES = int(os.environ.get("RUNTIME_HEDGE_MIN_SAMPLES", "10"))
+HEDGE_MIN_DELAY_MS = float(os.environ.get("RUNTIME_HEDGE_MIN_DELAY_MS", "200"))
+
+ORCHESTRATION_DEADLINE_SECONDS = float(os.environ.get("ORCHESTRATION_DEADLINE_SECONDS", "120"))
+
+CLOSED = "CLOSED"
+OPEN = "OPEN"
+HALF_OPEN = "HALF_OPEN"
+
+
+class CircuitOpenError(RuntimeError):
+    """Devre açıkken yapılan çağrı."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """Orkestrasyon deadline'ı doldu."""
+
+
+# ---------------------------------------------------------------------------
+# Deadline
+# ---------------------------------------------------------------------------
+
+
+class Deadline:
+    """Monotonic saat ile mutlak bir son tarih."""
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self._expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self._expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+
+# ---------------------------------------------------------------------------
+# Circuit breaker
+# ---------------------------------------------------------------------------
+
+
+class CircuitBreaker:
+    """Hata oranı ve gecikme eşikli circuit breaker."""
+
+    def __init__(
+        self,
+        name: str,
+        window: int = BREAKER_WINDOW,
+        min_calls: int = BREAKER_MIN_CALLS,
+        error_rate: float = BREAKER_ERROR_RATE,
+        slow_call_ms: float = BREAKER_SLOW_CALL_MS,
+        slow_call_rate: float = BREAKER_SLOW_CALL_RATE,
+        open_seconds: float = BREAKER_OPEN_SECONDS,
+    ) -> None:
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_ms = slow_call_ms
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        # (başarılı mı, gecikme ms)
+        self._outcomes: Deque[Tuple[bool, float]] = deque(maxlen=window)
+        self._latencies: Deque[float] = deque(maxlen=max(window, 100))
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Çağrıya izin verilip verilmediğini döner (HALF_OPEN'da tek deneme)."""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    return False
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == HALF_OPEN:
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def record(self, success: bool, latency_ms: float) -> None:
+        """Çağrı sonucunu kaydeder ve durumu günceller."""
+        with self._lock:
+            if success:
+                self._latencies.append(latency_ms)
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                if success and latency_ms < self.slow_call_ms:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                    logger.info("Circuit %s kapandı", self.name)
+                else:
+                    self._trip()
+                return
+
+            self._outcomes.append((success, latency_ms))
+            if len(self._outcomes) < self.min_calls:
+                return
+            total = len(self._outcomes)
+            errors = sum(1 for ok, _ in self._outcomes if not ok)
+            slow = sum(1 for _, ms in self._outcomes if ms >= self.slow_call_ms)
+            if errors / total >= self.error_rate or slow / total >= self.slow_call_rate:
+                self._trip()
+
+    def _trip(self) -> None:
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        logger.warning("Circuit %s açıldı (%.0fs)", self.name, self.open_seconds)
+
+    def p95_ms(self) -> float | None:
+        """Başarılı çağrıların p95 gecikmesi (yeterli örnek yoksa None)."""
+        with self._lock:
+            if len(self._latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(agent_arn: str) -> CircuitBreaker:
+    """ARN için circuit breaker'ı döner, yoksa oluşturur."""
+    breaker = _breakers.get(agent_arn)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(agent_arn, CircuitBreaker(agent_arn.split("/")[-1]))
+    return breaker
+
+
+# ---------------------------------------------------------------------------
+# Korumalı çağrı
+# ---------------------------------------------------------------------------
+
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="runtime-call")
+
+
+def submit(fn: Callable[[], Any], executor: ThreadPoolExecutor | None = None) -> Future:
+    """fn'i havuzda (varsayılan: runtime çağrı havuzu), çağıranın context'i (trace) ile çalıştırır."""
+    ctx = contextvars.copy_context()
+    return (executor or _executor).submit(ctx.run, fn)
+
+
+class _CallOutcome:
+    """Bir mantıksal çağrının (hedged kopyası dahil) breaker'a tek sonuç yazmasını sağlar.
+
+    İlk başarılı deneme başarı olarak kaydedilir; hata ancak tüm denemeler
+    başarısız olursa kaydedilir. Böylece hedged kopya pencereye ikinci bir
+    sonuç eklemez.
+    """
+
+    def __init__(self, breaker: CircuitBreaker) -> None:
+        self.breaker = breaker
+        self._attempts = 0
+        self._failures = 0
+        self._recorded = False
+        self._lock = threading.Lock()
+
+    def attempt(self, fn: Callable[[], Any]) -> Callable[[], Any]:
+        with self._lock:
+            self._attempts += 1
+
+        def run() -> Any:
+            start = time.perf_counter()
+            try:
+                result = fn()
+            except Exception:
+                self._finish(False, (time.perf_counter() - start) * 1000)
+                raise
+            self._finish(True, (time.perf_counter() - start) * 1000)
+            return result
+
+        return run
+
+    def _finish(self, success: bool, latency_ms: float) -> None:
+        with self._lock:
+            if self._recorded:
+                return
+            if not success:
+                self._failures += 1
+                if self._failures < self._attempts:
+                    return
+            self._recorded = True
+        self.breaker.record(success, latency_ms)
+
+
+def call_with_resilience(
+    agent_arn: str,
+    fn: Callable[[], Any],
+    deadline: Deadline | None = None,
+    hedge: bool | None = None,
+) -> Any:
+    """fn'i ARN'ın circuit breaker'ı, opsiyonel hedging ve deadline ile çalıştırır.
+
+    Args:
+        agent_arn: Çağrılan runtime ARN'ı (breaker anahtarı).
+        fn: Runtime'ı çağıran fonksiyon.
+        deadline: Orkestrasyon deadline'ı (None ise sınırsız).
+        hedge: Hedged istek açık mı (None ise RUNTIME_HEDGING).
+
+    Returns:
+        fn'in sonucu.
+
+    Raises:
+        CircuitOpenError: Devre açıksa.
+        DeadlineExceeded: Deadline dolmadan sonuç gelmezse.
+    """
+    breaker = get_breaker(agent_arn)
+    name = agent_arn.split("/")[-1]
+    # Deadline, allow()'dan önce: HALF_OPEN'da allow() deneme hakkını tüketir
+    # ve yalnızca record() geri verir
+    if deadline is not None and deadline.expired:
+        raise DeadlineExceeded(f"{name} çağrılmadan deadline doldu")
+    if not breaker.allow():
+        raise CircuitOpenError(f"{name} için devre açık, çağrı atlandı")
+
+    hedge = HEDGING_ENABLED if hedge is None else hedge
+    hedge_delay_ms = breaker.p95_ms() if hedge and breaker.state == CLOSED else None
+
+    outcome = _CallOutcome(breaker)
+    futures = [submit(outcome.attempt(fn))]
+    hedge_delay = None
+    if hedge_delay_ms is not None:
+        hedge_delay = max(hedge_delay_ms, HEDGE_MIN_DELAY_MS) / 1000
+
+    last_error: BaseException | None = None
+    while futures:
+        timeout = deadline.remaining() if deadline is not None else None
+        if hedge_delay is not None:
+            timeout = hedge_delay if timeout is None else min(timeout, hedge_delay)
+
+        done, pending = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                return future.result()
+            except Exception as exc:
+                last_error = exc
+        futures = list(pending)
+
+        if not done:
+            if hedge_delay is not None and (deadline is None or not deadline.expired):
+                logger.info("%s p95 (%.0fms) içinde dönmedi, hedged istek başlatılıyor", name, hedge_delay * 1000)
+                futures.append(submit(outcome.attempt(fn)))
+                hedge_delay = None
+                continue
+            raise DeadlineExceeded(f"{name} deadline içinde yanıt vermedi")
+
+    assert last_error is not None
+    raise last_error
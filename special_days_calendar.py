@@ -0,0 +1,199 @@
+"""Özel günler takvim servisi.
+
+`get_upcoming_special_days` sonucu yalnızca gün değiştiğinde değişir. Bu modül
+her tenant/locale için yılın her günü için yaklaşan özel gün pencerelerini bir
+kez hesaplar ve önbellekte tutar. Böylece her kampanya isteği özel günleri sabit
+sürede alır, toplu işler de tarih aralığı sorgusu ile birçok günü ucuza okur.
+
+Yıllık hesaplama (yılın her günü için bir kaynak çağrısı) ilk isteğe binmesin
+diye servis başlarken `warm_special_days_calendars` çağrılır.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT = "default"
+DEFAULT_LOCALE = "tr-TR"
+DEFAULT_DAYS_AHEAD = 30
+
+# provider(today_iso, days_ahead) -> list[SpecialDay]
+SpecialDaysProvider = Callable[[str, int], List[Any]]
+
+
+def _default_provider(today_iso: str, days_ahead: int) -> List[Any]:
+    """Varsayılan kaynak: campaign agent paketindeki statik takvim."""
+    from agents.campaign_agent.special_days import get_upcoming_special_days
+
+    return get_upcoming_special_days(today_iso, days_ahead=days_ahead)
+
+
+def _to_date(value: date | datetime | str) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value[:10])
+
+
+# ---------------------------------------------------------------------------
+# Takvim
+# ---------------------------------------------------------------------------
+
+
+class SpecialDaysCalendar:
+    """Bir tenant/locale için önceden hesaplanmış özel gün pencereleri.
+
+    Pencereler yıl bazında ilk kullanımda (veya `preload` ile) hesaplanır;
+    sonraki sorgular tek bir dict okumasıdır.
+    """
+
+    def __init__(
+        self,
+        provider: SpecialDaysProvider | None = None,
+        days_ahead: int = DEFAULT_DAYS_AHEAD,
+    ) -> None:
+        self._provider = provider or _default_provider
+        self._days_ahead = days_ahead
+        self._years: Dict[int, Dict[str, Tuple[Any, ...]]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def days_ahead(self) -> int:
+        return self._days_ahead
+
+    def _year_windows(self, year: int) -> Dict[str, Tuple[Any, ...]]:
+        windows = self._years.get(year)
+        if windows is None:
+            with self._lock:
+                windows = self._years.get(year)
+                if windows is None:
+                    windows = self._precompute(year)
+                    self._years[year] = windows
+        return windows
+
+    def _precompute(self, year: int) -> Dict[str, Tuple[Any, ...]]:
+        logger.info("Özel gün pencereleri hesaplanıyor: %d (days_ahead=%d)", year, self._days_ahead)
+        windows: Dict[str, Tuple[Any, ...]] = {}
+        day = date(year, 1, 1)
+        end = date(year + 1, 1, 1)
+        while day < end:
+            iso = day.isoformat()
+            windows[iso] = tuple(self._provider(iso, self._days_ahead))
+            day += timedelta(days=1)
+        return windows
+
+    def preload(self, *years: int) -> None:
+        """Verilen yılların pencerelerini önceden hesaplar (varsayılan: bu yıl)."""
+        for year in years or (date.today().year,):
+            self._year_windows(year)
+
+    def upcoming(self, on: date | datetime | str) -> List[Any]:
+        """Verilen gün için yaklaşan özel günleri döner.
+
+        Args:
+            on: Referans gün (date, datetime veya ISO 8601 string).
+
+        Returns:
+            `get_upcoming_special_days(on, days_ahead)` ile aynı liste.
+        """
+        day = _to_date(on)
+        return list(self._year_windows(day.year)[day.isoformat()])
+
+    def between(
+        self,
+        start: date | datetime | str,
+        end: date | datetime | str,
+    ) -> Dict[str, List[Any]]:
+        """[start, end] aralığındaki her gün için yaklaşan özel günleri döner.
+
+        Args:
+            start: Aralık başlangıcı (dahil).
+            end: Aralık bitişi (dahil).
+
+        Returns:
+            ISO tarih → özel gün listesi dict'i.
+        """
+        day = _to_date(start)
+        last = _to_date(end)
+        result: Dict[str, List[Any]] = {}
+        while day <= last:
+            iso = day.isoformat()
+            result[iso] = list(self._year_windows(day.year)[iso])
+            day += timedelta(days=1)
+        return result
+
+    def clear(self) -> None:
+        """Önbelleği temizler (takvim kaynağı değiştiğinde)."""
+        with self._lock:
+            self._years.clear()
+
+
+# ---------------------------------------------------------------------------
+# Tenant/locale kayıt defteri
+# ---------------------------------------------------------------------------
+
+_providers: Dict[Tuple[str, str], SpecialDaysProvider] = {}
+_calendars: Dict[Tuple[str, str, int], SpecialDaysCalendar] = {}
+_registry_lock = threading.Lock()
+
+
+def register_special_days_provider(
+    tenant_id: str,
+    locale: str,
+    provider: SpecialDaysProvider,
+) -> None:
+    """Bir tenant/locale için özel takvim kaynağı tanımlar.
+
+    Kayıtlı olmayan tenant/locale çiftleri varsayılan takvimi kullanır.
+    """
+    with _registry_lock:
+        _providers[(tenant_id, locale)] = provider
+        for key in [k for k in _calendars if k[:2] == (tenant_id, locale)]:
+            del _calendars[key]
+
+
+def get_special_days_calendar(
+    tenant_id: str = DEFAULT_TENANT,
+    locale: str = DEFAULT_LOCALE,
+    days_ahead: int = DEFAULT_DAYS_AHEAD,
+) -> SpecialDaysCalendar:
+    """Tenant/locale için önbellekteki takvimi döner, yoksa oluşturur."""
+    key = (tenant_id, locale, days_ahead)
+    calendar = _calendars.get(key)
+    if calendar is None:
+        with _registry_lock:
+            calendar = _calendars.get(key)
+            if calendar is None:
+                calendar = SpecialDaysCalendar(
+                    provider=_providers.get((tenant_id, locale)),
+                    days_ahead=days_ahead,
+                )
+                _calendars[key] = calendar
+    return calendar
+
+
+def warm_special_days_calendars(days_ahead: int = DEFAULT_DAYS_AHEAD) -> int:
+    """Varsayılan ve kayıtlı tüm tenant/locale takvimlerini bu ve sonraki yıl için hesaplar.
+
+    Servis başlangıcında çağrılır; kaynak hataları loglanır, başlangıcı bozmaz.
+
+    Returns:
+        Isıtılan takvim sayısı.
+    """
+    with _registry_lock:
+        keys = [(DEFAULT_TENANT, DEFAULT_LOCALE)] + [k for k in _providers if k != (DEFAULT_TENANT, DEFAULT_LOCALE)]
+    this_year = date.today().year
+    warmed = 0
+    for tenant_id, locale in keys:
+        try:
+            get_special_days_calendar(tenant_id, locale, days_ahead).preload(this_year, this_year + 1)
+            warmed += 1
+        except Exception as e:
+            logger.warning("Özel gün takvimi ısıtılamadı (%s/%s): %s", tenant_id, locale, e)
+    return warmed
@@ -0,0 +1,58 @@
+"""Kökteki paylaşılan modülleri ajan dizinlerine kopyalar (build adımı).
+
+Orkestratör ve ajanlar ayrı deploy edilir; her ajanın build bağlamı yalnızca
+kendi dizinidir. Paylaşılan modüllerin tek kaynağı repo köküdür; ajan
+dizinlerindeki kopyalar commit edilmez (.gitignore) ve her deploy'dan önce
+bu betikle üretilir:
+
+    python sync_shared_modules.py           # kopyala
+    python sync_shared_modules.py --check   # kopyalar eksik/farklıysa çıkış kodu 1
+"""
+
+from __future__ import annotations
+
+import argparse
+import filecmp
+import os
+import shutil
+import sys
+from typing import List
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+SHARED_MODULES = ("wire_codec.py",)
+AGENT_DIRS = ("customer-segment-agent", "product-agent")
+
+
+def stale_copies() -> List[str]:
+    """Eksik ya da kökteki kaynaktan farklı olan kopyaların yolları."""
+    stale = []
+    for module in SHARED_MODULES:
+        source = os.path.join(ROOT, module)
+        for agent_dir in AGENT_DIRS:
+            target = os.path.join(ROOT, agent_dir, module)
+            if not os.path.exists(target) or not filecmp.cmp(source, target, shallow=False):
+                stale.append(target)
+    return stale
+
+
+def sync() -> List[str]:
+    """Güncel olmayan kopyaları kökten yeniden yazar; yazılan yolları döndürür."""
+    written = stale_copies()
+    for target in written:
+        shutil.copyfile(os.path.join(ROOT, os.path.basename(target)), target)
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="yalnızca doğrula, kopyalama")
+    args = parser.parse_args()
+
+    if args.check:
+        stale = stale_copies()
+        for path in stale:
+            print(f"güncel değil: {os.path.relpath(path, ROOT)}", file=sys.stderr)
+        sys.exit(1 if stale else 0)
+    for path in sync():
+        print(f"kopyalandı: {os.path.relpath(path, ROOT)}")
@@ -89,15 +89,10 @@ def build_product_payload() -> dict:
             "seasonalityRules": [],
         })
 
-    # Basit order history oluştur (son 90 gün simülasyonu)
-    order_history = []
-    for i, p in enumerate(RAW_PRODUCTS):
-        sales = p.get("last30DaysSales", 0)
-        if sales > 0:
-            order_history.append({
-                "orderId": f"O-{9000+i}",
-                "items": [{"productId": p["productId"], "quantity": sales}],
-            })
+    # Satışlar zaten ürün bazında toplanmış: sipariş satırı yerine salesSummary gönder
+    sales_summary = {
+        p["productId"]: p["last30DaysSales"] for p in RAW_PRODUCTS if p.get("last30DaysSales", 0) > 0
+    }
 
     climate_data = {
         "Istanbul": {"avgTempC": 7, "humidityPct": 78, "rainfallMm": 90, "seasonTag": "WINTER"},
@@ -112,7 +107,7 @@ def build_product_payload() -> dict:
     return {
         "tenantId": "farmasi",
         "products": products,
-        "orderHistory": order_history,
+        "salesSummary": sales_summary,
         "currentMonth": 2,
         "climateData": climate_data,
     }
@@ -0,0 +1,109 @@
+"""
+Performance Test: CampaignResponse serileştirmesi (to_json + json.loads vs asdict)
+
+build_campaign_result, sonucu `json.loads(response.to_json())` yerine
+`dataclasses.asdict(response)` ile üretir. Bu betik iki yolun aynı dict'i
+verdiğini (özel gün olmayan kampanyalar, Türkçe metin, ondalıklı indirimler
+dahil) doğrular ve süreleri karşılaştırır; fark varsa ilk farklı alanı
+yazdırıp 1 ile çıkar.
+
+Kullanım:
+    python tests/performance_test_campaign_result.py [kampanya_sayısı]
+"""
+import json
+import os
+import sys
+import time
+from dataclasses import asdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from agents.campaign_agent.models import (
+    CampaignResponse,
+    CampaignSuggestion,
+    CampaignTiming,
+    DiscountSuggestion,
+    StockStatus,
+)
+
+CHANNELS = (["app_push"], ["email", "sms"], ["app_push", "email", "in_app_banner"])
+EVENTS = (None, "Anneler Günü", "Yılbaşı")
+
+
+def build_response(n: int) -> CampaignResponse:
+    campaigns = [
+        CampaignSuggestion(
+            campaignId=f"C-{i:06d}",
+            campaignName=f"Kış bakım kampanyası #{i} — ışıltı & nem",
+            targetCustomerSegment=("Sadık", "Risk Altında", "Yeni")[i % 3],
+            targetProductSegment=("Star", "Cash Cow", "Slow Mover")[i % 3],
+            matchReason="Müşterinin düzenli aldığı ürün gecikti; stok yüksek.",
+            timing=CampaignTiming(
+                startDate="2026-12-01",
+                endDate="2026-12-15",
+                specialEvent=EVENTS[i % len(EVENTS)],
+            ),
+            discountSuggestion=DiscountSuggestion(
+                type=("percentage", "fixed")[i % 2],
+                value=(i % 40) + 0.5 * (i % 2),
+                description="%15 indirim, ikinci ürüne kargo bedava",
+            ),
+            channel=list(CHANNELS[i % len(CHANNELS)]),
+            estimatedImpact="Yüksek",
+            stockStatus=StockStatus(currentLevel="Excess", estimatedCampaignImpact="Stok 20 güne iner"),
+        )
+        for i in range(n)
+    ]
+    return CampaignResponse(
+        campaigns=campaigns,
+        generatedAt="2026-10-19T12:00:00Z",
+        promptUsed="Kış sezonu için kampanya önerileri oluştur",
+        totalCampaigns=len(campaigns),
+    )
+
+
+def first_difference(old, new, path="$"):
+    """İki JSON benzeri değerdeki ilk farkın yolunu döner (yoksa None)."""
+    if type(old) is not type(new):
+        return f"{path}: {type(old).__name__} != {type(new).__name__}"
+    if isinstance(old, dict):
+        for key in old.keys() | new.keys():
+            if key not in old or key not in new:
+                return f"{path}.{key}: yalnızca bir tarafta"
+            diff = first_difference(old[key], new[key], f"{path}.{key}")
+            if diff:
+                return diff
+        return None
+    if isinstance(old, list):
+        if len(old) != len(new):
+            return f"{path}: uzunluk {len(old)} != {len(new)}"
+        for i, (a, b) in enumerate(zip(old, new)):
+            diff = first_difference(a, b, f"{path}[{i}]")
+            if diff:
+                return diff
+        return None
+    return None if old == new else f"{path}: {old!r} != {new!r}"
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    response = build_response(n)
+
+    start = time.perf_counter()
+    via_json = json.loads(response.to_json())
+    json_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    via_asdict = asdict(response)
+    asdict_ms = (time.perf_counter() - start) * 1000
+
+    print("=" * 70)
+    print(f"CAMPAIGN RESPONSE SERİLEŞTİRME ({n:,} kampanya)")
+    print("=" * 70)
+    print(f"json.loads(to_json()) {json_ms:9.1f} ms")
+    print(f"asdict()              {asdict_ms:9.1f} ms")
+    diff = first_difference(via_json, via_asdict)
+    print(f"Aynı çıktı: {'evet' if diff is None else 'HAYIR — ' + diff}")
+    print("=" * 70)
+
+    if diff is not None:
+        sys.exit(1)
@@ -0,0 +1,120 @@
+"""
+Performance Test: Yerel HTTP gateway üzerinden uçtan uca orkestrasyon yükü
+
+Çalışan bir http_gateway'e (python http_gateway.py) eşzamanlı istemcilerle
+deterministik (useLLM=false) kampanya istekleri gönderir. Her istemci tek bir
+keep-alive bağlantısı kullanır ve (JSON modunda) gzip kabul eder. Durum kodu dağılımı,
+throughput ve gecikme yüzdelikleri raporlanır; SSE modunda ilk olaya kadar
+geçen süre de ölçülür.
+
+Ortam değişkenleri:
+    GATEWAY_URL      Hedef gateway (varsayılan http://127.0.0.1:8080)
+    GATEWAY_STREAM   1 ise /campaigns/stream (SSE) kullanılır
+
+Kullanım:
+    python tests/performance_test_http_gateway.py [istek_sayısı] [eşzamanlı_istemci]
+"""
+import gzip
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def build_payload() -> dict:
+    with open(os.path.join(ROOT, "product-agent", "test", "request.json"), encoding="utf-8") as f:
+        data = json.load(f)
+    return {
+        "prompt": "Kış sezonu için kampanya önerileri oluştur",
+        "productData": data.get("input", data),
+        "useLLM": False,
+    }
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def client(url, body: bytes, count: int, stream: bool, results: list, lock: threading.Lock) -> None:
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=300)
+    path = "/campaigns/stream" if stream else "/campaigns"
+    headers = {"Content-Type": "application/json"}
+    if not stream:
+        # SSE olayları satır satır okunacağı için akış modunda sıkıştırma istenmez
+        headers["Accept-Encoding"] = "gzip"
+    for _ in range(count):
+        start = time.perf_counter()
+        first_event = None
+        try:
+            conn.request("POST", path, body, headers)
+            response = conn.getresponse()
+            if stream:
+                # İlk anlamlı olaya (queued dışındaki) kadar geçen süre
+                while True:
+                    line = response.readline()
+                    if not line:
+                        break
+                    if line.startswith(b"event:") and not line.startswith(b"event: queued") and first_event is None:
+                        first_event = time.perf_counter() - start
+            raw = response.read()
+            if response.getheader("Content-Encoding") == "gzip":
+                raw = gzip.decompress(raw)
+            status = response.status
+        except (OSError, http.client.HTTPException) as e:
+            status = type(e).__name__
+            raw = b""
+            conn.close()
+            conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=300)
+        elapsed = time.perf_counter() - start
+        with lock:
+            results.append((status, elapsed, first_event, len(raw)))
+    conn.close()
+
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    url = urlparse(os.environ.get("GATEWAY_URL", "http://127.0.0.1:8080"))
+    stream = os.environ.get("GATEWAY_STREAM", "0") == "1"
+    body = json.dumps(build_payload(), ensure_ascii=False).encode("utf-8")
+
+    results = []
+    lock = threading.Lock()
+    per_client = [total // concurrency + (1 if i < total % concurrency else 0) for i in range(concurrency)]
+    threads = [
+        threading.Thread(target=client, args=(url, body, count, stream, results, lock))
+        for count in per_client if count
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    statuses = {}
+    for status, _, _, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    ok = [elapsed * 1000 for status, elapsed, _, _ in results if status == 200]
+    first = [first_event * 1000 for status, _, first_event, _ in results if status == 200 and first_event]
+
+    print("=" * 70)
+    print(f"HTTP GATEWAY YÜK TESTİ ({url.geturl()}, {'SSE' if stream else 'JSON'})")
+    print("=" * 70)
+    print(f"İstek: {len(results)}  Eşzamanlı istemci: {len(threads)}  Süre: {wall:.2f}s  "
+          f"Throughput: {len(results) / wall:.2f} istek/s")
+    print(f"Durum kodları: {statuses}")
+    if ok:
+        print(f"Gecikme ms  p50={percentile(ok, 50):.1f}  p95={percentile(ok, 95):.1f}  "
+              f"p99={percentile(ok, 99):.1f}  max={max(ok):.1f}")
+    if first:
+        print(f"İlk olay ms p50={percentile(first, 50):.1f}  p95={percentile(first, 95):.1f}")
+    print("=" * 70)
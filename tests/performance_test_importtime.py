@@ -0,0 +1,85 @@
+"""
+Performance Test: Ajan entrypoint'lerinin import süresi (cold start bütçesi)
+
+Her entrypoint modülü ayrı bir süreçte `python -X importtime` ile import edilir;
+toplam kümülatif import süresi bütçeyle karşılaştırılır ve deterministik yolun
+model yığınını (strands) yüklemediği doğrulanır.
+
+Bütçeler IMPORT_BUDGET_MS_<MODÜL> env değişkenleri ile override edilebilir
+(ör. IMPORT_BUDGET_MS_ORCHESTRATOR_AGENT=1500). Bütçe aşılırsa çıkış kodu 1.
+
+Kullanım:
+    python tests/performance_test_importtime.py
+"""
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# (modül, çalışma dizini, varsayılan bütçe ms)
+ENTRYPOINTS = [
+    ("orchestrator_agent", ROOT, 1500),
+    ("campaign_agent", ROOT, 800),
+    ("customer_segment_agent", os.path.join(ROOT, "customer-segment-agent"), 1200),
+    ("product_analysis_agent", os.path.join(ROOT, "product-agent"), 300),
+]
+
+# Deterministik yolda yüklenmemesi gereken modüller
+FORBIDDEN = ("strands",)
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str, cwd: str):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        last = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "?"
+        return None, [], last
+
+    total_us = 0
+    loaded = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), match.group(3), match.group(4)
+        loaded.append(name)
+        # Yalnızca üst seviye import'ların kümülatif süreleri toplanır
+        if len(indent) <= 1:
+            total_us += cumulative
+    return total_us / 1000, loaded, None
+
+
+print("=" * 80)
+print("ENTRYPOINT IMPORT TIME")
+print("=" * 80)
+print(f"{'Modül':<26} {'ms':>9} {'bütçe ms':>9}  Durum")
+
+failed = False
+for module, cwd, default_budget in ENTRYPOINTS:
+    budget = float(os.environ.get(f"IMPORT_BUDGET_MS_{module.upper()}", default_budget))
+    total_ms, loaded, error = measure(module, cwd)
+    if total_ms is None:
+        # Bağımlılıklar kurulu değilse ölçüm yapılamaz; başarısızlık sayılmaz
+        print(f"{module:<26} {'-':>9} {budget:>9.0f}  ATLANDI ({error})")
+        continue
+
+    heavy = sorted({name.split(".")[0] for name in loaded if name.split(".")[0] in FORBIDDEN})
+    status = "OK"
+    if total_ms > budget:
+        status = "BÜTÇE AŞILDI"
+        failed = True
+    if heavy:
+        status += f" | yüklenmemeli: {', '.join(heavy)}"
+        failed = True
+    print(f"{module:<26} {total_ms:>9.1f} {budget:>9.0f}  {status}")
+
+print("=" * 80)
+sys.exit(1 if failed else 0)
@@ -0,0 +1,74 @@
+"""
+Performance Test: Kompakt insight kayıtlarının nesne başı bellek kullanımı
+
+Karşılaştırma: agents.campaign_agent.models tipleri (HeroProduct, MissingRegular,
+TopProduct) vs insight_records içindeki slotted alt sınıfları.
+
+Kullanım:
+    python tests/performance_test_insight_records.py [adet]
+"""
+import os
+import sys
+import tracemalloc
+from dataclasses import asdict, fields
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from insight_records import HeroProductRecord, MissingRegularRecord, TopProductRecord
+
+
+def sample_rows(record_type, n):
+    """Kayıt tipine uygun n adet örnek satır üretir."""
+    names = [f.name for f in fields(record_type)]
+    rows = []
+    for i in range(n):
+        row = {}
+        for name in names:
+            if name in ("inventoryPressure", "seasonMatch"):
+                row[name] = i % 2 == 0
+            elif name in ("trendScore", "totalQuantity"):
+                row[name] = i % 100
+            elif name in ("stockDays", "dailySalesRate", "totalSpent", "avgDaysBetween", "daysOverdue"):
+                row[name] = float(i % 365) + 0.5
+            else:
+                row[name] = f"{name}-{i % 50}"
+        rows.append(row)
+    return rows
+
+
+def measure(cls, rows):
+    """rows'tan cls nesneleri oluşturur ve nesne başı byte döner."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [cls(**row) for row in rows]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return objects, allocated / len(rows)
+
+
+n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+print("=" * 80)
+print(f"INSIGHT RECORD MEMORY ({n:,} nesne / tip)")
+print("=" * 80)
+print(f"{'Tip':<24} {'model B/obj':>16} {'slots B/obj':>14} {'Tasarruf':>10}")
+
+for record_type in (HeroProductRecord, MissingRegularRecord, TopProductRecord):
+    baseline_type = record_type.__mro__[1]
+    rows = sample_rows(record_type, n)
+    baseline_objs, baseline_bytes = measure(baseline_type, rows)
+    compact_objs, compact_bytes = measure(record_type, rows)
+
+    # Davranış aynı kalmalı: asdict çıktısı, isinstance, iki yönlü eşitlik, mutasyon
+    assert asdict(baseline_objs[0]) == asdict(compact_objs[0])
+    assert isinstance(compact_objs[0], baseline_type)
+    assert compact_objs[1] == baseline_objs[1] and baseline_objs[1] == compact_objs[1]
+    assert compact_objs[1] != baseline_objs[2]
+    setattr(compact_objs[0], fields(record_type)[0].name, "degisti")
+
+    saving = (1 - compact_bytes / baseline_bytes) * 100
+    print(f"{record_type.__name__:<24} {baseline_bytes:>16.1f} {compact_bytes:>14.1f} {saving:>9.1f}%")
+    del baseline_objs, compact_objs
+
+print("=" * 80)
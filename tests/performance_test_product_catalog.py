@@ -0,0 +1,73 @@
+"""
+Performance Test: Ürün kataloğu indeksinin soğuk / sıcak yükleme ve sorgu süreleri
+
+urunler.json kayıtları farklı ürün kodlarıyla çoğaltılarak büyük bir katalog
+üretilir. Karşılaştırma:
+    soğuk   JSON ayrıştırma + normalize + ters indeks kurma + diske yazma
+    sıcak   diskteki kompakt indeksin okunması
+    sorgu   copy_for (productId → kısa açıklama) ve anahtar kelime araması
+
+Kullanım:
+    python tests/performance_test_product_catalog.py [çoğaltma]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from product_catalog import CATALOG_PATH, load_catalog_index
+
+
+def build_catalog(path: str, copies: int) -> int:
+    with open(CATALOG_PATH, encoding="utf-8") as f:
+        records = json.load(f)
+    rows = []
+    for copy in range(copies):
+        for record in records:
+            data = dict(record["data"], urun_kodu=str(int(record["data"]["urun_kodu"]) + copy * 10_000_000))
+            rows.append(dict(record, data=data))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(rows, f, ensure_ascii=False)
+    return len(rows)
+
+
+if __name__ == "__main__":
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog_path = os.path.join(tmp, "urunler.json")
+        index_path = os.path.join(tmp, "urunler.index.json")
+        n_products = build_catalog(catalog_path, copies)
+
+        start = time.perf_counter()
+        index = load_catalog_index(catalog_path, index_path)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = load_catalog_index(catalog_path, index_path)
+        warm = time.perf_counter() - start
+
+        ids = [entry.productId for entry in index.search("maskara")]
+        start = time.perf_counter()
+        for product_id in ids * 10:
+            index.copy_for(product_id)
+        lookup_us = (time.perf_counter() - start) / max(1, len(ids) * 10) * 1e6
+
+        start = time.perf_counter()
+        for _ in range(100):
+            matches = index.search("beyazlatıcı diş macunu")
+        search_ms = (time.perf_counter() - start) / 100 * 1000
+
+        print("=" * 70)
+        print(f"ÜRÜN KATALOĞU İNDEKSİ ({n_products:,} ürün)")
+        print("=" * 70)
+        print(f"Kaynak: {os.path.getsize(catalog_path) / 1e6:.1f} MB  "
+              f"İndeks: {os.path.getsize(index_path) / 1e6:.1f} MB")
+        print(f"Soğuk yükleme (ayrıştır + indeksle + yaz): {cold * 1000:.1f} ms")
+        print(f"Sıcak yükleme (disk indeksi):              {warm * 1000:.1f} ms")
+        print(f"copy_for: {lookup_us:.2f} µs/ürün")
+        print(f"Arama 'beyazlatıcı diş macunu': {search_ms:.3f} ms ({len(matches)} sonuç)")
+        print("=" * 70)
@@ -0,0 +1,67 @@
+"""
+Performance Test: Prompt → ürün BM25 ilgi sıralamasının kurulum ve sorgu süreleri
+
+product-agent/data ürünleri farklı productId'lerle çoğaltılarak büyük bir
+korpus üretilir. Ölçülenler:
+    kurulum   analiz (tokenize + ASCII katlama + ek kırpma) ve ters indeks
+    scores    tüm korpus üzerinde prompt puanlaması
+    rank      fallback yolundaki gibi 10 aday satırın sıralanması
+
+Kullanım:
+    python tests/performance_test_prompt_relevance.py [çoğaltma]
+"""
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from prompt_relevance import RelevanceIndex
+
+PROMPTS = [
+    "Kış sezonu için nemlendirici kampanyası",
+    "Erkekler için parfüm hediye önerileri",
+    "Saç bakımı ve şampuan indirimi",
+    "Yaz güneş koruma ürünleri",
+    "Anneler günü makyaj seti",
+]
+
+
+def load_products() -> list:
+    products = []
+    for name in ("products.json", "products_2.json"):
+        with open(os.path.join(ROOT, "product-agent", "data", name), encoding="utf-8") as f:
+            products.extend(json.load(f)["products"])
+    return products
+
+
+if __name__ == "__main__":
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    base = load_products()
+    products = [dict(p, productId=f"{p['productId']}-{copy}") for copy in range(copies) for p in base]
+
+    start = time.perf_counter()
+    index = RelevanceIndex(products)
+    build = time.perf_counter() - start
+
+    rows = base[:10]
+    score_ms = []
+    rank_ms = []
+    for prompt in PROMPTS:
+        start = time.perf_counter()
+        scores = index.scores(prompt)
+        score_ms.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        for _ in range(100):
+            index.rank(prompt, rows)
+        rank_ms.append((time.perf_counter() - start) * 10)
+
+    print("=" * 70)
+    print(f"PROMPT İLGİ İNDEKSİ ({len(index):,} ürün)")
+    print("=" * 70)
+    print(f"Kurulum: {build * 1000:.1f} ms")
+    for prompt, s_ms, r_ms in zip(PROMPTS, score_ms, rank_ms):
+        print(f"  {prompt[:40]:<40} scores {s_ms:7.2f} ms   rank(10) {r_ms:6.3f} ms")
+    print("=" * 70)
@@ -0,0 +1,105 @@
+"""
+Performance Test: Agent response çözücü (eski 3 denemeli parse vs agent_response)
+
+Büyük response gövdeleri için parse süresi ve tracemalloc tepe bellek
+kullanımı karşılaştırılır. Önce kesik ve iç içe parça içeren bozuk gövdelerde
+iki çözücünün aynı sonucu verdiği doğrulanır.
+
+Kullanım:
+    python tests/performance_test_response_decoder.py [ürün_sayısı]
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from agent_response import decode_span, parse_runtime_response
+
+
+def legacy_parse(raw: bytes) -> dict:
+    """invoke_agentcore_runtime'ın önceki parse mantığı (karşılaştırma için)."""
+    text = raw.decode("utf-8").strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        json_start = text.find("{")
+        json_end = text.rfind("}") + 1
+        if json_start >= 0 and json_end > json_start:
+            try:
+                return json.loads(text[json_start:json_end])
+            except json.JSONDecodeError:
+                pass
+        json_start = text.find("[")
+        json_end = text.rfind("]") + 1
+        if json_start >= 0 and json_end > json_start:
+            try:
+                return {"data": json.loads(text[json_start:json_end])}
+            except json.JSONDecodeError:
+                pass
+        return {"raw_response": text}
+
+
+def build_insight(n: int) -> dict:
+    hero = {
+        "productId": "P-0000", "productName": "Ürün", "category": "SKINCARE",
+        "performanceSegment": "Star", "stockSegment": "Healthy", "trendScore": 90,
+        "stockDays": 20.5, "recommendedAction": "PROMOTE", "climateMatch": ["HIGH_HUMIDITY"],
+    }
+    return {
+        "heroProducts": [dict(hero, productId=f"P-{i:06d}") for i in range(n)],
+        "slowMovers": [dict(hero, productId=f"S-{i:06d}") for i in range(n)],
+    }
+
+
+def measure(fn, raw, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(raw)
+        times.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    fn(raw)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), peak / 1024 / 1024
+
+
+n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+body = json.dumps(build_insight(n), ensure_ascii=False)
+
+cases = {
+    "clean JSON": body.encode("utf-8"),
+    "prose + JSON object": ("İşte analiz sonucu:\n" + body + "\nUmarım yardımcı olur.").encode("utf-8"),
+    "prose + JSON array": ("Kampanyalar: " + json.dumps(build_insight(n)["heroProducts"]) + " bitti.").encode("utf-8"),
+}
+
+# Kesik / bozuk dış JSON: içteki parçalar (ör. {"age": 30}, ["sms"]) döndürülmemeli
+edge_cases = {
+    "truncated object": b'Result: {"customerId":"C1","profile":{"age":30},"segments":[1,2',
+    "nested fragment": b'Result: {"customerId":"C1","profile":{"age":30},"segments":[1,2]] extra}',
+    "truncated array": 'Kampanyalar: [{"campaignId":"K1","channel":["sms"]},{"campaignId":"K2"'.encode("utf-8"),
+    "array then object": b'Liste [1,2] sonra {"a":1}',
+    "prose only": "Uygun kampanya bulunamadı.".encode("utf-8"),
+    "truncated body": ("İşte analiz sonucu:\n" + body[: len(body) // 2]).encode("utf-8"),
+}
+for name, raw in edge_cases.items():
+    assert legacy_parse(raw) == parse_runtime_response(raw), name
+try:
+    decode_span(edge_cases["truncated array"].decode("utf-8"), "[")
+    raise AssertionError("truncated array: JSONDecodeError bekleniyordu")
+except json.JSONDecodeError:
+    pass
+
+print("=" * 90)
+print(f"RESPONSE DECODER BENCHMARK ({n:,} ürün/liste)")
+print("=" * 90)
+print(f"{'Durum':<22} {'MB':>7} {'eski ms':>10} {'yeni ms':>10} {'eski peak MB':>13} {'yeni peak MB':>13}")
+for name, raw in cases.items():
+    assert legacy_parse(raw) == parse_runtime_response(raw)
+    old_ms, old_peak = measure(legacy_parse, raw)
+    new_ms, new_peak = measure(parse_runtime_response, raw)
+    print(f"{name:<22} {len(raw)/1024/1024:>7.2f} {old_ms:>10.1f} {new_ms:>10.1f} {old_peak:>13.1f} {new_peak:>13.1f}")
+print("=" * 90)
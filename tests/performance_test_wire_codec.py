@@ -0,0 +1,67 @@
+"""
+Performance Test: Ajanlar arası wire kodlaması (JSON vs zarflı kompakt kodlama)
+
+Büyük bir productData payload'ı (çoğaltılmış orderHistory) için istek gövdesi
+boyutu, orkestratör tarafı encode ve ajan tarafı decode süresi ölçülür.
+Gidiş-dönüş sonucu orijinal payload ile birebir aynı olmalıdır.
+
+Kullanım:
+    python tests/performance_test_wire_codec.py [sipariş_çarpanı]
+"""
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import wire_codec
+
+
+def build_payload(multiplier: int) -> dict:
+    with open(os.path.join(ROOT, "product-agent", "test", "request.json"), encoding="utf-8") as f:
+        data = json.load(f)
+    data = data.get("input", data)
+    orders = data["orderHistory"]
+    data["orderHistory"] = [
+        dict(order, orderId=f"{order.get('orderId', 'O')}-{i}") for i in range(multiplier) for order in orders
+    ]
+    return data
+
+
+def measure(fn, repeat=5):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+multiplier = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+payload = build_payload(multiplier)
+
+modes = {
+    "json (eski)": lambda: json.dumps(payload).encode("utf-8"),
+    "json (kompakt)": lambda: wire_codec.encode_request(payload, None)[0],
+}
+for encoding in wire_codec.supported_encodings():
+    modes[encoding] = lambda encoding=encoding: wire_codec.encode_request(payload, encoding)[0]
+
+print("=" * 78)
+print(f"WIRE CODEC BENCHMARK ({len(payload['products'])} ürün, {len(payload['orderHistory']):,} sipariş)")
+print("=" * 78)
+print(f"{'Kodlama':<16} {'Boyut KB':>10} {'Oran':>7} {'encode ms':>11} {'decode ms':>11}")
+
+baseline_size = None
+for name, encode in modes.items():
+    body, encode_ms = measure(encode)
+    decoded, decode_ms = measure(lambda: wire_codec.decode_request(json.loads(body))[0])
+    assert decoded == payload, f"{name}: gidiş-dönüş sonucu farklı"
+    baseline_size = baseline_size or len(body)
+    print(f"{name:<16} {len(body) / 1024:>10.1f} {len(body) / baseline_size:>7.2f} {encode_ms:>11.1f} {decode_ms:>11.1f}")
+
+print("=" * 78)
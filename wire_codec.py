@@ -0,0 +1,264 @@
+"""
+Wire Codec - negotiated compact encoding between the orchestrator and agents
+
+AgentCore payloads are JSON. Large payloads (full orderHistory, product
+insights) can instead travel as a compact encoding wrapped in a small JSON
+envelope, so every hop stays valid JSON:
+
+    {"_wire": "zjson", "_wireAccept": ["zjson"], "data": "<base64>"}
+
+Encodings:
+    zjson    zlib-compressed compact UTF-8 JSON (always available)
+    msgpack  MessagePack (only when the msgpack package is installed)
+
+Negotiation: the caller lists the encodings it can read in "_wireAccept".
+An agent that understands the marker answers in the first encoding both sides
+support, always as an envelope, which tells the caller that compact requests
+are safe from then on. Agents that do not know the marker ignore the extra
+key and answer plain JSON, so nothing changes for them.
+
+The orchestrator (repo root), customer-segment-agent/ and product-agent/
+are deployed separately but share this module. This file at the repo root
+is the only source: sync_shared_modules.py copies it into the agent
+directories before they are built, and the copies are not committed.
+"""
+
+import base64
+import json
+import os
+import zlib
+from typing import Any, List, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+WIRE_KEY = "_wire"
+ACCEPT_KEY = "_wireAccept"
+DATA_KEY = "data"
+
+ENCODING_ZJSON = "zjson"
+ENCODING_MSGPACK = "msgpack"
+
+# Requests smaller than this are sent as plain JSON even to capable agents
+WIRE_MIN_BYTES = int(os.environ.get("WIRE_MIN_BYTES", "8192"))
+COMPRESSION_LEVEL = int(os.environ.get("WIRE_COMPRESSION_LEVEL", "6"))
+
+# Largest decompressed zjson body accepted (guards against zip bombs)
+MAX_DECODED_BYTES = int(os.environ.get("WIRE_MAX_DECODED_BYTES", str(64 * 1024 * 1024)))
+
+_SEPARATORS = (",", ":")
+
+
+def supported_encodings() -> List[str]:
+    """Encodings this process can read and write, in preference order."""
+    encodings = [ENCODING_ZJSON]
+    if msgpack is not None:
+        encodings.insert(0, ENCODING_MSGPACK)
+    return encodings
+
+
+def negotiate(accept: Any) -> Optional[str]:
+    """
+    Picks the first encoding from the peer's accept list that is supported here.
+
+    Args:
+        accept: Peer's "_wireAccept" value (list or comma-separated string)
+
+    Returns:
+        Encoding name, or None if there is no common encoding
+    """
+    if isinstance(accept, str):
+        accept = [item.strip() for item in accept.split(",")]
+    if not isinstance(accept, list):
+        return None
+    supported = supported_encodings()
+    for encoding in accept:
+        if encoding in supported:
+            return encoding
+    return None
+
+
+def encode(obj: Any, encoding: str, json_bytes: Optional[bytes] = None) -> bytes:
+    """
+    Encodes an object to raw bytes.
+
+    Args:
+        obj: JSON-compatible object
+        encoding: ENCODING_ZJSON or ENCODING_MSGPACK
+        json_bytes: Already serialized compact JSON of obj (reused by zjson)
+
+    Returns:
+        Encoded bytes
+    """
+    if encoding == ENCODING_ZJSON:
+        if json_bytes is None:
+            json_bytes = json.dumps(obj, ensure_ascii=False, separators=_SEPARATORS).encode("utf-8")
+        return zlib.compress(json_bytes, COMPRESSION_LEVEL)
+    if encoding == ENCODING_MSGPACK and msgpack is not None:
+        return msgpack.packb(obj, use_bin_type=True)
+    raise ValueError(f"Unsupported wire encoding: {encoding}")
+
+
+def decode(data: bytes, encoding: str) -> Any:
+    """
+    Decodes raw bytes produced by encode().
+
+    Args:
+        data: Encoded bytes
+        encoding: Encoding used
+
+    Returns:
+        Decoded object
+
+    Raises:
+        ValueError: Unsupported encoding, or a zjson body that is corrupt,
+            truncated or decompresses to more than MAX_DECODED_BYTES
+    """
+    if encoding == ENCODING_ZJSON:
+        decompressor = zlib.decompressobj()
+        try:
+            decoded = decompressor.decompress(data, MAX_DECODED_BYTES)
+        except zlib.error as e:
+            raise ValueError(f"Corrupt zjson wire body: {e}") from e
+        if decompressor.unconsumed_tail:
+            raise ValueError(f"Wire body exceeds {MAX_DECODED_BYTES} bytes when decompressed")
+        if not decompressor.eof:
+            raise ValueError("Truncated zjson wire body")
+        return json.loads(decoded)
+    if encoding == ENCODING_MSGPACK and msgpack is not None:
+        return msgpack.unpackb(data, raw=False)
+    raise ValueError(f"Unsupported wire encoding: {encoding}")
+
+
+def envelope(obj: Any, encoding: str, json_bytes: Optional[bytes] = None, accept: bool = False) -> dict:
+    """
+    Wraps an object in a JSON envelope with the given encoding.
+
+    Args:
+        obj: JSON-compatible object
+        encoding: Wire encoding
+        json_bytes: Already serialized compact JSON of obj
+        accept: Also advertise the encodings this process can read
+
+    Returns:
+        Envelope dictionary
+    """
+    wrapped = {WIRE_KEY: encoding}
+    if accept:
+        wrapped[ACCEPT_KEY] = supported_encodings()
+    wrapped[DATA_KEY] = base64.b64encode(encode(obj, encoding, json_bytes)).decode("ascii")
+    return wrapped
+
+
+def is_envelope(obj: Any) -> bool:
+    """True if obj is a wire envelope."""
+    return isinstance(obj, dict) and isinstance(obj.get(WIRE_KEY), str) and DATA_KEY in obj
+
+
+def open_envelope(obj: dict) -> Any:
+    """
+    Decodes the object carried by an envelope.
+
+    Raises:
+        ValueError: Malformed envelope (bad base64, corrupt or oversized body)
+    """
+    try:
+        data = base64.b64decode(obj[DATA_KEY], validate=True)
+    except TypeError as e:
+        raise ValueError(f"Invalid wire envelope data: {e}") from e
+    return decode(data, obj[WIRE_KEY])
+
+
+# ---------------------------------------------------------------------------
+# Caller side (orchestrator)
+# ---------------------------------------------------------------------------
+
+
+def encode_request(payload: dict, encoding: Optional[str] = None,
+                   min_bytes: int = WIRE_MIN_BYTES) -> Tuple[bytes, Optional[str]]:
+    """
+    Builds the request body for an agent.
+
+    The payload is compacted only when an encoding has been negotiated with the
+    agent and the JSON body reaches min_bytes; otherwise it is plain JSON with
+    the accept list added so the agent can opt in.
+
+    Args:
+        payload: Request payload
+        encoding: Encoding previously negotiated with the agent (None = JSON)
+        min_bytes: Minimum JSON size worth compacting
+
+    Returns:
+        (UTF-8 JSON body, encoding used for the payload or None for plain JSON)
+    """
+    json_bytes = json.dumps(payload, ensure_ascii=False, separators=_SEPARATORS).encode("utf-8")
+    if encoding is not None and len(json_bytes) >= min_bytes:
+        wrapped = envelope(payload, encoding, json_bytes, accept=True)
+        return json.dumps(wrapped, separators=_SEPARATORS).encode("utf-8"), encoding
+
+    # Prepend the accept list to the serialized object instead of dumping a copy
+    accept = json.dumps({ACCEPT_KEY: supported_encodings()}, separators=_SEPARATORS).encode("utf-8")
+    if json_bytes == b"{}":
+        return accept, None
+    return accept[:-1] + b"," + json_bytes[1:], None
+
+
+def decode_response(result: Any) -> Tuple[Any, Optional[str]]:
+    """
+    Unwraps an agent response.
+
+    Args:
+        result: Parsed response
+
+    Returns:
+        (response object, encoding the agent answered with or None for plain JSON)
+    """
+    if is_envelope(result):
+        return open_envelope(result), result[WIRE_KEY]
+    return result, None
+
+
+# ---------------------------------------------------------------------------
+# Agent side (entrypoints)
+# ---------------------------------------------------------------------------
+
+
+def decode_request(payload: Any) -> Tuple[Any, Optional[str]]:
+    """
+    Unwraps an incoming payload and negotiates the response encoding.
+
+    Args:
+        payload: Payload received by the entrypoint
+
+    Returns:
+        (plain payload without wire keys, response encoding or None for JSON)
+
+    Raises:
+        ValueError: Malformed envelope (see open_envelope)
+    """
+    if not isinstance(payload, dict) or (WIRE_KEY not in payload and ACCEPT_KEY not in payload):
+        return payload, None
+    response_encoding = negotiate(payload.get(ACCEPT_KEY))
+    if is_envelope(payload):
+        return open_envelope(payload), response_encoding
+    plain = dict(payload)
+    plain.pop(ACCEPT_KEY, None)
+    return plain, response_encoding
+
+
+def encode_response(result: Any, encoding: Optional[str]) -> Any:
+    """
+    Wraps an entrypoint result in the negotiated encoding (no-op for JSON).
+
+    Args:
+        result: Entrypoint result
+        encoding: Encoding from decode_request()
+
+    Returns:
+        Envelope or the unchanged result
+    """
+    if encoding is None:
+        return result
+    return envelope(result, encoding)